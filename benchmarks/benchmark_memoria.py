@@ -0,0 +1,182 @@
+# benchmarks/benchmark_memoria.py
+"""
+Mede a memória ocupada por avaliação e por item de cardápio ao carregar
+um conjunto de dados sintético, comparando as classes com __slots__ com
+equivalentes que mantêm um __dict__ por instância (o layout anterior),
+e o armazém de avaliações em lista com o colunar.
+
+Uso (a partir da raiz do projeto):
+
+    python -m benchmarks.benchmark_memoria [restaurantes] [avaliacoes]
+"""
+
+import gc
+import random
+import sys
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from modelos.armazem_avaliacoes import novo_armazem
+from modelos.avaliacao import Avaliacao
+from modelos.cardapio.bebida import Bebida
+from modelos.cardapio.prato import Prato
+from modelos.cardapio.sobremesa import Sobremesa
+
+
+# Subclasses sem __slots__ ganham __dict__ (e __weakref__) por instância,
+# reproduzindo o layout das classes antes da conversão.
+class AvaliacaoComDict(Avaliacao):
+    pass
+
+
+class PratoComDict(Prato):
+    pass
+
+
+class BebidaComDict(Bebida):
+    pass
+
+
+class SobremesaComDict(Sobremesa):
+    pass
+
+
+def gerar_dados(
+    restaurantes: int, avaliacoes: int, itens: int, semente: int = 42
+) -> List[dict]:
+    """
+    Gera registros no formato de ARQUIVO_DADOS.
+    """
+    aleatorio = random.Random(semente)
+    clientes = [f"Cliente {i}" for i in range(1000)]
+    dados = []
+    for r in range(restaurantes):
+        cardapio = []
+        for i in range(itens):
+            tipo = ("Prato", "Bebida", "Sobremesa")[i % 3]
+            item = {
+                "__type__": tipo,
+                "nome": f"Item {r}-{i}",
+                "preco": round(aleatorio.uniform(5, 80), 2),
+            }
+            if tipo != "Bebida":
+                item["descricao"] = f"Descrição do item {i}"
+            if tipo != "Prato":
+                item["tamanho"] = aleatorio.choice([150, 300, 500])
+            if tipo == "Sobremesa":
+                item["tipo"] = "Sorvete"
+            cardapio.append(item)
+        dados.append(
+            {
+                "nome": f"Restaurante {r}",
+                "avaliacoes": [
+                    {
+                        "cliente": aleatorio.choice(clientes),
+                        "nota": round(aleatorio.uniform(1, 5), 1),
+                    }
+                    for _ in range(avaliacoes)
+                ],
+                "cardapio": cardapio,
+            }
+        )
+    return dados
+
+
+def medir(construir: Callable[[], list]) -> Tuple[int, int]:
+    """
+    Executa ``construir`` e retorna (bytes alocados, objetos criados),
+    descontando os valores já existentes nos dados de entrada.
+    """
+    gc.collect()
+    tracemalloc.start()
+    objetos = construir()
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    quantidade = len(objetos)
+    del objetos
+    return atual, quantidade
+
+
+def comparar(dados: List[dict]) -> Dict[str, Tuple[float, float]]:
+    """
+    Bytes por avaliação e por item de cardápio, com __dict__ e com
+    __slots__.
+    """
+    classes = {
+        "com __dict__": (
+            AvaliacaoComDict,
+            {
+                "Prato": PratoComDict,
+                "Bebida": BebidaComDict,
+                "Sobremesa": SobremesaComDict,
+            },
+        ),
+        "com __slots__": (
+            Avaliacao,
+            {"Prato": Prato, "Bebida": Bebida, "Sobremesa": Sobremesa},
+        ),
+    }
+    resultado = {}
+    for rotulo, (cls_avaliacao, cls_itens) in classes.items():
+        por_avaliacao = medir(
+            lambda: [
+                cls_avaliacao(a["cliente"], a["nota"])
+                for r in dados
+                for a in r["avaliacoes"]
+            ]
+        )
+        por_item = medir(
+            lambda: [
+                cls_itens[c["__type__"]].from_dict(c)
+                for r in dados
+                for c in r["cardapio"]
+            ]
+        )
+        resultado[rotulo] = (
+            por_avaliacao[0] / por_avaliacao[1],
+            por_item[0] / por_item[1],
+        )
+    return resultado
+
+
+def comparar_armazens(dados: List[dict]) -> Dict[str, float]:
+    """
+    Bytes por avaliação em cada tipo de armazém. Os clientes são copiados
+    para strings novas, como aconteceria ao decodificar o JSON, para que
+    o custo dos nomes repetidos entre na conta.
+    """
+    resultado = {}
+    for tipo in ("lista", "colunar"):
+        def construir():
+            armazens = []
+            for r in dados:
+                armazem = novo_armazem(tipo)
+                for a in r["avaliacoes"]:
+                    armazem.anexar("".join(list(a["cliente"])), a["nota"])
+                armazens.append(armazem)
+            return armazens
+
+        total, _ = medir(construir)
+        resultado[tipo] = total / sum(len(r["avaliacoes"]) for r in dados)
+    return resultado
+
+
+def main(argv: List[str]) -> None:
+    restaurantes = int(argv[1]) if len(argv) > 1 else 1000
+    avaliacoes = int(argv[2]) if len(argv) > 2 else 200
+    dados = gerar_dados(restaurantes, avaliacoes, itens=30)
+    print(
+        f"{restaurantes} restaurantes, {restaurantes * avaliacoes} "
+        f"avaliações, {restaurantes * 30} itens de cardápio"
+    )
+    print(f"{'':16}{'bytes/avaliação':>18}{'bytes/item':>14}")
+    for rotulo, (avaliacao, item) in comparar(dados).items():
+        print(f"{rotulo:16}{avaliacao:>18.1f}{item:>14.1f}")
+    print()
+    print(f"{'armazém':16}{'bytes/avaliação':>18}")
+    for tipo, avaliacao in comparar_armazens(dados).items():
+        print(f"{tipo:16}{avaliacao:>18.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
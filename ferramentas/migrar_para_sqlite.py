@@ -0,0 +1,69 @@
+# ferramentas/migrar_para_sqlite.py
+"""
+Migra os dados do arquivo JSON (snapshot e journal, se houver) para o
+banco SQLite usado com MODO_PERSISTENCIA=sqlite.
+
+Uso (a partir da raiz do projeto):
+
+    python -m ferramentas.migrar_para_sqlite [origem.json] [destino.db]
+
+Sem argumentos, lê ARQUIVO_DADOS e grava no banco ao lado dele.
+"""
+
+import os
+import sys
+from typing import List, Optional
+
+from modelos.repositorio_sqlite import RepositorioSQLite
+from modelos.restaurante import Restaurante
+
+
+def migrar(origem: str, destino: Optional[str] = None) -> dict:
+    """
+    Carrega o arquivo JSON como a aplicação faria (incluindo geração
+    anterior e journal) e substitui o conteúdo do banco por ele.
+
+    Inputs:
+    - origem (str): Snapshot JSON/NDJSON de origem.
+    - destino (str | None): Banco SQLite; por padrão, o da origem com
+      extensão .db.
+
+    Returns:
+    - dict: Estatísticas da carga (ver Restaurante.carregar_dados()) e o
+      caminho do banco em "destino".
+    """
+    if destino is None:
+        destino = os.path.splitext(origem)[0] + ".db"
+    modo, arquivo = Restaurante.MODO_PERSISTENCIA, Restaurante.ARQUIVO_DADOS
+    Restaurante.MODO_PERSISTENCIA = "snapshot"
+    Restaurante.ARQUIVO_DADOS = origem
+    try:
+        carga = Restaurante.carregar_dados()
+        repositorio = RepositorioSQLite(destino)
+        try:
+            repositorio.substituir(
+                r.to_dict() for r in Restaurante.restaurantes
+            )
+        finally:
+            repositorio.fechar()
+    finally:
+        Restaurante.MODO_PERSISTENCIA = modo
+        Restaurante.ARQUIVO_DADOS = arquivo
+        Restaurante.limpar_registro()
+    return {**carga, "destino": destino}
+
+
+def main(argv: List[str]) -> None:
+    origem = argv[1] if len(argv) > 1 else Restaurante.ARQUIVO_DADOS
+    destino = argv[2] if len(argv) > 2 else None
+    resultado = migrar(origem, destino)
+    print(
+        f"{resultado['restaurantes']} restaurantes, "
+        f"{resultado['avaliacoes']} avaliações e "
+        f"{resultado['itens_cardapio']} itens migrados para "
+        f"{resultado['destino']}"
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv)
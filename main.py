@@ -1,66 +1,327 @@
 # main.py
 
-from fastapi import FastAPI, HTTPException, Path, Body
-from fastapi.responses import HTMLResponse
-from typing import List, Dict, Type
+from fastapi import (
+    Depends, FastAPI, HTTPException, Path, Body, Query, Request, Response
+)
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from typing import (
+    AsyncIterator, Callable, Hashable, Iterator, List, Dict, Optional,
+    Tuple, Type
+)
 from contextlib import asynccontextmanager
+import json
+import time
 
 
-from modelos.restaurante import Restaurante
+from modelos.restaurante import Restaurante, RestauranteRemovido
 from modelos.cardapio.prato import Prato
 from modelos.cardapio.bebida import Bebida
 from modelos.cardapio.sobremesa import Sobremesa
 from modelos.cardapio.item_cardapio import ItemCardapio
 from schemas.schemas import (
+    AnaliseAvaliacoesSchema,
+    BulkDiscount,
+    BulkDiscountResult,
+    CampoDetalhe,
     CreateRestaurant,
+    FormatoExportacao,
+    ImportRestaurant,
+    ImportResult,
+    ItemType,
+    MenuSearchResult,
     Rating,
     MenuItem,
+    RestaurantRanking,
     RestaurantSummary,
     RestaurantDetail,
 )
+from servicos.analise import AnaliseAvaliacoes
+from servicos.cache_respostas import CacheRespostas
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    Restaurante.carregar_dados()
+    carga = Restaurante.carregar_dados()
+    print(
+        f"[Carga] {carga['restaurantes']} restaurantes, "
+        f"{carga['avaliacoes']} avaliações e "
+        f"{carga['itens_cardapio']} itens de cardápio "
+        f"em {carga['segundos']:.3f}s"
+    )
+    if Restaurante.INTERVALO_FLUSH_MS > 0:
+        Restaurante.iniciar_agendador(Restaurante.INTERVALO_FLUSH_MS)
     yield
-    Restaurante.salvar_dados()
+    await Restaurante.encerrar_async()
+
+
+async def sincronizar_processos() -> None:
+    """
+    No modo multiprocesso, incorpora as mutações dos outros workers antes
+    de cada requisição.
+    """
+    await Restaurante.sincronizar_async()
+
+
+app = FastAPI(
+    lifespan=lifespan,
+    title="Saborexpress API",
+    dependencies=[Depends(sincronizar_processos)],
+)
+
+
+@app.exception_handler(RestauranteRemovido)
+async def restaurante_removido(
+    request: Request, exc: RestauranteRemovido
+) -> JSONResponse:
+    """
+    Modo multiprocesso: o restaurante foi removido por outro worker entre
+    a consulta do handler e a mutação.
+    """
+    return JSONResponse(status_code=404, content={"detail": str(exc)})
+
+
+# Tamanho máximo, em bytes, de uma linha da importação NDJSON
+LIMITE_LINHA_NDJSON = 1024 * 1024
+# Respostas de leitura serializadas uma vez por geração do estado
+cache_respostas = CacheRespostas(lambda: Restaurante.geracao)
+detalhes_adapter = TypeAdapter(List[RestaurantDetail])
+resumo_adapter = TypeAdapter(List[RestaurantSummary])
+ranking_adapter = TypeAdapter(List[RestaurantRanking])
+# Arrays NumPy das notas, remontados apenas quando a geração muda
+analise_avaliacoes = AnaliseAvaliacoes(
+    lambda: Restaurante.geracao, lambda: Restaurante.restaurantes
+)
+
 
+def _etag_corresponde(request: Request, etag: str) -> bool:
+    """
+    Indica se o cabeçalho If-None-Match da requisição inclui o ETag.
+    """
+    cabecalho = request.headers.get("if-none-match")
+    if not cabecalho:
+        return False
+    etags = [e.strip().removeprefix("W/") for e in cabecalho.split(",")]
+    return "*" in etags or etag in etags
+
+
+def _resposta_em_cache(
+    request: Request,
+    chave: Hashable,
+    construir: Callable[[], Tuple[bytes, Dict[str, str]]],
+) -> Response:
+    """
+    Responde com o JSON em cache para a geração atual (ou 304 se o
+    cliente já o possui), sem refazer dicts nem validação Pydantic.
+    ``construir`` retorna o corpo serializado e cabeçalhos extras.
+    """
+    etag = cache_respostas.etag(chave)
+    if _etag_corresponde(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    (corpo, cabecalhos), etag = cache_respostas.obter(chave, construir)
+    return Response(
+        content=corpo,
+        media_type="application/json",
+        headers={**cabecalhos, "ETag": etag},
+    )
+
+
+def _cursor(restaurante: Restaurante) -> str:
+    """
+    Cursor opaco que retoma a listagem após o restaurante: sua posição na
+    ordem de cadastro (_seq), que continua válida se ele for removido.
+    """
+    return f"s{restaurante._seq}"
 
-app = FastAPI(lifespan=lifespan, title="Saborexpress API")
+
+def _ler_cursor(cursor: str) -> int:
+    """
+    Decodifica um cursor de _cursor().
+
+    Raises:
+    - HTTPException: 400 se o cursor não tiver o formato esperado.
+    """
+    if cursor.startswith("s") and cursor[1:].isdecimal():
+        return int(cursor[1:])
+    raise HTTPException(status_code=400, detail=f"Cursor '{cursor}' inválido.")
+
+
+def _item_do_schema(item: MenuItem) -> ItemCardapio:
+    """
+    Constrói o item do cardápio (Prato, Bebida ou Sobremesa) validado.
+    """
+    cls_map: Dict[str, Type[ItemCardapio]] = {
+        "Prato": Prato,
+        "Bebida": Bebida,
+        "Sobremesa": Sobremesa,
+    }
+    cls_item = cls_map.get(item.type, ItemCardapio)
+    # Cria um dicionário de kwargs baseado no tipo fornecido.
+    data = item.model_dump()
+    return cls_item.from_dict({**data, "__type__": item.type})
+
+
+def _linha_longa() -> HTTPException:
+    """
+    Erro para uma linha do NDJSON acima de LIMITE_LINHA_NDJSON.
+    """
+    return HTTPException(
+        status_code=413,
+        detail=f"Linha maior que {LIMITE_LINHA_NDJSON} bytes.",
+    )
+
+
+async def _linhas_ndjson(request: Request) -> AsyncIterator[bytes]:
+    """
+    Linhas do corpo da requisição, à medida que chegam. Cada bloco é
+    percorrido uma única vez: só o trecho da linha incompleta fica no
+    buffer entre um bloco e outro.
+
+    Raises:
+    - HTTPException: 413 se uma linha passar de LIMITE_LINHA_NDJSON bytes.
+    """
+    pendente = bytearray()
+    async for bloco in request.stream():
+        inicio = 0
+        procura = len(pendente)
+        pendente += bloco
+        while (fim := pendente.find(b"\n", procura)) >= 0:
+            if fim - inicio > LIMITE_LINHA_NDJSON:
+                raise _linha_longa()
+            yield bytes(pendente[inicio:fim])
+            inicio = procura = fim + 1
+        del pendente[:inicio]
+        if len(pendente) > LIMITE_LINHA_NDJSON:
+            raise _linha_longa()
+    yield bytes(pendente)
 
 
 @app.post("/restaurants", status_code=201, summary="Cria restaurante")
 async def create_restaurant(data: CreateRestaurant):
-    if any(
-        r._nome.lower() == data.nome.lower() for r in Restaurante.restaurantes
-    ):
-        raise HTTPException(
-            status_code=400, detail=f"O restaurante '{data.nome}' já existe."
-        )
-    Restaurante(data.nome, data.categoria)
-    Restaurante.salvar_dados()
+    try:
+        async with Restaurante.transacao_async():
+            Restaurante.cadastrar(data.nome, data.categoria)
+    except ValueError as e:
+        # Nome já cadastrado (conferido sob a trava entre processos)
+        raise HTTPException(status_code=400, detail=str(e))
     return {"message": f"Restaurante '{data.nome}' cadastrado com sucesso."}
 
 
+@app.post(
+    "/restaurants/import",
+    response_model=ImportResult,
+    summary="Importa restaurantes em lote (NDJSON)",
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/x-ndjson": {"schema": {"type": "string"}}}
+        }
+    },
+)
+async def import_restaurants(request: Request):
+    """
+    Importa um restaurante por linha (ImportRestaurant, com cardápio e
+    avaliações), lendo o corpo em streaming. Nomes já existentes (sem
+    distinção de maiúsculas, como no cadastro) e linhas inválidas são
+    ignorados e relatados; tudo é gravado em um único flush.
+    """
+    inicio = time.perf_counter()
+    criados = 0
+    duplicados: List[str] = []
+    erros: List[Dict[str, object]] = []
+    async with Restaurante.transacao_async():
+        numero = 0
+        async for linha in _linhas_ndjson(request):
+            numero += 1
+            if not linha.strip():
+                continue
+            try:
+                data = ImportRestaurant.model_validate_json(linha)
+            except ValidationError as e:
+                erros.append({"linha": numero, "detalhe": str(e)})
+                continue
+            try:
+                r = Restaurante.cadastrar(data.nome, data.categoria)
+            except ValueError:
+                duplicados.append(data.nome)
+                continue
+            if data.ativo:
+                r.alternar_estado()
+            for item in data.cardapio:
+                r.adicionar_ao_cardapio(_item_do_schema(item))
+            for rating in data.avaliacoes:
+                r.receber_avaliacao(rating.cliente, rating.nota)
+            criados += 1
+    return {
+        "criados": criados,
+        "duplicados": duplicados,
+        "erros": erros,
+        "segundos": round(time.perf_counter() - inicio, 6),
+    }
+
+
 @app.get(
     "/restaurants",
     response_model=List[RestaurantDetail],
     summary="Lista completa de restaurantes",
 )
-async def list_restaurants():
-    def to_dict(r: Restaurante):
-        return {
-            "nome": r._nome,
-            "categoria": r._categoria,
-            "ativo": r._ativo,
-            "avaliacoes": [
-                {"cliente": a._cliente, "nota": a._nota} for a in r._avaliacao
-            ],
-            "cardapio": [item.to_dict() for item in r._cardapio],
-        }
+async def list_restaurants(
+    request: Request,
+    limit: Optional[int] = Query(
+        None, ge=1, description="Quantidade máxima de restaurantes"
+    ),
+    after: Optional[str] = Query(
+        None,
+        description=(
+            "Cursor opaco da próxima página (cabeçalho X-Next-Cursor da"
+            " página anterior)"
+        ),
+    ),
+    categoria: Optional[str] = Query(None, description="Filtra a categoria"),
+    ativo: Optional[bool] = Query(None, description="Filtra a situação"),
+    exclude: List[CampoDetalhe] = Query(
+        [], description="Campos omitidos da resposta"
+    ),
+    max_avaliacoes: Optional[int] = Query(
+        None, ge=0, description="Limita às N avaliações mais recentes"
+    ),
+    max_cardapio: Optional[int] = Query(
+        None, ge=0, description="Limita aos N primeiros itens do cardápio"
+    ),
+):
+    """
+    Lista restaurantes com paginação por cursor, filtros por categoria e
+    situação e seleção dos campos detalhados.
+    """
+    apos = None
+    if after is not None:
+        apos = _ler_cursor(after)
+    if CampoDetalhe.AVALIACOES in exclude:
+        max_avaliacoes = 0
+    if CampoDetalhe.CARDAPIO in exclude:
+        max_cardapio = 0
+    omitidos = {campo.value for campo in exclude}
 
-    return [to_dict(r) for r in Restaurante.restaurantes]
+    def construir() -> Tuple[bytes, Dict[str, str]]:
+        pagina = Restaurante.filtrar(
+            categoria, ativo, apos, limit + 1 if limit else None
+        )
+        cabecalhos = {}
+        if limit is not None and len(pagina) > limit:
+            pagina = pagina[:limit]
+            cabecalhos["X-Next-Cursor"] = _cursor(pagina[-1])
+        dados = [r.to_dict(max_avaliacoes, max_cardapio) for r in pagina]
+        corpo = detalhes_adapter.dump_json(
+            detalhes_adapter.validate_python(dados),
+            by_alias=True,
+            exclude={"__all__": omitidos} if omitidos else None,
+        )
+        return corpo, cabecalhos
+
+    chave = (
+        "detalhes", limit, after, categoria, ativo,
+        frozenset(omitidos), max_avaliacoes, max_cardapio,
+    )
+    return _resposta_em_cache(request, chave, construir)
 
 
 @app.get(
@@ -68,19 +329,166 @@ async def list_restaurants():
     response_model=List[RestaurantSummary],
     summary="Lista sumarizada de restaurantes",
 )
-async def summary_restaurants():
-    """Retorna resumo (nome, categoria, situaçao e média de avaliações)"""
+async def summary_restaurants(
+    request: Request,
+    categoria: Optional[str] = Query(None, description="Filtra a categoria"),
+    ativo: Optional[bool] = Query(None, description="Filtra a situação"),
+):
+    """
+    Retorna resumo (nome, categoria, situaçao e média de avaliações),
+    opcionalmente filtrado pelos índices de categoria e situação.
+    """
+
+    def construir() -> Tuple[bytes, Dict[str, str]]:
+        dados = [
+            {
+                "nome": r._nome,
+                "categoria": r._categoria,
+                "ativo": r.ativo,
+                "media_avaliacoes": r.media_avaliacoes,
+            }
+            for r in Restaurante.filtrar(categoria, ativo)
+        ]
+        corpo = resumo_adapter.dump_json(
+            resumo_adapter.validate_python(dados), by_alias=True
+        )
+        return corpo, {}
+
+    return _resposta_em_cache(
+        request, ("resumo", categoria, ativo), construir
+    )
+
+
+@app.get(
+    "/restaurants/top",
+    response_model=List[RestaurantRanking],
+    summary="Restaurantes mais bem avaliados",
+)
+async def top_restaurants(
+    request: Request,
+    categoria: Optional[str] = Query(None, description="Filtra a categoria"),
+    k: int = Query(10, ge=1, le=100, description="Tamanho do ranking"),
+    min_reviews: int = Query(
+        1, ge=1, description="Quantidade mínima de avaliações"
+    ),
+):
+    """
+    Ranking pela média das avaliações, lido do índice mantido a cada
+    avaliação em vez de ordenar o catálogo por requisição.
+    """
+
+    def construir() -> Tuple[bytes, Dict[str, str]]:
+        dados = [
+            {
+                "nome": r._nome,
+                "categoria": r._categoria,
+                "ativo": r.ativo,
+                "media_avaliacoes": r.media_avaliacoes,
+                "quantidade_avaliacoes": r._qtd_avaliacoes,
+            }
+            for r in Restaurante.melhores(categoria, k, min_reviews)
+        ]
+        corpo = ranking_adapter.dump_json(
+            ranking_adapter.validate_python(dados), by_alias=True
+        )
+        return corpo, {}
+
+    chave = ("ranking", categoria, k, min_reviews)
+    return _resposta_em_cache(request, chave, construir)
+
+
+@app.get(
+    "/restaurants/export",
+    summary="Exporta o catálogo completo em streaming",
+    response_class=StreamingResponse,
+)
+async def export_restaurants(
+    formato: FormatoExportacao = Query(
+        FormatoExportacao.JSON, description="Array JSON ou NDJSON"
+    ),
+):
+    """
+    Envia cada restaurante assim que é serializado, mantendo a memória
+    constante independentemente do tamanho do catálogo.
+    """
+
+    def linhas() -> Iterator[str]:
+        for r in Restaurante.iterar():
+            yield json.dumps(r.to_dict(), ensure_ascii=False) + "\n"
+
+    def array_json() -> Iterator[str]:
+        separador = "["
+        for linha in linhas():
+            yield separador + linha
+            separador = ","
+        yield "[]\n" if separador == "[" else "]\n"
+
+    if formato == FormatoExportacao.NDJSON:
+        return StreamingResponse(linhas(), media_type="application/x-ndjson")
+    return StreamingResponse(array_json(), media_type="application/json")
+
+
+@app.get(
+    "/menu/search",
+    response_model=List[MenuSearchResult],
+    response_model_by_alias=True,
+    summary="Busca itens de cardápio em todos os restaurantes",
+)
+async def search_menu(
+    q: str = Query(
+        ..., min_length=1, description="Palavras ou prefixos buscados"
+    ),
+    type: Optional[ItemType] = Query(None, description="Tipo do item"),
+    max_preco: Optional[float] = Query(
+        None, ge=0, description="Preço máximo"
+    ),
+    limit: int = Query(50, ge=1, le=500, description="Máximo de itens"),
+):
+    """
+    Busca pelo índice invertido de nomes e descrições, ignorando acentos e
+    maiúsculas; cada palavra da consulta casa como prefixo.
+    """
+    encontrados = Restaurante.buscar_itens(
+        q, type.value if type else None, max_preco, limit
+    )
     return [
-        {
-            "nome": r._nome,
-            "categoria": r._categoria,
-            "ativo": r.ativo,
-            "media_avaliacoes": r.media_avaliacoes,
-        }
-        for r in Restaurante.restaurantes
+        {"restaurante": r._nome, "item": item.to_dict()}
+        for r, item in encontrados
     ]
 
 
+@app.get(
+    "/analytics/ratings",
+    response_model=AnaliseAvaliacoesSchema,
+    summary="Estatísticas das avaliações",
+)
+async def ratings_analytics(
+    request: Request,
+    percentis: List[float] = Query(
+        [25, 75, 90], description="Percentis calculados (0 a 100)"
+    ),
+):
+    """
+    Média, mediana, desvio padrão, percentis e histograma das notas por
+    restaurante, por categoria e no total, calculados de forma vetorizada.
+    """
+    if any(not 0 <= p <= 100 for p in percentis):
+        raise HTTPException(
+            status_code=400, detail="Percentis devem estar entre 0 e 100."
+        )
+
+    def construir() -> Tuple[bytes, Dict[str, str]]:
+        relatorio = analise_avaliacoes.relatorio(percentis)
+        corpo = AnaliseAvaliacoesSchema.model_validate(
+            relatorio
+        ).model_dump_json()
+        return corpo.encode(), {}
+
+    return _resposta_em_cache(
+        request, ("analise", tuple(percentis)), construir
+    )
+
+
 @app.patch(
     "/restaurants/{nome}/toggle",
     summary="Alterna estado do restaurante - 🟢 / 🔴",
@@ -88,14 +496,14 @@ async def summary_restaurants():
 async def toggle_restaurant(
     nome: str = Path(..., description="Nome do restaurante")
 ):
-    for r in Restaurante.restaurantes:
-        if r._nome.lower() == nome.lower():
-            msg = r.alternar_estado()
-            Restaurante.salvar_dados()
-            return {"message": msg}
-    raise HTTPException(
-        status_code=404, detail=f"Restaurante '{nome}' não encontrado."
-    )
+    r = Restaurante.buscar_por_nome(nome)
+    if r is None:
+        raise HTTPException(
+            status_code=404, detail=f"Restaurante '{nome}' não encontrado."
+        )
+    async with Restaurante.transacao_async():
+        msg = r.alternar_estado()
+    return {"message": msg}
 
 
 @app.post("/restaurants/{nome}/rating", summary="Avalia restaurante")
@@ -109,15 +517,15 @@ async def rate_restaurant(
             status_code=422,
             detail=["Value error, a nota deve ser um número entre 1 e 5."],
         )
-    for r in Restaurante.restaurantes:
-        if r._nome.lower() == nome.lower():
-            # Registra a avaliação
-            r.receber_avaliacao(rating.cliente, rating.nota)
-            Restaurante.salvar_dados()
-            return {"message": f"Avaliação registrada para '{nome}'."}
-    raise HTTPException(
-        status_code=404, detail=f"Restaurante '{nome}' não encontrado."
-    )
+    r = Restaurante.buscar_por_nome(nome)
+    if r is None:
+        raise HTTPException(
+            status_code=404, detail=f"Restaurante '{nome}' não encontrado."
+        )
+    # Registra a avaliação
+    async with Restaurante.transacao_async():
+        r.receber_avaliacao(rating.cliente, rating.nota)
+    return {"message": f"Avaliação registrada para '{nome}'."}
 
 
 @app.post(
@@ -129,37 +537,30 @@ async def add_menu_item(
     nome: str = Path(..., description="Nome do restaurante"),
     item: MenuItem = Body(...),
 ):
-    for r in Restaurante.restaurantes:
-        if r._nome.lower() == nome.lower():
-            cls_map: Dict[str, Type[ItemCardapio]] = {
-                "Prato": Prato,
-                "Bebida": Bebida,
-                "Sobremesa": Sobremesa,
-            }
-            cls_item = cls_map.get(item.type, ItemCardapio)
-            # Cria um dicionário de kwargs baseado no tipo fornecido.
-            data = item.model_dump()
-            new_item = cls_item.from_dict({**data, "__type__": item.type})
-            r.adicionar_ao_cardapio(new_item)
-            return {
-                "message": (
-                    f"Item '{item.nome}' adicionado ao cardápio"
-                    f" de '{nome}'."
-                )
-            }
-    raise HTTPException(
-        status_code=404, detail=f"Restaurante '{nome}' não encontrado."
-    )
+    r = Restaurante.buscar_por_nome(nome)
+    if r is None:
+        raise HTTPException(
+            status_code=404, detail=f"Restaurante '{nome}' não encontrado."
+        )
+    new_item = _item_do_schema(item)
+    async with Restaurante.transacao_async():
+        r.adicionar_ao_cardapio(new_item)
+    return {
+        "message": (
+            f"Item '{item.nome}' adicionado ao cardápio"
+            f" de '{nome}'."
+        )
+    }
 
 
 @app.get("/restaurants/{nome}/menu", summary="Obtém o cardápio do restaurante")
 async def get_menu(nome: str = Path(..., description="Nome do restaurante")):
-    for r in Restaurante.restaurantes:
-        if r._nome.lower() == nome.lower():
-            return [item.to_dict() for item in r._cardapio]
-    raise HTTPException(
-        status_code=404, detail=f"Restaurante '{nome}' não encontrado."
-    )
+    r = Restaurante.buscar_por_nome(nome)
+    if r is None:
+        raise HTTPException(
+            status_code=404, detail=f"Restaurante '{nome}' não encontrado."
+        )
+    return [item.to_dict() for item in r._cardapio]
 
 
 @app.patch(
@@ -172,26 +573,68 @@ async def apply_discount(
     nome: str = Path(..., description="Nome do restaurante"),
     item_nome: str = Path(..., description="Nome do item do cardápio"),
 ):
-    for r in Restaurante.restaurantes:
-        if r._nome.lower() == nome.lower():
-            for item in r._cardapio:
-                if item._nome.lower() == item_nome.lower():
-                    item.aplicar_desconto()
-                    Restaurante.salvar_dados()
-                    return {
-                        "message": (
-                            f"Desconto aplicado em '{item_nome}'"
-                            f" de '{nome}'."
-                        ),
-                        "item": item.to_dict(),
-                    }
-            raise HTTPException(
-                status_code=404,
-                detail=f"Item '{item_nome}' não encontrado em '{nome}'.",
-            )
-    raise HTTPException(
-        status_code=404, detail=f"Restaurante '{nome}' não encontrado."
-    )
+    r = Restaurante.buscar_por_nome(nome)
+    if r is None:
+        raise HTTPException(
+            status_code=404, detail=f"Restaurante '{nome}' não encontrado."
+        )
+    async with Restaurante.transacao_async():
+        item = r.aplicar_desconto_item(item_nome)
+    if item is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Item '{item_nome}' não encontrado em '{nome}'.",
+        )
+    return {
+        "message": (
+            f"Desconto aplicado em '{item_nome}'"
+            f" de '{nome}'."
+        ),
+        "item": item.to_dict(),
+    }
+
+
+@app.patch(
+    "/menu/discount",
+    response_model=BulkDiscountResult,
+    summary="Aplica desconto em lote",
+)
+async def apply_bulk_discount(filtros: BulkDiscount = Body(...)):
+    """
+    Aplica o desconto a todos os itens que atendem aos filtros, nos
+    restaurantes selecionados, com uma única gravação ao final.
+    """
+    inicio = time.perf_counter()
+    nao_encontrados: List[str] = []
+    if filtros.restaurantes is not None:
+        restaurantes = []
+        vistos = set()
+        for nome in filtros.restaurantes:
+            r = Restaurante.buscar_por_nome(nome)
+            if r is None:
+                nao_encontrados.append(nome)
+            elif r._seq in vistos:
+                continue
+            elif (
+                filtros.categoria is None
+                or r._categoria.casefold() == filtros.categoria.casefold()
+            ) and (filtros.ativo is None or r._ativo == filtros.ativo):
+                vistos.add(r._seq)
+                restaurantes.append(r)
+    else:
+        restaurantes = Restaurante.filtrar(filtros.categoria, filtros.ativo)
+    async with Restaurante.transacao_async():
+        resultado = Restaurante.aplicar_desconto_em_lote(
+            restaurantes,
+            filtros.type.value if filtros.type else None,
+            filtros.itens,
+        )
+    return {
+        "restaurantes_alterados": resultado["restaurantes"],
+        "itens_com_desconto": resultado["itens"],
+        "nao_encontrados": nao_encontrados,
+        "segundos": round(time.perf_counter() - inicio, 6),
+    }
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -0,0 +1,74 @@
+# modelos/agendador.py
+
+import threading
+import time
+from typing import Callable, Optional
+
+
+class AgendadorFlush:
+    """
+    Agrupa pedidos de gravação e executa o flush em uma thread de fundo,
+    no máximo uma vez a cada intervalo.
+
+    Attributes:
+        intervalo (float): Intervalo mínimo entre flushes, em segundos.
+    """
+
+    def __init__(self, flush: Callable[[], object], intervalo_ms: int):
+        """
+        Inicializa uma instância de AgendadorFlush.
+
+        Inputs:
+        - flush (Callable): Função que grava o estado sujo.
+        - intervalo_ms (int): Intervalo mínimo entre flushes, em ms.
+        """
+        self._flush = flush
+        self.intervalo = intervalo_ms / 1000
+        self._sujo = threading.Event()
+        self._parada = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self) -> None:
+        """
+        Inicia a thread de gravação.
+        """
+        self._parada.clear()
+        self._thread = threading.Thread(
+            target=self._executar, name="agendador-flush", daemon=True
+        )
+        self._thread.start()
+
+    def agendar(self) -> None:
+        """
+        Sinaliza que há estado sujo; pedidos feitos antes do próximo flush
+        são coalescidos em uma única gravação.
+        """
+        self._sujo.set()
+
+    def parar(self) -> None:
+        """
+        Encerra a thread e executa um flush final com o que estiver
+        pendente.
+        """
+        self._parada.set()
+        self._sujo.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._flush()
+
+    def _executar(self) -> None:
+        ultimo_flush = 0.0
+        while True:
+            self._sujo.wait()
+            espera = ultimo_flush + self.intervalo - time.monotonic()
+            if self._parada.wait(max(espera, 0)):
+                return
+            self._sujo.clear()
+            try:
+                self._flush()
+            except Exception as e:
+                # Mantém o estado sujo para a próxima tentativa
+                print(f"[Erro no flush agendado] {e}")
+                self._sujo.set()
+            ultimo_flush = time.monotonic()
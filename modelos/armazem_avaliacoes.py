@@ -0,0 +1,173 @@
+# modelos/armazem_avaliacoes.py
+
+import sys
+import threading
+from array import array
+from typing import Dict, Iterator, List, Optional, Union
+
+from modelos.avaliacao import Avaliacao
+
+
+class ListaAvaliacoes(list):
+    """
+    Armazém padrão de avaliações: uma lista de objetos Avaliacao.
+    """
+
+    __slots__ = ()
+
+    somente_leitura = False
+
+    def anexar(self, cliente: str, nota: float) -> None:
+        """
+        Acrescenta uma avaliação.
+        """
+        self.append(Avaliacao(cliente, nota))
+
+    def para_dicts(
+        self, inicio: int = 0, fim: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Serializa as avaliações das posições ``inicio`` a ``fim``.
+        """
+        return [
+            {"cliente": a._cliente, "nota": a._nota}
+            for a in self[inicio:fim]
+        ]
+
+    def notas(self) -> List[float]:
+        """
+        Notas das avaliações, na ordem de chegada.
+        """
+        return [a._nota for a in self]
+
+    def bytes_estimados(self) -> int:
+        """
+        Estimativa da memória ocupada (lista, objetos e seus campos).
+        """
+        return sys.getsizeof(self) + sum(
+            sys.getsizeof(a) + sys.getsizeof(a._cliente)
+            + sys.getsizeof(a._nota)
+            for a in self
+        )
+
+    def bytes_ultima(self) -> int:
+        """
+        Estimativa em O(1) do que a última avaliação anexada acrescentou a
+        bytes_estimados() (objeto, campos e posição na lista).
+        """
+        a = self[-1]
+        return (
+            8 + sys.getsizeof(a) + sys.getsizeof(a._cliente)
+            + sys.getsizeof(a._nota)
+        )
+
+
+class AvaliacoesColunares:
+    """
+    Armazém colunar de avaliações: as notas ficam em um ``array('d')`` e
+    os clientes em um ``array('I')`` de ids, codificados por um
+    dicionário de nomes compartilhado entre todos os restaurantes.
+    Oferece a mesma interface de ListaAvaliacoes; as notas são guardadas
+    como float.
+    """
+
+    __slots__ = ("_notas", "_clientes")
+
+    somente_leitura = False
+
+    _ids_clientes: Dict[str, int] = {}
+    _nomes_clientes: List[str] = []
+    _trava_clientes = threading.Lock()
+
+    def __init__(self):
+        """
+        Inicializa um armazém vazio.
+        """
+        self._notas = array("d")
+        self._clientes = array("I")
+
+    @classmethod
+    def _id_cliente(cls, cliente: str) -> int:
+        id_cliente = cls._ids_clientes.get(cliente)
+        if id_cliente is None:
+            with cls._trava_clientes:
+                id_cliente = cls._ids_clientes.get(cliente)
+                if id_cliente is None:
+                    id_cliente = len(cls._nomes_clientes)
+                    cls._nomes_clientes.append(cliente)
+                    cls._ids_clientes[cliente] = id_cliente
+        return id_cliente
+
+    def anexar(self, cliente: str, nota: float) -> None:
+        """
+        Acrescenta uma avaliação.
+        """
+        self._clientes.append(self._id_cliente(cliente))
+        self._notas.append(nota)
+
+    def append(self, avaliacao: Avaliacao) -> None:
+        """
+        Acrescenta uma avaliação já instanciada (compatível com list).
+        """
+        self.anexar(avaliacao._cliente, avaliacao._nota)
+
+    def para_dicts(
+        self, inicio: int = 0, fim: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Serializa as avaliações das posições ``inicio`` a ``fim``.
+        """
+        nomes = self._nomes_clientes
+        return [
+            {"cliente": nomes[c], "nota": n}
+            for c, n in zip(
+                self._clientes[inicio:fim], self._notas[inicio:fim]
+            )
+        ]
+
+    def notas(self) -> array:
+        """
+        Coluna de notas (não alterar diretamente).
+        """
+        return self._notas
+
+    def bytes_estimados(self) -> int:
+        """
+        Estimativa da memória ocupada pelas duas colunas (os nomes dos
+        clientes são compartilhados entre os restaurantes).
+        """
+        return sys.getsizeof(self._notas) + sys.getsizeof(self._clientes)
+
+    def bytes_ultima(self) -> int:
+        """
+        O que a última avaliação anexada acrescentou às colunas.
+        """
+        return self._notas.itemsize + self._clientes.itemsize
+
+    def __len__(self) -> int:
+        return len(self._notas)
+
+    def __iter__(self) -> Iterator[Avaliacao]:
+        nomes = self._nomes_clientes
+        for c, n in zip(self._clientes, self._notas):
+            yield Avaliacao(nomes[c], n)
+
+    def __getitem__(
+        self, i: Union[int, slice]
+    ) -> Union[Avaliacao, List[Avaliacao]]:
+        nomes = self._nomes_clientes
+        if isinstance(i, slice):
+            return [
+                Avaliacao(nomes[c], n)
+                for c, n in zip(self._clientes[i], self._notas[i])
+            ]
+        return Avaliacao(nomes[self._clientes[i]], self._notas[i])
+
+
+def novo_armazem(tipo: str) -> Union[ListaAvaliacoes, AvaliacoesColunares]:
+    """
+    Cria o armazém de avaliações do tipo indicado ("lista" ou "colunar").
+    """
+    if tipo == "colunar":
+        return AvaliacoesColunares()
+    return ListaAvaliacoes()
@@ -9,6 +9,8 @@ class Avaliacao:
         _nota (float): Nota atribuída ao restaurante.
     """
 
+    __slots__ = ("_cliente", "_nota")
+
     def __init__(self, cliente: str, nota: float):
         """
         Inicializa uma instância de Avaliacao.
@@ -0,0 +1,179 @@
+# modelos/busca.py
+
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from modelos.cardapio.item_cardapio import ItemCardapio
+
+_PALAVRA = re.compile(r"\w+")
+
+
+def normalizar(texto: str) -> str:
+    """
+    Remove acentos e diferenças de maiúsculas ("Pão" -> "pao").
+    """
+    decomposto = unicodedata.normalize("NFKD", texto)
+    return "".join(
+        c for c in decomposto if not unicodedata.combining(c)
+    ).casefold()
+
+
+def tokenizar(texto: str) -> List[str]:
+    """
+    Palavras normalizadas do texto, na ordem em que aparecem.
+    """
+    return _PALAVRA.findall(normalizar(texto))
+
+
+class _Entrada:
+    """
+    O que o índice guarda de um item: o necessário para filtrar e ordenar
+    os resultados, sem referência ao objeto do item (que pode ser
+    descartado e relido da fonte).
+    """
+
+    __slots__ = ("restaurante", "posicao", "palavras", "preco", "tipo",
+                 "chave_nome")
+
+    def __init__(self, restaurante: Any, posicao: int, item: ItemCardapio):
+        self.restaurante = restaurante
+        self.posicao = posicao
+        self.palavras = set(
+            tokenizar(f"{item._nome} {getattr(item, 'descricao', '') or ''}")
+        )
+        self.preco = item._preco
+        self.tipo = type(item).__name__
+        self.chave_nome = normalizar(item._nome)
+
+    def ordem(self) -> tuple:
+        """
+        Chave de ordenação dos resultados da busca: restaurante (ordem de
+        cadastro), nome do item e posição no cardápio.
+        """
+        return self.restaurante._seq, self.chave_nome, self.posicao
+
+
+class IndiceCardapio:
+    """
+    Índice invertido dos itens de cardápio de todos os restaurantes, pelas
+    palavras do nome e da descrição. Cada palavra da consulta casa com
+    qualquer palavra indexada que comece com ela.
+
+    Os itens são identificados pela posição no cardápio do restaurante
+    (que só cresce), e não pelo objeto: as entradas continuam válidas
+    quando o cardápio é descarregado da memória e relido da fonte.
+    """
+
+    def __init__(self):
+        """
+        Inicializa um índice vazio.
+        """
+        self._postagens: Dict[str, Set[_Entrada]] = {}
+        # Vocabulário ordenado, para achar por bisect as palavras com um
+        # prefixo
+        self._vocabulario: List[str] = []
+        # restaurante -> entradas, na ordem do cardápio
+        self._por_restaurante: Dict[Any, List[_Entrada]] = {}
+
+    def adicionar(self, restaurante: Any, item: ItemCardapio) -> None:
+        """
+        Indexa o próximo item do cardápio do restaurante (os itens devem
+        ser adicionados na ordem do cardápio).
+        """
+        entradas = self._por_restaurante.setdefault(restaurante, [])
+        entrada = _Entrada(restaurante, len(entradas), item)
+        entradas.append(entrada)
+        for palavra in entrada.palavras:
+            postagem = self._postagens.get(palavra)
+            if postagem is None:
+                postagem = self._postagens[palavra] = set()
+                insort(self._vocabulario, palavra)
+            postagem.add(entrada)
+
+    def remover_restaurante(self, restaurante: Any) -> None:
+        """
+        Retira todos os itens do cardápio do restaurante, sem lê-lo.
+        """
+        for entrada in self._por_restaurante.pop(restaurante, ()):
+            for palavra in entrada.palavras:
+                postagem = self._postagens[palavra]
+                postagem.discard(entrada)
+                if not postagem:
+                    del self._postagens[palavra]
+                    del self._vocabulario[
+                        bisect_left(self._vocabulario, palavra)
+                    ]
+
+    def atualizar_preco(
+        self, restaurante: Any, posicao: int, preco: float
+    ) -> None:
+        """
+        Registra o preço atual do item na posição do cardápio (ex.: após
+        um desconto).
+        """
+        entradas = self._por_restaurante.get(restaurante)
+        if entradas is not None and posicao < len(entradas):
+            entradas[posicao].preco = preco
+
+    def _com_prefixo(self, prefixo: str) -> Set[_Entrada]:
+        vocabulario = self._vocabulario
+        i = bisect_left(vocabulario, prefixo)
+        encontrados: Set[_Entrada] = set()
+        # Percorre por índice, sem copiar o restante do vocabulário, até a
+        # primeira palavra sem o prefixo
+        while i < len(vocabulario) and vocabulario[i].startswith(prefixo):
+            encontrados |= self._postagens[vocabulario[i]]
+            i += 1
+        return encontrados
+
+    def buscar(
+        self,
+        consulta: str,
+        tipo: Optional[str] = None,
+        max_preco: Optional[float] = None,
+        limite: Optional[int] = None,
+    ) -> List[Tuple[Any, int]]:
+        """
+        Itens que contêm todas as palavras da consulta (como prefixo),
+        ordenados por restaurante (ordem de cadastro) e nome do item.
+
+        Inputs:
+        - consulta (str): Texto buscado; acentos e maiúsculas são
+          ignorados.
+        - tipo (str | None): Restringe ao tipo ("Prato", "Bebida" ou
+          "Sobremesa").
+        - max_preco (float | None): Preço máximo.
+        - limite (int | None): Quantidade máxima de resultados.
+
+        Returns:
+        - List[Tuple[Restaurante, int]]: Restaurante e posição do item no
+          cardápio de cada resultado.
+        """
+        palavras = tokenizar(consulta)
+        if not palavras:
+            return []
+        # Começa pelo prefixo mais longo, em geral o mais seletivo
+        palavras.sort(key=len, reverse=True)
+        entradas = self._com_prefixo(palavras[0])
+        for palavra in palavras[1:]:
+            if not entradas:
+                break
+            entradas &= self._com_prefixo(palavra)
+
+        resultado = [
+            e for e in entradas
+            if (tipo is None or e.tipo == tipo)
+            and (max_preco is None or e.preco <= max_preco)
+        ]
+        resultado.sort(key=_Entrada.ordem)
+        return [(e.restaurante, e.posicao) for e in resultado[:limite]]
+
+    def limpar(self) -> None:
+        """
+        Esvazia o índice.
+        """
+        self._postagens.clear()
+        self._vocabulario.clear()
+        self._por_restaurante.clear()
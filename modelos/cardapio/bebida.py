@@ -14,6 +14,8 @@ class Bebida(ItemCardapio):
         tamanho (float): Tamanho bebida.
     '''
 
+    __slots__ = ('tamanho',)
+
     def __init__(self, nome: str, preco: float, tamanho: str):
         '''
         Inicializa uma instância de Bebida.
@@ -32,6 +34,7 @@ class Bebida(ItemCardapio):
     def aplicar_desconto(self):
         self._preco -= (self._preco * 0.08)
         self._preco = round(self._preco, 2)
+        self._invalidar_dict()
 
     def _campos_adicionais(self) -> dict:
         return {'tamanho': self.tamanho}
@@ -10,8 +10,12 @@ class ItemCardapio(ABC):
     Attributes:
         _nome (str): Nome do item do cardápio.
         _preco (float): Preço do item.
+        _dict (dict | None): Resultado de to_dict() em cache; descartado
+            por _invalidar_dict() sempre que o preço muda.
     '''
 
+    __slots__ = ('_nome', '_preco', '_dict')
+
     def __init__(self, nome: str, preco: float):
         '''
         Inicializa uma instância de ItemCardapio.
@@ -22,6 +26,7 @@ class ItemCardapio(ABC):
         '''
         self._nome: str = nome
         self._preco: float = preco
+        self._dict = None
 
     @abstractmethod
     def aplicar_desconto(self):
@@ -36,13 +41,25 @@ class ItemCardapio(ABC):
         pass
 
     def to_dict(self) -> dict:
-        base = {
-            '__type__': self.__class__.__name__,
-            'nome':     self._nome,
-            'preco':    self._preco,
-        }
-        base.update(self._campos_adicionais())
-        return base
+        '''
+        Serializa o item. O dict é montado uma vez e reaproveitado até a
+        próxima mudança de preço; não deve ser alterado por quem o recebe.
+        '''
+        if self._dict is None:
+            base = {
+                '__type__': self.__class__.__name__,
+                'nome':     self._nome,
+                'preco':    self._preco,
+            }
+            base.update(self._campos_adicionais())
+            self._dict = base
+        return self._dict
+
+    def _invalidar_dict(self) -> None:
+        '''
+        Descarta o to_dict() em cache (chamar ao alterar _preco).
+        '''
+        self._dict = None
 
     @classmethod
     @abstractmethod
@@ -14,6 +14,8 @@ class Prato(ItemCardapio):
         descricao (str): Descrição detalhada do prato.
     '''
 
+    __slots__ = ('descricao',)
+
     def __init__(self, nome: str, preco: float, descricao: str):
         '''
         Inicializa uma instância de Prato.
@@ -32,6 +34,7 @@ class Prato(ItemCardapio):
     def aplicar_desconto(self):
         self._preco -= (self._preco * 0.05)
         self._preco = round(self._preco, 2)
+        self._invalidar_dict()
 
     def _campos_adicionais(self) -> dict:
         return {'descricao': self.descricao}
@@ -16,6 +16,8 @@ class Sobremesa(ItemCardapio):
         tamanho (float): Tamanho da sobremesa.
     '''
 
+    __slots__ = ('descricao', 'tipo', 'tamanho')
+
     def __init__(
             self,
             nome: str,
@@ -44,6 +46,7 @@ class Sobremesa(ItemCardapio):
     def aplicar_desconto(self):
         self._preco -= (self._preco * 0.15)
         self._preco = round(self._preco, 2)
+        self._invalidar_dict()
 
     def _campos_adicionais(self) -> dict:
         return {
@@ -0,0 +1,127 @@
+# modelos/carga_sob_demanda.py
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable, List, NamedTuple, Optional
+
+
+class CabecalhoRestaurante(NamedTuple):
+    """
+    Campos fixos e agregados de um restaurante, lidos do armazenamento sem
+    as avaliações e o cardápio, que ficam nas fontes indicadas:
+
+    - ``avaliacoes``: objeto com ``carregar(tipo)``, que devolve um
+      armazém de avaliações (ver armazem_avaliacoes.novo_armazem);
+    - ``cardapio``: objeto com ``para_dicts(limite=None)``, ``__len__`` e
+      ``imutavel`` (False se o conteúdo puder mudar, como no banco).
+    """
+
+    nome: str
+    categoria: str
+    ativo: bool
+    qtd_avaliacoes: int
+    soma_notas: float
+    nota_min: Optional[float]
+    nota_max: Optional[float]
+    histograma: List[int]
+    avaliacoes: Any
+    cardapio: Any
+
+
+def bytes_itens(itens: Iterable[Any]) -> int:
+    """
+    Estimativa da memória ocupada por itens de cardápio (objeto e valores
+    dos campos).
+    """
+    return sum(
+        sys.getsizeof(item)
+        + sum(sys.getsizeof(v) for v in item.to_dict().values())
+        for item in itens
+    )
+
+
+class CacheMaterializados:
+    """
+    Contabilidade LRU do que foi materializado sob demanda (avaliações e
+    cardápio de cada restaurante), com um orçamento em bytes. O cache não
+    descarta nada por conta própria: registrar() aponta os donos menos
+    usados que excedem o orçamento, e quem chamou os descarrega.
+
+    Attributes:
+        total (int): Bytes estimados de tudo o que está registrado.
+    """
+
+    def __init__(self):
+        """
+        Inicializa um cache vazio.
+        """
+        self._entradas: "OrderedDict[Any, int]" = OrderedDict()
+        self._trava = threading.Lock()
+        self.total = 0
+
+    def registrar(self, dono: Any, tamanho: int, orcamento: int) -> List[Any]:
+        """
+        Registra (ou atualiza) o tamanho materializado de ``dono`` como o
+        uso mais recente.
+
+        Returns:
+        - List: Donos, do menos recente ao mais, cujo descarte traria o
+          total de volta ao orçamento (``dono`` nunca é incluído).
+        """
+        with self._trava:
+            return self._registrar(dono, tamanho, orcamento)
+
+    def acrescentar(
+        self, dono: Any, tamanho: int, orcamento: int
+    ) -> List[Any]:
+        """
+        Soma ``tamanho`` ao que ``dono`` tem registrado, sem recalcular o
+        total dele (ex.: uma avaliação ou item novo), como em registrar().
+        """
+        with self._trava:
+            return self._registrar(
+                dono, self._entradas.get(dono, 0) + tamanho, orcamento
+            )
+
+    def _registrar(self, dono: Any, tamanho: int, orcamento: int) -> List[Any]:
+        self.total += tamanho - self._entradas.pop(dono, 0)
+        self._entradas[dono] = tamanho
+        excesso = self.total - orcamento
+        vitimas = []
+        for candidato, ocupado in self._entradas.items():
+            if excesso <= 0:
+                break
+            if candidato is not dono:
+                vitimas.append(candidato)
+                excesso -= ocupado
+        return vitimas
+
+    def tocar(self, dono: Any) -> None:
+        """
+        Marca ``dono`` como o uso mais recente, se estiver registrado.
+        """
+        with self._trava:
+            if dono in self._entradas:
+                self._entradas.move_to_end(dono)
+
+    def remover(self, dono: Any) -> None:
+        """
+        Retira ``dono`` da contabilidade (após descarregá-lo).
+        """
+        with self._trava:
+            self.total -= self._entradas.pop(dono, 0)
+
+    def limpar(self) -> None:
+        """
+        Esvazia o cache.
+        """
+        with self._trava:
+            self._entradas.clear()
+            self.total = 0
+
+    def __contains__(self, dono: Any) -> bool:
+        return dono in self._entradas
+
+    def __len__(self) -> int:
+        return len(self._entradas)
@@ -0,0 +1,137 @@
+# modelos/concorrencia.py
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Union
+
+
+class TravaCompartilhada:
+    """
+    Trava de leitura/escrita: vários detentores compartilhados ao mesmo
+    tempo ou um único exclusivo. Pedidos exclusivos têm preferência, para
+    não esperarem indefinidamente por um fluxo contínuo de compartilhados.
+
+    É reentrante por thread: quem já detém a trava (em qualquer modo) pode
+    tomá-la de novo no modo compartilhado.
+    """
+
+    def __init__(self):
+        """
+        Inicializa uma trava livre.
+        """
+        self._condicao = threading.Condition(threading.Lock())
+        self._compartilhados = 0
+        self._exclusivo = None
+        self._exclusivos_aguardando = 0
+        self._local = threading.local()
+
+    def _profundidade(self) -> int:
+        return getattr(self._local, "profundidade", 0)
+
+    @contextmanager
+    def compartilhada(self) -> Iterator[None]:
+        """
+        Detém a trava no modo compartilhado durante o bloco.
+        """
+        profundidade = self._profundidade()
+        eu = threading.get_ident()
+        if profundidade or self._exclusivo == eu:
+            self._local.profundidade = profundidade + 1
+            try:
+                yield
+            finally:
+                self._local.profundidade = profundidade
+            return
+
+        with self._condicao:
+            while self._exclusivo is not None or self._exclusivos_aguardando:
+                self._condicao.wait()
+            self._compartilhados += 1
+        self._local.profundidade = 1
+        try:
+            yield
+        finally:
+            self._local.profundidade = 0
+            with self._condicao:
+                self._compartilhados -= 1
+                if not self._compartilhados:
+                    self._condicao.notify_all()
+
+    @contextmanager
+    def exclusiva(self) -> Iterator[None]:
+        """
+        Detém a trava sozinha durante o bloco.
+
+        Raises:
+        - RuntimeError: Se a thread já detiver a trava no modo
+          compartilhado (a espera nunca terminaria).
+        """
+        if self._profundidade():
+            raise RuntimeError("trava compartilhada já detida pela thread")
+        with self._condicao:
+            self._exclusivos_aguardando += 1
+            while self._exclusivo is not None or self._compartilhados:
+                self._condicao.wait()
+            self._exclusivos_aguardando -= 1
+            self._exclusivo = threading.get_ident()
+        try:
+            yield
+        finally:
+            with self._condicao:
+                self._exclusivo = None
+                self._condicao.notify_all()
+
+
+class VisaoRestaurante:
+    """
+    Retrato imutável de um restaurante para serialização fora das
+    travas (copy-on-write): guarda o tamanho do prefixo de avaliações,
+    que só crescem, e os dicts já serializados dos itens, que são
+    substituídos (e não alterados) quando o preço muda. Um cardápio não
+    materializado é guardado como está se a fonte for imutável (snapshot
+    binário) ou lido dela na captura (banco). Guarda também o próprio
+    restaurante e seu contador de alterações, para saber depois se o
+    retrato ainda o reflete.
+    """
+
+    __slots__ = ("_restaurante", "_alteracoes", "_nome", "_categoria",
+                 "_ativo", "_avaliacao", "_qtd_avaliacoes", "_cardapio")
+
+    def __init__(self, restaurante: Any):
+        """
+        Captura o estado atual do restaurante; deve ser chamado sem
+        mutações concorrentes nele.
+        """
+        self._restaurante = restaurante
+        self._alteracoes = restaurante._alteracoes
+        self._nome = restaurante._nome
+        self._categoria = restaurante._categoria
+        self._ativo = restaurante._ativo
+        self._avaliacao = restaurante._avaliacao
+        self._qtd_avaliacoes = len(self._avaliacao)
+        itens = restaurante._lista_cardapio
+        fonte = restaurante._fonte_cardapio
+        self._cardapio: Union[List[dict], Any]
+        if itens is not None:
+            self._cardapio = [item.to_dict() for item in itens]
+        elif fonte.imutavel:
+            self._cardapio = fonte
+        else:
+            self._cardapio = fonte.para_dicts()
+
+    def to_dict(self) -> dict:
+        """
+        Mesmo formato de Restaurante.to_dict(), no momento da captura.
+        """
+        return {
+            "nome": self._nome,
+            "categoria": self._categoria,
+            "ativo": self._ativo,
+            "avaliacoes": self._avaliacao.para_dicts(
+                0, self._qtd_avaliacoes
+            ),
+            "cardapio": (
+                self._cardapio if isinstance(self._cardapio, list)
+                else self._cardapio.para_dicts()
+            ),
+        }
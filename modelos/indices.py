@@ -0,0 +1,87 @@
+# modelos/indices.py
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+def _seq(restaurante: Any) -> int:
+    return restaurante._seq
+
+
+def media_decrescente(restaurante: Any) -> Tuple[float, int]:
+    """
+    Ordem do ranking: maior média primeiro e, no empate, ordem de
+    cadastro. Só vale para restaurantes com ao menos uma avaliação.
+    """
+    media = restaurante._soma_notas / restaurante._qtd_avaliacoes
+    return -media, restaurante._seq
+
+
+def posicao_apos(grupo: List[Any], seq: Optional[int]) -> int:
+    """
+    Posição, em um grupo ordenado por _seq, do primeiro restaurante
+    cadastrado depois de ``seq`` (0 se ``seq`` for None).
+    """
+    if seq is None:
+        return 0
+    return bisect_right(grupo, seq, key=_seq)
+
+
+class IndiceOrdenado:
+    """
+    Índice secundário que agrupa restaurantes por uma chave (ex.:
+    categoria ou situação), mantendo cada grupo ordenado (por padrão na
+    ordem de cadastro, _seq, para permitir paginação por cursor com busca
+    binária).
+
+    Cada grupo é uma lista Python: inclusão e remoção acham a posição com
+    O(log N) comparações, mas deslocam os elementos seguintes (memmove de
+    ponteiros, O(N) no pior caso). Com centenas de milhares de
+    restaurantes isso custa dezenas de microssegundos por operação, e a
+    leitura em ordem e o fatiamento continuam diretos, sem uma árvore
+    balanceada.
+    """
+
+    def __init__(self, ordem: Callable[[Any], Any] = _seq):
+        """
+        Inicializa um índice vazio.
+
+        Inputs:
+        - ordem (Callable): Chave de ordenação dentro de cada grupo; deve
+          ser única por restaurante e só mudar com ele fora do índice.
+        """
+        self._ordem = ordem
+        self._grupos: Dict[Hashable, List[Any]] = {}
+
+    def adicionar(self, chave: Hashable, restaurante: Any) -> None:
+        """
+        Inclui o restaurante no grupo da chave.
+        """
+        insort(
+            self._grupos.setdefault(chave, []), restaurante, key=self._ordem
+        )
+
+    def remover(self, chave: Hashable, restaurante: Any) -> None:
+        """
+        Retira o restaurante do grupo da chave, se presente.
+        """
+        grupo = self._grupos.get(chave)
+        if grupo is None:
+            return
+        i = bisect_left(grupo, self._ordem(restaurante), key=self._ordem)
+        if i < len(grupo) and grupo[i] is restaurante:
+            del grupo[i]
+            if not grupo:
+                del self._grupos[chave]
+
+    def grupo(self, chave: Hashable) -> List[Any]:
+        """
+        Restaurantes da chave, na ordem do índice (não alterar a lista).
+        """
+        return self._grupos.get(chave, [])
+
+    def limpar(self) -> None:
+        """
+        Esvazia o índice.
+        """
+        self._grupos.clear()
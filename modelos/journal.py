@@ -0,0 +1,241 @@
+# modelos/journal.py
+
+import json
+import os
+from contextlib import contextmanager
+from typing import IO, Iterator, Optional
+
+# Tamanho dos blocos lidos de trás para frente ao procurar o fim da última
+# linha completa
+_BLOCO_REPARO = 64 * 1024
+
+
+def _descartar_linha_incompleta(f: IO[bytes]) -> None:
+    """
+    Trunca o arquivo (aberto para leitura e gravação, em binário) logo após
+    a última quebra de linha, descartando o resto de uma gravação
+    interrompida para que o próximo registro não seja colado nele.
+    """
+    fim = f.seek(0, os.SEEK_END)
+    if not fim:
+        return
+    f.seek(fim - 1)
+    if f.read(1) == b"\n":
+        return
+    while fim > 0:
+        inicio = max(0, fim - _BLOCO_REPARO)
+        f.seek(inicio)
+        quebra = f.read(fim - inicio).rfind(b"\n")
+        if quebra >= 0:
+            f.truncate(inicio + quebra + 1)
+            return
+        fim = inicio
+    f.truncate(0)
+
+
+def _decodificar(linha: bytes, caminho: str) -> Optional[dict]:
+    """
+    Decodifica uma linha completa do journal. Uma linha corrompida é
+    copiada para ``<caminho>.corrompido`` (quarentena) e ignorada, em vez
+    de impedir a carga do restante.
+    """
+    try:
+        return json.loads(linha)
+    except ValueError:
+        with open(caminho + ".corrompido", "ab") as f:
+            f.write(linha)
+        print(
+            f"[Journal] Registro ilegível em {caminho} movido para "
+            f"{caminho}.corrompido"
+        )
+        return None
+
+
+class Journal:
+    """
+    Log append-only de mutações, gravado em JSONL (um registro por linha).
+
+    Attributes:
+        caminho (str): Caminho do arquivo do journal.
+    """
+
+    def __init__(self, caminho: str):
+        """
+        Inicializa uma instância de Journal.
+
+        Inputs:
+        - caminho (str): Caminho do arquivo do journal.
+        """
+        self.caminho = caminho
+
+    def anexar(self, *registros: dict) -> int:
+        """
+        Acrescenta os registros, compactos e em ordem, ao final do journal
+        em uma única gravação. Se a última linha ficou incompleta (uma
+        gravação interrompida), ela é descartada antes.
+
+        Returns:
+        - int: Tamanho do journal em bytes após a gravação.
+        """
+        linhas = "".join(
+            json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for r in registros
+        ).encode("utf-8")
+        with open(self.caminho, "a+b") as f:
+            _descartar_linha_incompleta(f)
+            f.write(linhas)
+            return f.tell()
+
+    def registros(self) -> Iterator[dict]:
+        """
+        Percorre os registros do journal na ordem em que foram gravados.
+        Uma última linha incompleta (gravação interrompida) é ignorada, e
+        linhas ilegíveis vão para a quarentena (ver _decodificar).
+        """
+        if not os.path.exists(self.caminho):
+            return
+        with open(self.caminho, "rb") as f:
+            for linha in f:
+                if not linha.endswith(b"\n"):
+                    break
+                registro = _decodificar(linha, self.caminho)
+                if registro is not None:
+                    yield registro
+
+    @contextmanager
+    def travar(self, exclusiva: bool = True) -> Iterator[None]:
+        """
+        Trava entre processos (flock em um arquivo ``.lock`` ao lado do
+        journal, que sobrevive à troca do journal por os.replace()).
+        Exclusiva para gravar; compartilhada para ler de forma consistente.
+        Não é reentrante: a mesma thread não deve pedi-la duas vezes.
+        """
+        # Só disponível em sistemas POSIX; importado aqui para que o modo
+        # de processo único continue funcionando nos demais
+        import fcntl
+
+        with open(self.caminho + ".lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusiva else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def compactacoes(self) -> int:
+        """
+        Quantas vezes o journal foi compactado em um snapshot no modo
+        multiprocesso (contador guardado no arquivo ``.lock``).
+        """
+        try:
+            with open(self.caminho + ".lock", encoding="utf-8") as f:
+                return int(f.read() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def registrar_compactacao(self) -> int:
+        """
+        Incrementa o contador de compactações; chamar com a trava
+        exclusiva.
+
+        Returns:
+        - int: O novo valor do contador.
+        """
+        total = self.compactacoes() + 1
+        with open(self.caminho + ".lock", "w", encoding="utf-8") as f:
+            f.write(str(total))
+        return total
+
+    def tamanho(self) -> int:
+        """
+        Retorna o tamanho do journal em bytes (0 se não existir).
+        """
+        try:
+            return os.path.getsize(self.caminho)
+        except FileNotFoundError:
+            return 0
+
+    def descartar_ate(self, posicao: int) -> None:
+        """
+        Descarta os registros gravados antes de ``posicao`` (um tamanho
+        retornado por tamanho() ou anexar()), preservando os posteriores.
+        A troca do arquivo é atômica.
+        """
+        if posicao >= self.tamanho():
+            self.limpar()
+            return
+        with open(self.caminho, "rb") as f:
+            f.seek(posicao)
+            restante = f.read()
+        temporario = self.caminho + ".tmp"
+        with open(temporario, "wb") as f:
+            f.write(restante)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, self.caminho)
+
+    def limpar(self) -> None:
+        """
+        Descarta o journal, normalmente após a gravação de um snapshot.
+        """
+        try:
+            os.remove(self.caminho)
+        except FileNotFoundError:
+            pass
+
+
+class LeitorJournal:
+    """
+    Acompanha um journal compartilhado com outros processos, lendo apenas
+    o que foi gravado desde a última leitura. O arquivo fica aberto: se
+    uma compactação o substituir ou remover, o final da geração antiga
+    ainda pode ser lido.
+
+    Attributes:
+        caminho (str): Caminho do arquivo do journal.
+        posicao (int): Bytes já lidos (sempre ao fim de uma linha).
+    """
+
+    def __init__(self, caminho: str):
+        """
+        Abre o journal (criando-o vazio, se preciso) a partir do início.
+        """
+        self.caminho = caminho
+        open(caminho, "ab").close()
+        self._f = open(caminho, "rb")
+        st = os.fstat(self._f.fileno())
+        self._identidade = (st.st_dev, st.st_ino)
+        self.posicao = 0
+
+    def ler(self) -> Iterator[dict]:
+        """
+        Registros completos gravados desde a última leitura; linhas
+        ilegíveis vão para a quarentena (ver _decodificar).
+        """
+        self._f.seek(self.posicao)
+        for linha in self._f:
+            if not linha.endswith(b"\n"):
+                break
+            self.posicao += len(linha)
+            registro = _decodificar(linha, self.caminho)
+            if registro is not None:
+                yield registro
+
+    def desatualizado(self) -> bool:
+        """
+        Indica, com um único stat, se o journal cresceu ou foi trocado
+        desde a última leitura.
+        """
+        try:
+            st = os.stat(self.caminho)
+        except FileNotFoundError:
+            return True
+        return (
+            (st.st_dev, st.st_ino) != self._identidade
+            or st.st_size != self.posicao
+        )
+
+    def fechar(self) -> None:
+        """
+        Fecha o arquivo.
+        """
+        self._f.close()
@@ -0,0 +1,248 @@
+# modelos/persistencia.py
+
+import json
+import os
+import shutil
+import tempfile
+import textwrap
+from typing import IO, Callable, Iterable, Iterator
+
+from modelos.snapshot_binario import SnapshotBinario, escrever_binario
+
+TAMANHO_BLOCO = 64 * 1024
+
+
+def formato_snapshot(caminho: str) -> str:
+    """
+    Formato do snapshot conforme a extensão: "ndjson" (um restaurante por
+    linha) para .ndjson/.jsonl, "binario" (registros de tamanho fixo lidos
+    por mmap, ver snapshot_binario) para .bin, ou "json" (array
+    indentado). A geração anterior (caminho_anterior()) tem o formato
+    do snapshot original.
+    """
+    if caminho.endswith(".anterior"):
+        caminho = caminho[:-len(".anterior")]
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao in (".ndjson", ".jsonl"):
+        return "ndjson"
+    return "binario" if extensao == ".bin" else "json"
+
+
+def ler_snapshot(caminho: str) -> Iterator[dict]:
+    """
+    Percorre os registros de um snapshot um a um, sem carregar o arquivo
+    inteiro em memória.
+
+    Raises:
+    - json.JSONDecodeError: Se o conteúdo estiver vazio ou inválido.
+    - ValueError: Se um snapshot binário estiver vazio ou danificado.
+    """
+    if formato_snapshot(caminho) == "binario":
+        yield from SnapshotBinario(caminho).registros()
+        return
+    with open(caminho, "r", encoding="utf-8") as f:
+        if formato_snapshot(caminho) == "ndjson":
+            for linha in f:
+                if linha.strip():
+                    yield json.loads(linha)
+        else:
+            yield from _iterar_array_json(f)
+
+
+def _iterar_array_json(f: IO[str]) -> Iterator[dict]:
+    """
+    Parser incremental de um array JSON: lê o arquivo em blocos e
+    decodifica cada elemento assim que ele está completo no buffer.
+    """
+    leitor = _LeitorBlocos(f)
+    if leitor.proximo_caractere() != "[":
+        raise json.JSONDecodeError("Esperado '['", leitor.buffer, leitor.pos)
+    leitor.pos += 1
+    if leitor.proximo_caractere() == "]":
+        return
+    while True:
+        yield leitor.decodificar()
+        separador = leitor.proximo_caractere()
+        if separador == "]":
+            return
+        if separador != ",":
+            raise json.JSONDecodeError(
+                "Esperado ',' ou ']'", leitor.buffer, leitor.pos
+            )
+        leitor.pos += 1
+        leitor.proximo_caractere()
+
+
+class _LeitorBlocos:
+    """
+    Buffer de leitura em blocos usado por _iterar_array_json.
+    """
+
+    def __init__(self, f: IO[str]):
+        self._f = f
+        self._decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+
+    def proximo_caractere(self) -> str:
+        """
+        Pula espaços, lendo mais blocos se preciso; "" no fim do arquivo.
+        """
+        while True:
+            while (
+                self.pos < len(self.buffer)
+                and self.buffer[self.pos].isspace()
+            ):
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            self.buffer, self.pos = self._f.read(TAMANHO_BLOCO), 0
+            if not self.buffer:
+                return ""
+
+    def decodificar(self) -> dict:
+        """
+        Decodifica o valor JSON na posição atual, lendo mais blocos
+        enquanto ele estiver incompleto.
+        """
+        while True:
+            try:
+                valor, self.pos = self._decoder.raw_decode(
+                    self.buffer, self.pos
+                )
+                return valor
+            except json.JSONDecodeError:
+                # Mantém o trecho pendente e lê mais (blocos maiores
+                # quando o elemento não cabe no buffer)
+                bloco = self._f.read(
+                    max(TAMANHO_BLOCO, len(self.buffer) - self.pos)
+                )
+                if not bloco:
+                    raise
+                self.buffer = self.buffer[self.pos:] + bloco
+                self.pos = 0
+
+
+def caminho_anterior(caminho: str) -> str:
+    """
+    Caminho da geração anterior de um snapshot.
+    """
+    return caminho + ".anterior"
+
+
+def gravar_atomico(caminho: str, escrever: Callable[[IO[str]], None]) -> None:
+    """
+    Grava um arquivo de forma atômica: o conteúdo vai para um arquivo
+    temporário no mesmo diretório, que recebe fsync e então substitui o
+    original com os.replace. A versão anterior é preservada em
+    caminho_anterior(caminho).
+
+    Inputs:
+    - caminho (str): Arquivo de destino.
+    - escrever (Callable): Função que recebe o arquivo aberto e grava
+      o conteúdo.
+    """
+    instalar(gravar_temporario(caminho, escrever), caminho)
+
+
+def gravar_temporario(
+    caminho: str, escrever: Callable[[IO[str]], None]
+) -> str:
+    """
+    Primeira metade de gravar_atomico(): grava o conteúdo, com fsync, em
+    um arquivo temporário no diretório de ``caminho`` (removido se a
+    gravação falhar).
+
+    Returns:
+    - str: Caminho do arquivo temporário, a ser passado a instalar().
+    """
+    diretorio = os.path.dirname(caminho) or "."
+    os.makedirs(diretorio, exist_ok=True)
+    fd, temporario = tempfile.mkstemp(
+        dir=diretorio, prefix=os.path.basename(caminho) + ".", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            escrever(f)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        os.remove(temporario)
+        raise
+    return temporario
+
+
+def instalar(temporario: str, caminho: str) -> None:
+    """
+    Segunda metade de gravar_atomico(): troca ``caminho`` pelo arquivo
+    temporário, preservando a versão anterior.
+    """
+    try:
+        if os.path.exists(caminho):
+            _preservar_anterior(caminho)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    _fsync_diretorio(os.path.dirname(caminho) or ".")
+
+
+def escrever_snapshot(
+    f: IO[str], registros: Iterable[dict], caminho: str
+) -> None:
+    """
+    Grava os registros um a um no formato indicado por formato_snapshot,
+    sem montar a lista completa em memória. O array JSON sai idêntico ao
+    de ``json.dump(registros, f, ensure_ascii=False, indent=4)``.
+    """
+    formato = formato_snapshot(caminho)
+    if formato == "binario":
+        escrever_binario(f.buffer, registros)
+        return
+    if formato == "ndjson":
+        for registro in registros:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        return
+
+    separador = "[\n"
+    for registro in registros:
+        f.write(separador)
+        texto = json.dumps(registro, ensure_ascii=False, indent=4)
+        f.write(textwrap.indent(texto, "    "))
+        separador = ",\n"
+    f.write("[]" if separador == "[\n" else "\n]")
+
+
+def _preservar_anterior(caminho: str) -> None:
+    """
+    Copia a geração atual para caminho_anterior(caminho) sem que o
+    arquivo principal deixe de existir em momento algum.
+    """
+    anterior = caminho_anterior(caminho)
+    temporario = anterior + ".tmp"
+    if os.path.exists(temporario):
+        os.remove(temporario)
+    try:
+        os.link(caminho, temporario)
+    except OSError:
+        # Sistemas de arquivos sem suporte a hard links
+        shutil.copyfile(caminho, temporario)
+    os.replace(temporario, anterior)
+
+
+def _fsync_diretorio(diretorio: str) -> None:
+    """
+    Garante que a troca de nomes no diretório chegou ao disco.
+    """
+    try:
+        fd = os.open(diretorio, os.O_RDONLY)
+    except OSError:
+        # Ex.: Windows não permite abrir diretórios
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
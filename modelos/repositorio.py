@@ -0,0 +1,46 @@
+# modelos/repositorio.py
+
+from abc import ABC, abstractmethod
+from typing import Iterable, Iterator, List
+
+
+class Repositorio(ABC):
+    """
+    Armazenamento dos restaurantes com atualização parcial: recebe as
+    mutações registradas por Restaurante._registrar_mutacao() em vez de
+    regravar o catálogo inteiro.
+
+    Os restaurantes trafegam no formato de Restaurante.to_dict() e as
+    mutações no formato dos registros do journal ({"op": ..., ...}).
+
+    Attributes:
+        caminho (str): Local do armazenamento (ex.: arquivo do banco).
+    """
+
+    caminho: str
+
+    @abstractmethod
+    def carregar(self) -> Iterator[dict]:
+        """
+        Percorre os restaurantes armazenados, em ordem de cadastro.
+        """
+        ...
+
+    @abstractmethod
+    def aplicar(self, registros: List[dict]) -> None:
+        """
+        Aplica as mutações, em ordem, de forma atômica.
+        """
+        ...
+
+    @abstractmethod
+    def substituir(self, restaurantes: Iterable[dict]) -> None:
+        """
+        Troca todo o conteúdo armazenado pelos restaurantes informados.
+        """
+        ...
+
+    def fechar(self) -> None:
+        """
+        Libera os recursos abertos (conexões, arquivos).
+        """
@@ -0,0 +1,383 @@
+# modelos/repositorio_sqlite.py
+
+import json
+import os
+import sqlite3
+import threading
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterable, Iterator, List, Optional, Union
+
+from modelos.armazem_avaliacoes import (
+    AvaliacoesColunares,
+    ListaAvaliacoes,
+    novo_armazem,
+)
+from modelos.carga_sob_demanda import CabecalhoRestaurante
+from modelos.repositorio import Repositorio
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS restaurantes (
+    id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL,
+    chave TEXT NOT NULL,
+    categoria TEXT NOT NULL,
+    ativo INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS restaurantes_chave ON restaurantes (chave, id);
+
+CREATE TABLE IF NOT EXISTS avaliacoes (
+    id INTEGER PRIMARY KEY,
+    restaurante_id INTEGER NOT NULL
+        REFERENCES restaurantes (id) ON DELETE CASCADE,
+    cliente TEXT NOT NULL,
+    nota REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS avaliacoes_restaurante
+    ON avaliacoes (restaurante_id, id);
+
+CREATE TABLE IF NOT EXISTS itens_cardapio (
+    id INTEGER PRIMARY KEY,
+    restaurante_id INTEGER NOT NULL
+        REFERENCES restaurantes (id) ON DELETE CASCADE,
+    tipo TEXT NOT NULL,
+    nome TEXT NOT NULL,
+    chave TEXT NOT NULL,
+    preco REAL NOT NULL,
+    extras TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS itens_restaurante
+    ON itens_cardapio (restaurante_id, chave, id);
+"""
+
+# Campos comuns a todos os itens; os demais vão para a coluna "extras"
+_CAMPOS_ITEM = ("__type__", "nome", "preco")
+
+# Agregados das avaliações por restaurante, com o histograma pela mesma
+# regra de Restaurante._anexar_avaliacao
+_CONSULTA_CABECALHOS = """
+SELECT r.id, r.nome, r.categoria, r.ativo,
+    COUNT(a.id), TOTAL(a.nota), MIN(a.nota), MAX(a.nota),
+    TOTAL(a.nota < 2), TOTAL(a.nota >= 2 AND a.nota < 3),
+    TOTAL(a.nota >= 3 AND a.nota < 4), TOTAL(a.nota >= 4 AND a.nota < 5),
+    TOTAL(a.nota >= 5),
+    (SELECT COUNT(*) FROM itens_cardapio i WHERE i.restaurante_id = r.id)
+FROM restaurantes r LEFT JOIN avaliacoes a ON a.restaurante_id = r.id
+GROUP BY r.id ORDER BY r.id
+"""
+
+
+def _item_de_linha(tipo: str, nome: str, preco: float, extras: str) -> dict:
+    return {"__type__": tipo, "nome": nome, "preco": preco,
+            **json.loads(extras)}
+
+
+class _GruposPorRestaurante:
+    """
+    Percorre linhas ordenadas por restaurante_id (primeira coluna),
+    entregando as de cada restaurante à medida que são pedidas.
+    """
+
+    def __init__(self, cursor: Iterable[tuple]):
+        self._grupos = groupby(cursor, key=itemgetter(0))
+        self._proximo = next(self._grupos, None)
+
+    def tomar(self, restaurante_id: int) -> List[tuple]:
+        """
+        Linhas do restaurante (sem a primeira coluna); [] se não houver.
+        Os ids devem ser pedidos em ordem crescente.
+        """
+        if self._proximo is None or self._proximo[0] != restaurante_id:
+            return []
+        linhas = [linha[1:] for linha in self._proximo[1]]
+        self._proximo = next(self._grupos, None)
+        return linhas
+
+
+class RepositorioSQLite(Repositorio):
+    """
+    Repositório em um banco SQLite (modo WAL, que permite leitores
+    concorrentes enquanto há gravação). Restaurantes, avaliações e itens
+    de cardápio ficam em tabelas próprias; os itens são polimórficos,
+    identificados pela coluna ``tipo`` (o ``__type__`` serializado), com
+    os campos específicos de cada subclasse em JSON na coluna ``extras``.
+
+    Cada mutação vira uma operação de uma linha (ex.: uma avaliação é um
+    INSERT em ``avaliacoes``).
+    """
+
+    def __init__(self, caminho: str):
+        """
+        Abre (ou cria) o banco de dados.
+
+        Inputs:
+        - caminho (str): Arquivo do banco SQLite.
+        """
+        self.caminho = caminho
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        # A conexão é compartilhada com a thread do agendador de flush;
+        # o acesso é serializado pela trava abaixo
+        self._con = sqlite3.connect(caminho, check_same_thread=False)
+        self._trava = threading.Lock()
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA foreign_keys=ON")
+        self._con.executescript(ESQUEMA)
+
+    @staticmethod
+    def _chave_nome(nome: str) -> str:
+        # Mesma regra de Restaurante._chave_nome
+        return nome.casefold()
+
+    def _id_restaurante(self, nome: str) -> Optional[int]:
+        linha = self._con.execute(
+            "SELECT id FROM restaurantes WHERE chave = ? ORDER BY id LIMIT 1",
+            (self._chave_nome(nome),),
+        ).fetchone()
+        return linha[0] if linha else None
+
+    def _inserir_restaurante(self, dados: dict) -> int:
+        cursor = self._con.execute(
+            "INSERT INTO restaurantes (nome, chave, categoria, ativo)"
+            " VALUES (?, ?, ?, ?)",
+            (
+                dados["nome"],
+                self._chave_nome(dados["nome"]),
+                dados["categoria"],
+                int(dados.get("ativo", False)),
+            ),
+        )
+        return cursor.lastrowid
+
+    def _inserir_avaliacao(self, restaurante_id: int, avaliacao: dict) -> None:
+        self._con.execute(
+            "INSERT INTO avaliacoes (restaurante_id, cliente, nota)"
+            " VALUES (?, ?, ?)",
+            (restaurante_id, avaliacao["cliente"], avaliacao["nota"]),
+        )
+
+    def _inserir_item(self, restaurante_id: int, item: dict) -> None:
+        extras = {k: v for k, v in item.items() if k not in _CAMPOS_ITEM}
+        self._con.execute(
+            "INSERT INTO itens_cardapio"
+            " (restaurante_id, tipo, nome, chave, preco, extras)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                restaurante_id,
+                item["__type__"],
+                item["nome"],
+                # Mesma regra de Restaurante._buscar_item
+                item["nome"].lower(),
+                item["preco"],
+                json.dumps(extras, ensure_ascii=False),
+            ),
+        )
+
+    def carregar(self) -> Iterator[dict]:
+        """
+        Percorre os restaurantes em ordem de cadastro, juntando avaliações
+        e itens por merge das três tabelas (uma consulta por tabela). A
+        conexão fica reservada até o fim do percurso.
+        """
+        with self._trava:
+            avaliacoes = _GruposPorRestaurante(
+                self._con.execute(
+                    "SELECT restaurante_id, cliente, nota FROM avaliacoes"
+                    " ORDER BY restaurante_id, id"
+                )
+            )
+            itens = _GruposPorRestaurante(
+                self._con.execute(
+                    "SELECT restaurante_id, tipo, nome, preco, extras"
+                    " FROM itens_cardapio ORDER BY restaurante_id, id"
+                )
+            )
+            restaurantes = self._con.execute(
+                "SELECT id, nome, categoria, ativo FROM restaurantes"
+                " ORDER BY id"
+            )
+            for restaurante_id, nome, categoria, ativo in restaurantes:
+                yield {
+                    "nome": nome,
+                    "categoria": categoria,
+                    "ativo": bool(ativo),
+                    "avaliacoes": [
+                        {"cliente": cliente, "nota": nota}
+                        for cliente, nota in avaliacoes.tomar(restaurante_id)
+                    ],
+                    "cardapio": [
+                        _item_de_linha(*linha)
+                        for linha in itens.tomar(restaurante_id)
+                    ],
+                }
+
+    def carregar_cabecalhos(self) -> List[CabecalhoRestaurante]:
+        """
+        Restaurantes em ordem de cadastro, só com os campos fixos e os
+        agregados das avaliações (calculados pelo banco); avaliações e
+        itens são lidos sob demanda, por nome (ver AvaliacoesSQLite e
+        CardapioSQLite).
+        """
+        with self._trava:
+            linhas = self._con.execute(_CONSULTA_CABECALHOS).fetchall()
+        return [
+            CabecalhoRestaurante(
+                nome=nome,
+                categoria=categoria,
+                ativo=bool(ativo),
+                qtd_avaliacoes=qtd,
+                soma_notas=soma,
+                nota_min=minima,
+                nota_max=maxima,
+                histograma=[int(n) for n in histograma],
+                avaliacoes=AvaliacoesSQLite(self, nome),
+                cardapio=CardapioSQLite(self, nome, qtd_itens),
+            )
+            for (
+                _, nome, categoria, ativo, qtd, soma, minima, maxima,
+                *histograma, qtd_itens,
+            ) in linhas
+        ]
+
+    def avaliacoes_de(self, nome: str) -> List[tuple]:
+        """
+        Pares (cliente, nota) do restaurante, na ordem de chegada.
+        """
+        with self._trava:
+            return self._con.execute(
+                "SELECT cliente, nota FROM avaliacoes"
+                " WHERE restaurante_id = ? ORDER BY id",
+                (self._id_restaurante(nome),),
+            ).fetchall()
+
+    def itens_de(self, nome: str, limite: Optional[int] = None) -> List[dict]:
+        """
+        Itens do cardápio do restaurante (os ``limite`` primeiros, se
+        informado), no formato de ItemCardapio.to_dict().
+        """
+        with self._trava:
+            linhas = self._con.execute(
+                "SELECT tipo, nome, preco, extras FROM itens_cardapio"
+                " WHERE restaurante_id = ? ORDER BY id LIMIT ?",
+                (
+                    self._id_restaurante(nome),
+                    -1 if limite is None else limite,
+                ),
+            ).fetchall()
+        return [_item_de_linha(*linha) for linha in linhas]
+
+    def aplicar(self, registros: List[dict]) -> None:
+        """
+        Aplica as mutações em uma única transação do banco.
+        """
+        with self._trava, self._con:
+            for registro in registros:
+                self._aplicar(registro)
+
+    def _aplicar(self, registro: dict) -> None:
+        # Mesma semântica de Restaurante._reaplicar: o nome refere-se ao
+        # primeiro restaurante cadastrado com ele
+        op = registro["op"]
+        restaurante_id = self._id_restaurante(registro["nome"])
+        if op == "criar":
+            if restaurante_id is None:
+                self._inserir_restaurante(registro)
+            return
+        if restaurante_id is None:
+            return
+        if op == "remover":
+            self._con.execute(
+                "DELETE FROM restaurantes WHERE id = ?", (restaurante_id,)
+            )
+        elif op == "alternar":
+            self._con.execute(
+                "UPDATE restaurantes SET ativo = ? WHERE id = ?",
+                (int(registro["ativo"]), restaurante_id),
+            )
+        elif op == "avaliar":
+            self._inserir_avaliacao(restaurante_id, registro)
+        elif op == "cardapio":
+            self._inserir_item(restaurante_id, registro["item"])
+        elif op == "desconto":
+            self._con.execute(
+                "UPDATE itens_cardapio SET preco = ? WHERE id = ("
+                " SELECT id FROM itens_cardapio"
+                " WHERE restaurante_id = ? AND chave = ?"
+                " ORDER BY id LIMIT 1 OFFSET ?)",
+                (
+                    registro["preco"], restaurante_id,
+                    registro["item"].lower(), registro.get("ocorrencia", 0),
+                ),
+            )
+
+    def substituir(self, restaurantes: Iterable[dict]) -> None:
+        """
+        Regrava o conteúdo inteiro em uma única transação.
+        """
+        with self._trava, self._con:
+            self._con.execute("DELETE FROM restaurantes")
+            for dados in restaurantes:
+                restaurante_id = self._inserir_restaurante(dados)
+                for avaliacao in dados.get("avaliacoes", []):
+                    self._inserir_avaliacao(restaurante_id, avaliacao)
+                for item in dados.get("cardapio", []):
+                    self._inserir_item(restaurante_id, item)
+
+    def fechar(self) -> None:
+        """
+        Fecha a conexão com o banco.
+        """
+        self._con.close()
+
+
+class AvaliacoesSQLite:
+    """
+    Fonte das avaliações de um restaurante no banco (ver
+    CabecalhoRestaurante), lidas a cada carregar().
+    """
+
+    __slots__ = ("_repositorio", "_nome")
+
+    def __init__(self, repositorio: RepositorioSQLite, nome: str):
+        self._repositorio = repositorio
+        self._nome = nome
+
+    def carregar(self, tipo: str) -> Union[ListaAvaliacoes,
+                                           AvaliacoesColunares]:
+        """
+        Lê as avaliações em um novo armazém do tipo indicado.
+        """
+        armazem = novo_armazem(tipo)
+        for cliente, nota in self._repositorio.avaliacoes_de(self._nome):
+            armazem.anexar(cliente, nota)
+        return armazem
+
+
+class CardapioSQLite:
+    """
+    Fonte do cardápio de um restaurante no banco (ver
+    CabecalhoRestaurante). O conteúdo acompanha as mutações aplicadas.
+    """
+
+    __slots__ = ("_repositorio", "_nome", "_quantidade")
+
+    imutavel = False
+
+    def __init__(
+        self, repositorio: RepositorioSQLite, nome: str, quantidade: int
+    ):
+        self._repositorio = repositorio
+        self._nome = nome
+        self._quantidade = quantidade
+
+    def para_dicts(self, limite: Optional[int] = None) -> List[dict]:
+        """
+        Lê os itens (os ``limite`` primeiros, se informado).
+        """
+        if limite == 0:
+            return []
+        return self._repositorio.itens_de(self._nome, limite)
+
+    def __len__(self) -> int:
+        return self._quantidade
@@ -1,16 +1,94 @@
 # modelos/restaurante.py
 
-import json
+import asyncio
+import contextvars
+import itertools
 import os
-from typing import List, Optional, Union
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from typing import (
+    AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Set,
+    Tuple, TypeVar, Union,
+)
 
+from modelos.agendador import AgendadorFlush
+from modelos.armazem_avaliacoes import (
+    AvaliacoesColunares,
+    ListaAvaliacoes,
+    novo_armazem,
+)
 from modelos.avaliacao import Avaliacao
+from modelos.busca import IndiceCardapio
+from modelos.carga_sob_demanda import (
+    CabecalhoRestaurante,
+    CacheMaterializados,
+    bytes_itens,
+)
+from modelos.concorrencia import TravaCompartilhada, VisaoRestaurante
+from modelos.indices import IndiceOrdenado, media_decrescente, posicao_apos
+from modelos.journal import Journal, LeitorJournal
+from modelos.repositorio import Repositorio
+from modelos.repositorio_sqlite import RepositorioSQLite
+from modelos.persistencia import (
+    caminho_anterior,
+    escrever_snapshot,
+    gravar_atomico,
+    gravar_temporario,
+    formato_snapshot,
+    instalar,
+    ler_snapshot,
+)
+from modelos.snapshot_binario import SnapshotBinario
 from modelos.cardapio.item_cardapio import ItemCardapio
 from modelos.cardapio.prato import Prato
 from modelos.cardapio.bebida import Bebida
 from modelos.cardapio.sobremesa import Sobremesa
 
 
+_T = TypeVar("_T")
+
+# Versão de uma mudança sem registro a persistir (ex.: reaplicada do
+# journal): a fonte nunca a terá, então o restaurante não é descarregado
+_ALTERADO = float("inf")
+
+
+class RestauranteRemovido(LookupError):
+    """
+    O restaurante a alterar foi removido (por outro processo, no modo
+    "multiprocesso") antes que a mutação fosse aplicada.
+    """
+
+
+def _registros_snapshot(
+    visoes: Iterable[VisaoRestaurante], seq: int
+) -> Iterator[dict]:
+    """
+    Registros do snapshot a partir das visões capturadas, cada um com o
+    número do último registro do journal que o snapshot contém (``seq``,
+    omitido se não houver journal numerado).
+    """
+    for visao in visoes:
+        registro = visao.to_dict()
+        if seq:
+            registro["seq"] = seq
+        yield registro
+
+
+def _item_de_dict(data: dict) -> ItemCardapio:
+    """
+    Reconstrói um item do cardápio a partir do dict serializado,
+    escolhendo a classe pelo campo ``__type__``.
+    """
+    cls_item = {
+        "Prato": Prato,
+        "Bebida": Bebida,
+        "Sobremesa": Sobremesa,
+    }.get(data.get("__type__"), ItemCardapio)
+    return cls_item.from_dict(data)
+
+
 class Restaurante:
     """
     Representa um restaurante e suas características.
@@ -19,19 +97,192 @@ class Restaurante:
         _nome (str): Nome do restaurante.
         _categoria (str): Categoria à qual o restaurante pertence.
         _ativo (bool): Estado do restaurante (ativo/inativo).
-        _avaliacao (List[Avaliacao]): Lista de avaliações atribuídas
-                      ao restaurante.
+        _avaliacao (ListaAvaliacoes | AvaliacoesColunares): Avaliações
+                      atribuídas ao restaurante, conforme
+                      ARMAZEM_AVALIACOES. Deve crescer apenas por
+                      _anexar_avaliacao(), que mantém os agregados. Após a
+                      carga de um snapshot binário é uma visão somente
+                      leitura do arquivo (AvaliacoesMapeadas), copiada
+                      para um armazém comum na primeira nova avaliação.
+        _fonte_avaliacoes, _fonte_cardapio: Origem das avaliações e do
+                      cardápio carregados sob demanda (ver
+                      CabecalhoRestaurante), ou None. Com uma fonte,
+                      _avaliacao e _cardapio são materializados no
+                      primeiro acesso e podem ser descartados de novo
+                      pelo LRU de _materializados (ver _descarregar()).
+        _versao (int | float): Número da última mutação registrada nas
+                      avaliações ou no cardápio (ver _registrar_mutacao());
+                      infinito para mudanças sem registro a persistir.
+        _alteracoes (int): Contador de mudanças nas avaliações e no
+                      cardápio, para saber se um snapshot gravado ainda
+                      reflete o restaurante (ver _adotar_snapshot()).
+        _registrado (bool): Se o restaurante ainda está no registro.
+        _qtd_avaliacoes, _soma_notas, _nota_min, _nota_max (int/float):
+                      Agregados incrementais das notas.
+        _cardapio (List[ItemCardapio]): Itens do cardápio, na ordem em
+                      que foram adicionados. Deve crescer apenas por
+                      _anexar_item(), que mantém os índices.
+        _itens_por_nome (Dict[str, Tuple[ItemCardapio, int]]): Índice do
+                      cardápio pelo nome em minúsculas: o primeiro item
+                      com cada nome e sua posição no cardápio (estável,
+                      pois o cardápio só cresce).
+        _histograma (List[int]): Quantidade de notas em cada faixa
+                      [1, 2), [2, 3), [3, 4), [4, 5) e 5.
         restaurantes (List[Restaurante]): Lista de todos os restaurantes
                       cadastrados.
+        _por_nome (Dict[str, Restaurante]): Índice dos restaurantes pelo
+                      nome normalizado (casefold), mantido em sincronia
+                      com ``restaurantes``.
+        _homonimos (Dict[str, List[Restaurante]]): Restaurantes de mesmo
+                      nome normalizado que o de ``_por_nome`` (carregados
+                      de um arquivo com nomes repetidos), em ordem de
+                      cadastro; o primeiro assume o nome na remoção.
+        _por_categoria, _por_ativo (IndiceOrdenado): Índices secundários
+                      por categoria (casefold) e por situação, em ordem
+                      de cadastro.
+        _por_categoria_ativo (IndiceOrdenado): Índice composto pelo par
+                      (categoria casefold, situação), usado quando os dois
+                      filtros são informados.
+        _ranking (IndiceOrdenado): Restaurantes com avaliações, da maior
+                      para a menor média, por categoria (casefold) e sob
+                      a chave None (todas as categorias).
+        _busca_cardapio (IndiceCardapio): Índice invertido dos itens de
+                      cardápio de todos os restaurantes, por nome e
+                      descrição.
+        _cardapios_pendentes (Set[Restaurante]): Restaurantes carregados
+                      cujo cardápio ainda não entrou no índice de busca
+                      (indexado na primeira busca ou materialização).
+        _materializados (CacheMaterializados): LRU das avaliações e
+                      cardápios materializados de fontes, limitado a
+                      ORCAMENTO_MEMORIA.
+        _seq (int): Número de ordem do cadastro, usado como cursor de
+                      paginação (``restaurantes`` fica ordenada por ele).
+        _trava (threading.RLock): Trava do restaurante; serializa as
+                      mutações dos seus agregados, avaliações e cardápio.
         ARQUIVO_DADOS (str): Caminho do arquivo onde os dados dos
                       restaurantes são salvos.
+        MODO_PERSISTENCIA (str): "snapshot" regrava o arquivo inteiro a
+                      cada mutação; "journal" anexa a mutação a um log
+                      JSONL ao lado de ARQUIVO_DADOS; "sqlite" aplica cada
+                      mutação como operação de linha em um banco SQLite
+                      ao lado de ARQUIVO_DADOS (ver _repositorio());
+                      "multiprocesso" é o modo journal compartilhado por
+                      vários processos (ver sincronizar()).
+        LIMITE_JOURNAL (int): Tamanho, em bytes, a partir do qual o journal
+                      é compactado em um snapshot em segundo plano.
+        ARMAZEM_AVALIACOES (str): "lista" guarda objetos Avaliacao;
+                      "colunar" guarda notas e clientes em arrays
+                      (ver armazem_avaliacoes.AvaliacoesColunares).
+        INTERVALO_FLUSH_MS (int): Se maior que zero, as gravações são
+                      feitas em segundo plano pelo agendador, no máximo uma
+                      vez a cada intervalo (ver iniciar_agendador()).
+        CARGA_SOB_DEMANDA (bool): No modo "sqlite", carrega só os campos
+                      fixos e os agregados de cada restaurante; avaliações
+                      e cardápio são lidos do banco no primeiro acesso.
+                      Snapshots binários são sempre carregados assim.
+        ORCAMENTO_MEMORIA (int): Bytes (estimados) de avaliações e
+                      cardápios materializados sob demanda mantidos em
+                      memória; os menos usados além disso são descartados
+                      e relidos da fonte quando necessário.
+        contador_flushes (int): Quantidade de gravações efetivamente
+                      realizadas por persistir() (no modo "multiprocesso",
+                      também as feitas ao fim de cada mutação).
+        geracao (int): Contador incrementado a cada mudança no estado dos
+                      restaurantes; serve para invalidar caches.
+
+    Concorrência: cada mutação detém, nesta ordem, a trava de captura no
+    modo compartilhado, a trava do restaurante e, só enquanto mexe na
+    lista e nos índices compartilhados, _trava_registro (ver _mutando()).
+    No modo "multiprocesso" detém antes delas a trava entre processos e
+    _trava_persistencia (ver _secao_multiprocesso()).
+    salvar_dados() toma a trava de captura em modo exclusivo apenas para
+    tirar um retrato (VisaoRestaurante) de cada restaurante; a serialização
+    e a gravação do arquivo correm depois, sem bloquear as mutações.
     """
 
+    __slots__ = (
+        "_seq",
+        "_nome",
+        "_categoria",
+        "_ativo",
+        "_armazem_avaliacoes",
+        "_fonte_avaliacoes",
+        "_qtd_avaliacoes",
+        "_soma_notas",
+        "_nota_min",
+        "_nota_max",
+        "_histograma",
+        "_lista_cardapio",
+        "_indice_cardapio",
+        "_fonte_cardapio",
+        "_versao",
+        "_alteracoes",
+        "_registrado",
+        "_trava",
+    )
+
     restaurantes: List["Restaurante"] = []
+    _por_nome: Dict[str, "Restaurante"] = {}
+    _homonimos: Dict[str, List["Restaurante"]] = {}
+    _por_categoria = IndiceOrdenado()
+    _por_ativo = IndiceOrdenado()
+    _por_categoria_ativo = IndiceOrdenado()
+    _ranking = IndiceOrdenado(media_decrescente)
+    _busca_cardapio = IndiceCardapio()
+    _cardapios_pendentes: Set["Restaurante"] = set()
+    _materializados = CacheMaterializados()
+    _sequencia = itertools.count()
     ARQUIVO_DADOS = os.getenv(
         "ARQUIVO_DADOS",
         os.path.join(os.getcwd(), "dados", "restaurantes.json"),
     )
+    MODO_PERSISTENCIA = os.getenv("MODO_PERSISTENCIA", "snapshot")
+    LIMITE_JOURNAL = int(os.getenv("LIMITE_JOURNAL", str(1024 * 1024)))
+    ARMAZEM_AVALIACOES = os.getenv("ARMAZEM_AVALIACOES", "lista")
+    INTERVALO_FLUSH_MS = int(os.getenv("INTERVALO_FLUSH_MS", "0"))
+    CARGA_SOB_DEMANDA = os.getenv("CARGA_SOB_DEMANDA", "0") == "1"
+    ORCAMENTO_MEMORIA = int(
+        os.getenv("ORCAMENTO_MEMORIA", str(256 * 1024 * 1024))
+    )
+
+    contador_flushes = 0
+    geracao = 0
+
+    # Ordem de aquisição: _trava_gravacao, trava entre processos (modo
+    # multiprocesso), _trava_persistencia, _trava_captura, trava do
+    # restaurante, _trava_registro, _trava_pendentes
+    _trava_gravacao = threading.Lock()
+    _trava_persistencia = threading.RLock()
+    _trava_captura = TravaCompartilhada()
+    _trava_registro = threading.RLock()
+    _trava_pendentes = threading.Lock()
+    _compactacao: Optional[threading.Thread] = None
+    _pendentes: List[dict] = []
+    # Mutações registradas, retiradas pelo último flush e já aplicadas ao
+    # banco (modo "sqlite"); ver _descarregar()
+    _mutacoes = 0
+    _mutacoes_tomadas = 0
+    _mutacoes_persistidas = 0
+    # Profundidade das transações abertas, por thread e por tarefa asyncio
+    _profundidade_transacao = contextvars.ContextVar(
+        "profundidade_transacao", default=0
+    )
+    # Modo "multiprocesso": se a mutação em curso já detém a trava entre
+    # processos (ver _secao_multiprocesso())
+    _em_secao_multiprocesso = contextvars.ContextVar(
+        "em_secao_multiprocesso", default=False
+    )
+    _executor: Optional[ThreadPoolExecutor] = None
+    _trava_executor = threading.Lock()
+    # Modo "multiprocesso": journal acompanhado e compactações já vistas
+    _leitor_journal: Optional[LeitorJournal] = None
+    _compactacoes = 0
+    # Número ("seq") do último registro do journal refletido em memória;
+    # gravado no snapshot para que a carga não reaplique o que ele já
+    # contém (ver _reaplicar())
+    _seq_journal = 0
+    _agendador: Optional[AgendadorFlush] = None
+    _repositorio_aberto: Optional[Repositorio] = None
 
     def __init__(
         self,
@@ -51,111 +302,1236 @@ class Restaurante:
         - avaliacoes (List[Avaliacao] | None): Lista de avaliações existentes.
         - cardapio (List[ItemCardapio] | None): Lista de itens do cardápio.
         """
+        self._seq = next(Restaurante._sequencia)
+        self._trava = threading.RLock()
         self._nome = nome
         self._categoria = categoria
         self._ativo = ativo
-        self._avaliacao = avaliacoes or []
-        self._cardapio = cardapio or []
-        Restaurante.restaurantes.append(self)
+        self._armazem_avaliacoes: Optional[
+            Union[ListaAvaliacoes, AvaliacoesColunares]
+        ] = novo_armazem(Restaurante.ARMAZEM_AVALIACOES)
+        self._fonte_avaliacoes = None
+        self._versao: Union[int, float] = 0
+        self._alteracoes = 0
+        self._qtd_avaliacoes = 0
+        self._soma_notas = 0.0
+        self._nota_min: Optional[float] = None
+        self._nota_max: Optional[float] = None
+        self._histograma = [0] * 5
+        for avaliacao in avaliacoes or []:
+            self._anexar_avaliacao(avaliacao._cliente, avaliacao._nota)
+        self._lista_cardapio: Optional[List[ItemCardapio]] = []
+        self._indice_cardapio: Optional[
+            Dict[str, Tuple[ItemCardapio, int]]
+        ] = {}
+        self._fonte_cardapio = None
+        for item in cardapio or []:
+            self._anexar_item(item)
+        with Restaurante._trava_registro:
+            self._registrado = True
+            Restaurante.restaurantes.append(self)
+            chave = Restaurante._chave_nome(nome)
+            if Restaurante._por_nome.setdefault(chave, self) is not self:
+                Restaurante._homonimos.setdefault(chave, []).append(self)
+            Restaurante._por_categoria.adicionar(categoria.casefold(), self)
+            Restaurante._por_ativo.adicionar(ativo, self)
+            Restaurante._por_categoria_ativo.adicionar(
+                (categoria.casefold(), ativo), self
+            )
+            Restaurante._nova_geracao()
 
     @classmethod
-    def carregar_dados(cls):
+    def _nova_geracao(cls) -> None:
         """
-        Carrega os dados dos restaurantes a partir do arquivo JSON.
-        Se o arquivo não existir, a lista permanece vazia.
+        Sinaliza que o estado mudou, invalidando o que depende de geracao.
         """
-        cls.restaurantes.clear()
-        if not os.path.exists(cls.ARQUIVO_DADOS):
-            return
+        with Restaurante._trava_registro:
+            Restaurante.geracao += 1
+
+    @classmethod
+    @contextmanager
+    def _mutando(
+        cls, restaurante: Optional["Restaurante"] = None
+    ) -> Iterator[None]:
+        """
+        Envolve uma mutação pública: abre uma transação (o flush só
+        acontece depois de liberadas as travas), impede que um retrato
+        para o snapshot seja tirado no meio dela e, se informado, detém a
+        trava do restaurante. No modo "multiprocesso" a mutação parte do
+        estado atual do journal compartilhado (ver _secao_multiprocesso()).
+
+        Raises:
+        - RestauranteRemovido: Se outro processo removeu o restaurante.
+        """
+        with cls.transacao(), cls._secao_multiprocesso(), \
+                cls._trava_captura.compartilhada():
+            if restaurante is None:
+                yield
+                return
+            if (cls.MODO_PERSISTENCIA == "multiprocesso"
+                    and not restaurante._registrado):
+                raise RestauranteRemovido(
+                    f"Restaurante '{restaurante._nome}' não encontrado."
+                )
+            with restaurante._trava:
+                yield
 
+    @classmethod
+    @contextmanager
+    def _secao_multiprocesso(cls) -> Iterator[None]:
+        """
+        No modo "multiprocesso", detém a trava entre processos durante uma
+        mutação: antes de ler o estado, incorpora as mutações dos outros
+        processos; antes de soltar a trava, anexa as pendentes ao journal.
+        Assim nenhum registro é calculado sobre um estado desatualizado
+        (ex.: dois descontos sobre o mesmo preço). Nos demais modos, e
+        dentro de outra seção, não faz nada.
+        """
+        if (cls.MODO_PERSISTENCIA != "multiprocesso"
+                or cls._em_secao_multiprocesso.get()):
+            yield
+            return
+        journal = cls._journal()
+        token = cls._em_secao_multiprocesso.set(True)
         try:
-            with open(cls.ARQUIVO_DADOS, "r", encoding="utf-8") as f:
-                dados = json.load(f)
-
-            for item in dados:
-                avals = [
-                    Avaliacao(a["cliente"], a["nota"])
-                    for a in item.get("avaliacoes", [])
-                ]
-                items = []
-                for c in item.get("cardapio", []):
-                    tipo = c.get("__type__")
-                    cls_item = {
-                        "Prato": Prato,
-                        "Bebida": Bebida,
-                        "Sobremesa": Sobremesa,
-                    }.get(tipo, ItemCardapio)
-                    items.append(cls_item.from_dict(c))
-                cls(
-                    nome=item["nome"],
-                    categoria=item["categoria"],
-                    ativo=item.get("ativo", False),
-                    avaliacoes=avals,
-                    cardapio=items,
+            with journal.travar(), cls._trava_persistencia:
+                cls._sincronizar_travado()
+                try:
+                    yield
+                finally:
+                    tamanho = cls._gravar_pendentes_travado(journal)
+        finally:
+            cls._em_secao_multiprocesso.reset(token)
+        if tamanho is not None and tamanho >= cls.LIMITE_JOURNAL:
+            cls._compactar_em_segundo_plano()
+
+    @classmethod
+    def cadastrar(cls, nome: str, categoria: str) -> "Restaurante":
+        """
+        Cria um novo restaurante e persiste o cadastro.
+
+        Raises:
+        - ValueError: Se já existir um restaurante com o nome (sem
+          distinção de maiúsculas).
+        """
+        with cls._mutando():
+            # Conferido dentro da mutação: no modo "multiprocesso", só aí o
+            # estado inclui os cadastros dos outros processos
+            if cls.buscar_por_nome(nome) is not None:
+                raise ValueError(f"O restaurante '{nome}' já existe.")
+            restaurante = cls(nome, categoria)
+            cls._registrar_mutacao(
+                {"op": "criar", "nome": nome, "categoria": categoria}
+            )
+        return restaurante
+
+    @staticmethod
+    def _chave_nome(nome: str) -> str:
+        """
+        Normaliza o nome usado como chave do índice (sem distinção entre
+        maiúsculas e minúsculas).
+        """
+        return nome.casefold()
+
+    @classmethod
+    def buscar_por_nome(cls, nome: str) -> Optional["Restaurante"]:
+        """
+        Retorna o restaurante com o nome informado, ou None se não existir.
+        A comparação ignora maiúsculas/minúsculas e custa O(1).
+        """
+        return cls._por_nome.get(cls._chave_nome(nome))
+
+    @classmethod
+    def filtrar(
+        cls,
+        categoria: Optional[str] = None,
+        ativo: Optional[bool] = None,
+        apos: Optional[int] = None,
+        limite: Optional[int] = None,
+    ) -> List["Restaurante"]:
+        """
+        Lista restaurantes em ordem de cadastro usando os índices, sem
+        percorrer o catálogo inteiro.
+
+        Inputs:
+        - categoria (str | None): Filtra pela categoria (sem distinção de
+          maiúsculas).
+        - ativo (bool | None): Filtra pela situação.
+        - apos (int | None): Cursor; começa após o restaurante com este
+          _seq (que não precisa mais estar cadastrado).
+        - limite (int | None): Quantidade máxima de resultados.
+        """
+        with cls._trava_registro:
+            if categoria is not None and ativo is not None:
+                base = cls._por_categoria_ativo.grupo(
+                    (categoria.casefold(), ativo)
+                )
+            elif categoria is not None:
+                base = cls._por_categoria.grupo(categoria.casefold())
+            elif ativo is not None:
+                base = cls._por_ativo.grupo(ativo)
+            else:
+                base = cls.restaurantes
+            # Cada grupo já contém só os restaurantes filtrados: custo
+            # proporcional ao resultado
+            inicio = posicao_apos(base, apos)
+            fim = inicio + limite if limite is not None else None
+            return base[inicio:fim]
+
+    @classmethod
+    def melhores(
+        cls,
+        categoria: Optional[str] = None,
+        k: int = 10,
+        min_avaliacoes: int = 1,
+    ) -> List["Restaurante"]:
+        """
+        Os k restaurantes de maior média, lidos do ranking já ordenado.
+        O ranking só contém restaurantes avaliados, então com
+        ``min_avaliacoes`` até 1 o custo é O(k); acima disso, os que têm
+        menos avaliações são pulados um a um (custo proporcional a quantos
+        precedem os k aceitos).
+
+        Inputs:
+        - categoria (str | None): Restringe à categoria (sem distinção de
+          maiúsculas); None considera todas.
+        - k (int): Quantidade máxima de resultados.
+        - min_avaliacoes (int): Ignora restaurantes com menos avaliações.
+        """
+        chave = categoria.casefold() if categoria is not None else None
+        with cls._trava_registro:
+            grupo = cls._ranking.grupo(chave)
+            if min_avaliacoes <= 1:
+                return grupo[:k]
+            return list(
+                itertools.islice(
+                    (
+                        r for r in grupo
+                        if r._qtd_avaliacoes >= min_avaliacoes
+                    ),
+                    k,
+                )
+            )
+
+    @classmethod
+    def buscar_itens(
+        cls,
+        consulta: str,
+        tipo: Optional[str] = None,
+        max_preco: Optional[float] = None,
+        limite: Optional[int] = None,
+    ) -> List[Tuple["Restaurante", ItemCardapio]]:
+        """
+        Busca itens de cardápio em todos os restaurantes (ver
+        IndiceCardapio.buscar), sem concorrer com mutações do índice.
+
+        Os cardápios nunca indexados são lidos das fontes uma vez (sem
+        materializá-los); depois, só os itens encontrados são
+        materializados, independentemente de o LRU ter descarregado os
+        demais.
+        """
+        with cls._trava_registro:
+            pendentes = list(cls._cardapios_pendentes)
+        for r in pendentes:
+            r._indexar_cardapio()
+        with cls._trava_registro:
+            encontrados = cls._busca_cardapio.buscar(
+                consulta, tipo=tipo, max_preco=max_preco, limite=limite
+            )
+        # Removidos entre a busca e a leitura dos itens ficam de fora
+        return [
+            (r, r._cardapio[posicao])
+            for r, posicao in encontrados
+            if r._registrado
+        ]
+
+    @classmethod
+    def iterar(cls, lote: int = 500) -> Iterator["Restaurante"]:
+        """
+        Percorre o catálogo em ordem de cadastro, em lotes obtidos pelo
+        cursor, sem copiar a lista inteira; tolera cadastros e remoções
+        feitos durante o percurso.
+        """
+        apos = None
+        while True:
+            pagina = cls.filtrar(apos=apos, limite=lote)
+            yield from pagina
+            if len(pagina) < lote:
+                return
+            apos = pagina[-1]._seq
+
+    @classmethod
+    def remover(cls, nome: str) -> Optional["Restaurante"]:
+        """
+        Remove o restaurante com o nome informado e salva os dados.
+
+        Returns:
+        - Restaurante | None: O restaurante removido, ou None se não existir.
+        """
+        with cls._mutando():
+            restaurante = cls._desregistrar(nome)
+            if restaurante is not None:
+                cls._registrar_mutacao(
+                    {"op": "remover", "nome": restaurante._nome}
                 )
-        except json.JSONDecodeError:
-            # Arquivo vazio ou inválido — ignora carregamento
+        return restaurante
+
+    @classmethod
+    def _desregistrar(cls, nome: str) -> Optional["Restaurante"]:
+        """
+        Retira o restaurante da lista e do índice, sem persistir.
+        """
+        chave = cls._chave_nome(nome)
+        with cls._trava_registro:
+            restaurante = cls._por_nome.pop(chave, None)
+            if restaurante is None:
+                return None
+            del cls.restaurantes[
+                posicao_apos(cls.restaurantes, restaurante._seq) - 1
+            ]
+            cls._por_categoria.remover(
+                restaurante._categoria.casefold(), restaurante
+            )
+            cls._por_ativo.remover(restaurante._ativo, restaurante)
+            cls._por_categoria_ativo.remover(
+                (restaurante._categoria.casefold(), restaurante._ativo),
+                restaurante,
+            )
+            restaurante._registrado = False
+            cls._materializados.remover(restaurante)
+            cls._cardapios_pendentes.discard(restaurante)
+            cls._busca_cardapio.remover_restaurante(restaurante)
+            if restaurante._qtd_avaliacoes:
+                for chave_ranking in restaurante._chaves_ranking():
+                    cls._ranking.remover(chave_ranking, restaurante)
+            cls._nova_geracao()
+            # Um homônimo carregado do arquivo passa a responder pelo nome
+            homonimos = cls._homonimos.get(chave)
+            if homonimos:
+                cls._por_nome[chave] = homonimos.pop(0)
+                if not homonimos:
+                    del cls._homonimos[chave]
+            return restaurante
+
+    @classmethod
+    def limpar_registro(cls) -> None:
+        """
+        Esvazia a lista de restaurantes e os índices.
+        """
+        with cls._trava_registro:
+            for r in cls.restaurantes:
+                r._registrado = False
             cls.restaurantes.clear()
+            cls._por_nome.clear()
+            cls._homonimos.clear()
+            cls._por_categoria.limpar()
+            cls._por_ativo.limpar()
+            cls._por_categoria_ativo.limpar()
+            cls._ranking.limpar()
+            cls._busca_cardapio.limpar()
+            cls._cardapios_pendentes.clear()
+            cls._materializados.limpar()
+            cls._seq_journal = 0
+            cls._nova_geracao()
 
     @classmethod
-    def salvar_dados(cls):
+    def _journal(cls) -> Journal:
         """
-        Salva todos os restaurantes em um arquivo JSON.
-        Inclui nome, categoria, status, avaliações e cardápio
-        (bebidas, pratos e sobremesas).
+        Journal de mutações gravado ao lado de ARQUIVO_DADOS.
+        """
+        base, _ = os.path.splitext(cls.ARQUIVO_DADOS)
+        return Journal(base + ".journal.jsonl")
+
+    @classmethod
+    def _repositorio(cls) -> Repositorio:
+        """
+        Repositório do modo "sqlite": banco com o nome de ARQUIVO_DADOS e
+        extensão .db, aberto uma vez e reaproveitado.
+        """
+        base, _ = os.path.splitext(cls.ARQUIVO_DADOS)
+        caminho = base + ".db"
+        with cls._trava_persistencia:
+            aberto = cls._repositorio_aberto
+            if aberto is None or aberto.caminho != caminho:
+                if aberto is not None:
+                    aberto.fechar()
+                cls._repositorio_aberto = RepositorioSQLite(caminho)
+            return cls._repositorio_aberto
+
+    @classmethod
+    def carregar_dados(cls) -> dict:
+        """
+        Carrega os dados dos restaurantes a partir do arquivo JSON e
+        reaplica as mutações pendentes no journal, se houver.
+        Se o arquivo não existir, a lista permanece vazia. Um arquivo
+        danificado é preservado com o sufixo ".corrompido" e a carga
+        recorre à geração anterior do snapshot.
+
+        O arquivo é lido de forma incremental (array JSON ou NDJSON, ver
+        persistencia.formato_snapshot), construindo um restaurante por vez.
+        No modo "sqlite" os restaurantes vêm do banco (ver _repositorio()).
+
+        Returns:
+        - dict: Quantidade de restaurantes, avaliações e itens carregados
+          e o tempo gasto, em segundos.
+        """
+        inicio = time.perf_counter()
+        with cls._trava_entre_processos(exclusiva=False), \
+                cls._trava_persistencia, cls._trava_captura.exclusiva():
+            cls._recarregar()
+        return {
+            "restaurantes": len(cls.restaurantes),
+            "avaliacoes": sum(r._qtd_avaliacoes for r in cls.restaurantes),
+            "itens_cardapio": sum(
+                r._tamanho_cardapio() for r in cls.restaurantes
+            ),
+            "segundos": time.perf_counter() - inicio,
+        }
+
+    @classmethod
+    def _recarregar(cls) -> None:
+        """
+        Refaz o registro a partir do armazenamento, descartando o estado
+        em memória e as mutações pendentes.
+        """
+        cls.limpar_registro()
+        with cls._trava_pendentes:
+            cls._pendentes.clear()
+        if cls.MODO_PERSISTENCIA == "sqlite" and cls.CARGA_SOB_DEMANDA:
+            for cabecalho in cls._repositorio().carregar_cabecalhos():
+                cls._de_cabecalho(cabecalho)
+        elif cls.MODO_PERSISTENCIA == "sqlite":
+            for item in cls._repositorio().carregar():
+                cls._de_dict(item)
+        else:
+            cls._carregar_arquivos()
+        cls._nova_geracao()
+
+    @classmethod
+    def _carregar_arquivos(cls) -> None:
+        """
+        Carrega o snapshot (ou a geração anterior) e reaplica o journal.
+        """
+        principal = cls.ARQUIVO_DADOS
+        if os.path.exists(principal) and not cls._carregar_snapshot(principal):
+            os.replace(principal, principal + ".corrompido")
+        if not os.path.exists(principal):
+            anterior = caminho_anterior(principal)
+            if os.path.exists(anterior):
+                cls._carregar_snapshot(anterior)
+
+        journal = cls._journal()
+        if cls.MODO_PERSISTENCIA == "multiprocesso":
+            cls._acompanhar_journal(journal)
+            registros = cls._leitor_journal.ler()
+        else:
+            registros = journal.registros()
+        for registro in registros:
+            cls._reaplicar(registro)
+
+    @classmethod
+    def _trava_entre_processos(cls, exclusiva: bool = True):
+        """
+        No modo "multiprocesso", a trava do journal compartilhado (ver
+        Journal.travar()); nos demais, um contexto vazio.
+        """
+        if cls.MODO_PERSISTENCIA == "multiprocesso":
+            return cls._journal().travar(exclusiva)
+        return nullcontext()
+
+    @classmethod
+    def _acompanhar_journal(cls, journal: Journal) -> None:
+        """
+        Passa a acompanhar a geração atual do journal, desde o início.
+        """
+        if cls._leitor_journal is not None:
+            cls._leitor_journal.fechar()
+        cls._leitor_journal = LeitorJournal(journal.caminho)
+        cls._compactacoes = journal.compactacoes()
+
+    @classmethod
+    def sincronizar(cls) -> bool:
+        """
+        Modo "multiprocesso": incorpora as mutações que outros processos
+        gravaram no journal compartilhado desde a última leitura. Sem
+        novidades custa um stat do journal.
+
+        Returns:
+        - bool: True se o estado mudou.
+        """
+        if not cls._desatualizado():
+            return False
+        with cls._trava_entre_processos(exclusiva=False), \
+                cls._trava_persistencia:
+            return cls._sincronizar_travado()
+
+    @classmethod
+    async def sincronizar_async(cls) -> bool:
+        """
+        Como sincronizar(), com a leitura no executor de persistência.
+        """
+        if not cls._desatualizado():
+            return False
+        return await cls._no_executor(cls.sincronizar)
+
+    @classmethod
+    def _desatualizado(cls) -> bool:
+        leitor = cls._leitor_journal
+        return (
+            cls.MODO_PERSISTENCIA == "multiprocesso"
+            and (leitor is None or leitor.desatualizado())
+        )
+
+    @classmethod
+    def _sincronizar_travado(cls, locais: Iterable[dict] = ()) -> bool:
+        """
+        Corpo de sincronizar(), com a trava entre processos e
+        _trava_persistencia já detidas.
+
+        As mutações seguem a ordem do journal: as de outros processos são
+        reaplicadas, sem repetir as deste. Se o journal foi compactado uma
+        vez desde a última leitura, o final da geração antiga é lido pelo
+        arquivo ainda aberto e a nova é lida desde o início; depois de mais
+        de uma compactação o estado é recarregado do snapshot, e as
+        mutações ainda não gravadas deste processo (``locais`` e as
+        pendentes) são reaplicadas sobre ele.
+        """
+        journal = cls._journal()
+        compactacoes = journal.compactacoes()
+        leitor = cls._leitor_journal
+        with cls._trava_captura.exclusiva():
+            if leitor is None or compactacoes > cls._compactacoes + 1:
+                pendentes = cls._tomar_pendentes()
+                cls._recarregar()
+                for registro in [*locais, *pendentes]:
+                    cls._reaplicar(registro)
+                cls._devolver_pendentes(pendentes)
+                return True
+            registros = list(leitor.ler())
+            if compactacoes != cls._compactacoes:
+                cls._acompanhar_journal(journal)
+                registros.extend(cls._leitor_journal.ler())
+            for registro in registros:
+                cls._reaplicar(registro)
+        if registros:
+            cls._nova_geracao()
+        return bool(registros)
+
+    @classmethod
+    def _de_dict(cls, item: dict) -> "Restaurante":
+        """
+        Constrói um restaurante a partir do formato de to_dict().
+        """
+        items = [_item_de_dict(c) for c in item.get("cardapio", [])]
+        r = cls(
+            nome=item["nome"],
+            categoria=item["categoria"],
+            ativo=item.get("ativo", False),
+            cardapio=items,
+        )
+        for a in item.get("avaliacoes", []):
+            r._anexar_avaliacao(a["cliente"], a["nota"])
+        return r
+
+    @classmethod
+    def _de_cabecalho(cls, c: CabecalhoRestaurante) -> "Restaurante":
+        """
+        Constrói um restaurante só com os campos fixos e os agregados
+        lidos do armazenamento; avaliações e cardápio ficam nas fontes do
+        cabeçalho até serem usados.
+        """
+        r = cls(c.nome, c.categoria, c.ativo)
+        with cls._trava_registro:
+            if c.qtd_avaliacoes:
+                r._armazem_avaliacoes = None
+                r._fonte_avaliacoes = c.avaliacoes
+                r._qtd_avaliacoes = c.qtd_avaliacoes
+                r._soma_notas = c.soma_notas
+                r._nota_min = c.nota_min
+                r._nota_max = c.nota_max
+                r._histograma = list(c.histograma)
+                for chave in r._chaves_ranking():
+                    cls._ranking.adicionar(chave, r)
+            if len(c.cardapio):
+                r._lista_cardapio = None
+                r._indice_cardapio = None
+                r._fonte_cardapio = c.cardapio
+                cls._cardapios_pendentes.add(r)
+        return r
+
+    @classmethod
+    def _carregar_snapshot(cls, caminho: str) -> bool:
+        """
+        Constrói os restaurantes gravados em um snapshot, à medida que
+        cada registro é lido. Um snapshot binário é mapeado em memória e
+        só os campos fixos de cada restaurante são lidos (ver
+        _de_cabecalho()).
+
+        Returns:
+        - bool: False se o arquivo estiver vazio ou inválido (o registro
+          é deixado vazio).
         """
         try:
-            diretorio = os.path.dirname(cls.ARQUIVO_DADOS)
-            os.makedirs(diretorio, exist_ok=True)
+            if formato_snapshot(caminho) == "binario":
+                snapshot = SnapshotBinario(caminho)
+                cls._seq_journal = snapshot.seq_journal
+                for cabecalho in snapshot.cabecalhos():
+                    cls._de_cabecalho(cabecalho)
+            else:
+                for item in ler_snapshot(caminho):
+                    cls._seq_journal = max(
+                        cls._seq_journal, item.get("seq", 0)
+                    )
+                    cls._de_dict(item)
+            return True
+        # ValueError inclui json.JSONDecodeError
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"[Erro ao carregar dados] {caminho}: {e!r}")
+            cls.limpar_registro()
+            return False
 
-            dados = []
-            for r in cls.restaurantes:
-                dados.append(
-                    {
-                        "nome": r._nome,
-                        "categoria": r._categoria,
-                        "ativo": r._ativo,
-                        "avaliacoes": [
-                            {"cliente": a._cliente, "nota": a._nota}
-                            for a in r._avaliacao
-                        ],
-                        "cardapio": [item.to_dict() for item in r._cardapio],
-                    }
+    @classmethod
+    def _avancar_seq(cls, registro: dict) -> bool:
+        """
+        Acompanha o número de ordem dos registros reaplicados.
+
+        Returns:
+        - bool: False se o registro já está contido no snapshot carregado
+          (compactação interrompida antes de o journal ser descartado).
+        """
+        seq = registro.get("seq")
+        if seq is None:
+            return True
+        if seq <= cls._seq_journal:
+            return False
+        cls._seq_journal = seq
+        return True
+
+    @classmethod
+    def _reaplicar(cls, registro: dict) -> None:
+        """
+        Reaplica em memória uma mutação lida do journal, exceto se o
+        snapshot já a contiver (ver _avancar_seq()).
+        """
+        if not cls._avancar_seq(registro):
+            return
+        op = registro["op"]
+        if op == "criar":
+            if cls.buscar_por_nome(registro["nome"]) is None:
+                cls(registro["nome"], registro["categoria"])
+            return
+        if op == "remover":
+            cls._desregistrar(registro["nome"])
+            return
+
+        r = cls.buscar_por_nome(registro["nome"])
+        if r is None:
+            return
+        if op == "alternar":
+            r._definir_ativo(registro["ativo"])
+        elif op == "avaliar":
+            r._anexar_avaliacao(registro["cliente"], registro["nota"])
+        elif op == "cardapio":
+            r._anexar_item(_item_de_dict(registro["item"]))
+        elif op == "desconto":
+            r._reaplicar_desconto(
+                registro["item"], registro["preco"],
+                registro.get("ocorrencia", 0),
+            )
+
+    def _reaplicar_desconto(
+        self, nome_item: str, preco: float, ocorrencia: int
+    ) -> None:
+        """
+        Reaplica o preço gravado por um desconto (ver _reaplicar()).
+        """
+        achado = self._localizar_item(nome_item, ocorrencia)
+        if achado is not None:
+            item, posicao = achado
+            item._preco = preco
+            item._invalidar_dict()
+            self._versao = _ALTERADO
+            self._alteracoes += 1
+            with Restaurante._trava_registro:
+                Restaurante._busca_cardapio.atualizar_preco(
+                    self, posicao, preco
+                )
+
+    @classmethod
+    def _registrar_mutacao(cls, registro: dict) -> int:
+        """
+        Marca o estado como sujo, guardando a mutação para o próximo flush.
+        Fora de uma transação o flush acontece imediatamente.
+
+        Returns:
+        - int: Número de ordem da mutação (ver _versao).
+        """
+        cls._nova_geracao()
+        with cls._trava_pendentes:
+            cls._pendentes.append(registro)
+            cls._mutacoes += 1
+            numero = cls._mutacoes
+        if cls._profundidade_transacao.get() == 0:
+            cls._solicitar_flush()
+        return numero
+
+    @classmethod
+    @contextmanager
+    def transacao(cls) -> Iterator[None]:
+        """
+        Unidade de trabalho: as mutações feitas dentro do bloco são
+        gravadas em um único flush ao final (transações aninhadas só
+        gravam ao sair da mais externa). A profundidade é contada por
+        thread e por tarefa asyncio.
+        """
+        token = cls._profundidade_transacao.set(
+            cls._profundidade_transacao.get() + 1
+        )
+        try:
+            yield
+        finally:
+            cls._profundidade_transacao.reset(token)
+            if cls._profundidade_transacao.get() == 0:
+                cls._solicitar_flush()
+
+    @classmethod
+    @asynccontextmanager
+    async def transacao_async(cls) -> AsyncIterator[None]:
+        """
+        Como transacao(), para código assíncrono: o flush ao final roda no
+        executor de persistência (ver persistir_async()), sem bloquear o
+        event loop.
+        """
+        token = cls._profundidade_transacao.set(
+            cls._profundidade_transacao.get() + 1
+        )
+        try:
+            yield
+        finally:
+            cls._profundidade_transacao.reset(token)
+            if cls._profundidade_transacao.get() == 0:
+                if cls._agendador is not None:
+                    cls._agendador.agendar()
+                else:
+                    await cls.persistir_async()
+
+    @classmethod
+    def _solicitar_flush(cls) -> None:
+        """
+        Grava as mutações pendentes agora ou, com o agendador ativo,
+        deixa o flush para a thread de fundo.
+        """
+        if cls._agendador is not None:
+            cls._agendador.agendar()
+        else:
+            cls.persistir()
+
+    @classmethod
+    def iniciar_agendador(cls, intervalo_ms: int) -> None:
+        """
+        Passa a gravar o estado sujo em segundo plano, coalescendo as
+        mutações e gravando no máximo a cada ``intervalo_ms``.
+        """
+        cls.parar_agendador()
+        cls._agendador = AgendadorFlush(cls.persistir, intervalo_ms)
+        cls._agendador.iniciar()
+
+    @classmethod
+    def parar_agendador(cls) -> None:
+        """
+        Encerra o agendador, se ativo, garantindo um flush final.
+        """
+        agendador, cls._agendador = cls._agendador, None
+        if agendador is not None:
+            agendador.parar()
+
+    @classmethod
+    def encerrar(cls) -> None:
+        """
+        Drena o agendador e grava o que restar, sem regravar o snapshot
+        se o flush final já o deixou em dia. No modo "journal" o journal
+        é compactado em um snapshot, se tiver registros.
+        """
+        cls.parar_agendador()
+        cls.persistir()
+        if cls.MODO_PERSISTENCIA == "journal" and cls._journal().tamanho():
+            cls.salvar_dados()
+
+    @classmethod
+    def persistir(cls) -> bool:
+        """
+        Grava as mutações pendentes conforme MODO_PERSISTENCIA: anexa os
+        registros ao journal (compartilhado, no modo "multiprocesso"),
+        aplica-os ao banco SQLite ou regrava o snapshot completo.
+
+        Returns:
+        - bool: True se havia algo a gravar.
+        """
+        if cls.MODO_PERSISTENCIA == "multiprocesso":
+            return cls._persistir_multiprocesso()
+        if cls.MODO_PERSISTENCIA not in ("journal", "sqlite"):
+            with cls._trava_pendentes:
+                if not cls._pendentes:
+                    return False
+            cls.salvar_dados()
+        else:
+            with cls._trava_persistencia:
+                registros = cls._tomar_pendentes()
+                if not registros:
+                    return False
+                try:
+                    if cls.MODO_PERSISTENCIA == "journal":
+                        tamanho = cls._anexar_ao_journal(
+                            cls._journal(), registros
+                        )
+                        if tamanho >= cls.LIMITE_JOURNAL:
+                            cls._compactar_em_segundo_plano()
+                    else:
+                        cls._repositorio().aplicar(registros)
+                        cls._mutacoes_persistidas = cls._mutacoes_tomadas
+                except Exception:
+                    cls._devolver_pendentes(registros)
+                    raise
+        with cls._trava_pendentes:
+            cls.contador_flushes += 1
+        return True
+
+    @classmethod
+    def _persistir_multiprocesso(cls) -> bool:
+        """
+        Anexa as mutações pendentes ao journal compartilhado, depois de
+        incorporar as gravadas pelos outros processos. As feitas por
+        _mutando() já são anexadas na própria mutação; aqui sobram as que
+        uma gravação com falha devolveu.
+        """
+        with cls._trava_pendentes:
+            if not cls._pendentes:
+                return False
+        journal = cls._journal()
+        with journal.travar(), cls._trava_persistencia:
+            tamanho = cls._gravar_pendentes_travado(journal)
+        if tamanho is None:
+            return False
+        if tamanho >= cls.LIMITE_JOURNAL:
+            cls._compactar_em_segundo_plano()
+        return True
+
+    @classmethod
+    def _gravar_pendentes_travado(cls, journal: Journal) -> Optional[int]:
+        """
+        Corpo de _persistir_multiprocesso(), com a trava entre processos e
+        _trava_persistencia já detidas.
+
+        Returns:
+        - int | None: Tamanho do journal após a gravação, ou None se não
+          havia mutações pendentes.
+        """
+        registros = cls._tomar_pendentes()
+        if not registros:
+            return None
+        try:
+            cls._sincronizar_travado(registros)
+            tamanho = cls._anexar_ao_journal(journal, registros)
+        except Exception:
+            cls._devolver_pendentes(registros)
+            raise
+        # Os registros recém-gravados já estão aplicados em memória
+        cls._leitor_journal.posicao = tamanho
+        with cls._trava_pendentes:
+            cls.contador_flushes += 1
+        return tamanho
+
+    @classmethod
+    def _anexar_ao_journal(
+        cls, journal: Journal, registros: List[dict]
+    ) -> int:
+        """
+        Anexa cópias dos registros numeradas em sequência ("seq") a partir
+        de _seq_journal, que só avança se a gravação der certo. Chamar com
+        _trava_persistencia (e a trava entre processos, se for o caso).
+
+        Returns:
+        - int: Tamanho do journal em bytes após a gravação.
+        """
+        seq = cls._seq_journal
+        tamanho = journal.anexar(
+            *(dict(r, seq=seq + i) for i, r in enumerate(registros, 1))
+        )
+        cls._seq_journal = seq + len(registros)
+        return tamanho
+
+    @classmethod
+    def _tomar_pendentes(cls) -> List[dict]:
+        """
+        Retira e retorna as mutações pendentes.
+        """
+        with cls._trava_pendentes:
+            registros = cls._pendentes[:]
+            cls._pendentes.clear()
+            cls._mutacoes_tomadas = cls._mutacoes
+        return registros
+
+    @classmethod
+    def _devolver_pendentes(cls, registros: List[dict]) -> None:
+        """
+        Recoloca, antes das mais novas, mutações cuja gravação falhou.
+        """
+        with cls._trava_pendentes:
+            cls._pendentes[:0] = registros
+
+    @classmethod
+    def _executor_persistencia(cls) -> ThreadPoolExecutor:
+        """
+        Executor de uma única thread para a persistência assíncrona; as
+        gravações pedidas pelo event loop correm em ordem, fora dele.
+        """
+        with cls._trava_executor:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="persistencia"
                 )
+            return cls._executor
+
+    @classmethod
+    async def _no_executor(cls, funcao: Callable[[], _T]) -> _T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            cls._executor_persistencia(), funcao
+        )
+
+    @classmethod
+    async def persistir_async(cls) -> bool:
+        """
+        Executa persistir() no executor de persistência.
+        """
+        return await cls._no_executor(cls.persistir)
+
+    @classmethod
+    async def salvar_dados_async(cls) -> None:
+        """
+        Executa salvar_dados() (serialização e gravação) no executor de
+        persistência.
+        """
+        await cls._no_executor(cls.salvar_dados)
+
+    @classmethod
+    async def encerrar_async(cls) -> None:
+        """
+        Executa encerrar() (flush final e compactação) no executor de
+        persistência.
+        """
+        await cls._no_executor(cls.encerrar)
+
+    @classmethod
+    def _compactar_em_segundo_plano(cls) -> None:
+        """
+        Dispara, se ainda não houver uma em andamento, a compactação do
+        journal em um snapshot numa thread separada.
+        """
+        with cls._trava_persistencia:
+            if cls._compactacao is not None and cls._compactacao.is_alive():
+                return
+            cls._compactacao = threading.Thread(
+                target=cls.salvar_dados, name="compactacao-journal",
+                daemon=True,
+            )
+            cls._compactacao.start()
+
+    @classmethod
+    def salvar_dados(cls):
+        """
+        Salva todos os restaurantes em um arquivo JSON.
+        Inclui nome, categoria, status, avaliações e cardápio
+        (bebidas, pratos e sobremesas). Como o snapshot passa a conter
+        todas as mutações, o journal é descartado em seguida.
+
+        A gravação é atômica (arquivo temporário + fsync + os.replace) e
+        a geração anterior fica disponível como fallback para a carga.
+        Cada restaurante é serializado e gravado em sequência, sem montar
+        o conteúdo inteiro em memória. No modo "sqlite" o conteúdo do banco
+        é substituído, em uma única transação.
 
-            with open(cls.ARQUIVO_DADOS, "w", encoding="utf-8") as f:
-                json.dump(dados, f, ensure_ascii=False, indent=4)
+        As mutações ficam bloqueadas só enquanto se tira o retrato dos
+        restaurantes (ver VisaoRestaurante); as feitas durante a gravação
+        continuam pendentes (ou no final do journal) para o próximo flush.
+        """
+        caminho = cls.ARQUIVO_DADOS
+        try:
+            with cls._trava_gravacao:
+                if cls.MODO_PERSISTENCIA == "sqlite":
+                    # Nenhum flush pode aplicar mutações ao banco entre o
+                    # retrato e a substituição
+                    with cls._trava_persistencia:
+                        visoes, capturados, _ = cls._capturar()
+                        try:
+                            cls._repositorio().substituir(
+                                v.to_dict() for v in visoes
+                            )
+                            cls._mutacoes_persistidas = cls._mutacoes_tomadas
+                        except Exception:
+                            cls._devolver_pendentes(capturados)
+                            raise
+                    return
+                journal = cls._journal()
+                if cls.MODO_PERSISTENCIA == "multiprocesso":
+                    cls._salvar_multiprocesso(journal)
+                    return
+                with cls._trava_persistencia:
+                    visoes, capturados, posicao = cls._capturar(journal)
+                    seq = cls._seq_journal
+                try:
+                    gravar_atomico(
+                        caminho,
+                        lambda f: escrever_snapshot(
+                            f, _registros_snapshot(visoes, seq), caminho
+                        ),
+                    )
+                except Exception:
+                    cls._devolver_pendentes(capturados)
+                    raise
+                with cls._trava_persistencia:
+                    journal.descartar_ate(posicao)
+                cls._adotar_snapshot(caminho, visoes)
         except Exception as e:
             print(f"[Erro ao salvar dados] {e}")
             raise
 
+    @classmethod
+    def _salvar_multiprocesso(cls, journal: Journal) -> None:
+        """
+        Compacta o journal compartilhado em um snapshot. A trava entre
+        processos é detida só para tirar o retrato e, depois, para trocar
+        o snapshot e descartar o trecho do journal que ele contém: durante
+        a gravação os outros processos continuam anexando ao journal. Se
+        outro processo compactar nesse meio-tempo, o snapshot gravado é
+        abandonado (o dele já está em vigor, com o journal coerente).
+        """
+        caminho = cls.ARQUIVO_DADOS
+        with journal.travar(), cls._trava_persistencia:
+            cls._sincronizar_travado()
+            with cls._trava_captura.exclusiva():
+                visoes = [VisaoRestaurante(r) for r in cls.restaurantes]
+                # Tudo o que o snapshot contém precisa estar no journal
+                # antes da troca, para os processos que o acompanham
+                capturados = cls._tomar_pendentes()
+                if capturados:
+                    cls._leitor_journal.posicao = cls._anexar_ao_journal(
+                        journal, capturados
+                    )
+                seq = cls._seq_journal
+            posicao = cls._leitor_journal.posicao
+            compactacoes = cls._compactacoes
+        temporario = gravar_temporario(
+            caminho,
+            lambda f: escrever_snapshot(
+                f, _registros_snapshot(visoes, seq), caminho
+            ),
+        )
+        with journal.travar(), cls._trava_persistencia:
+            if journal.compactacoes() != compactacoes:
+                os.remove(temporario)
+                return
+            instalar(temporario, caminho)
+            # Os registros anexados durante a gravação permanecem; quem
+            # já os leu da geração antiga os ignora pelo "seq"
+            journal.descartar_ate(posicao)
+            journal.registrar_compactacao()
+            cls._sincronizar_travado()
+            # Ainda com a trava: outro processo pode trocar o arquivo
+            cls._adotar_snapshot(caminho, visoes)
+
+    @classmethod
+    def _adotar_snapshot(
+        cls, caminho: str, visoes: List[VisaoRestaurante]
+    ) -> None:
+        """
+        Após gravar um snapshot binário, passa a ler dele as avaliações e o
+        cardápio dos restaurantes que não mudaram desde o retrato. Suas
+        mudanças, que a fonte antiga não tinha, agora estão na fonte: o
+        LRU de _materializados volta a poder descarregá-los (ver
+        _descarregar()). Os alterados durante a gravação seguem fixos em
+        memória até o próximo snapshot.
+        """
+        if formato_snapshot(caminho) != "binario":
+            return
+        snapshot = SnapshotBinario(caminho)
+        for i, visao in enumerate(visoes):
+            r = visao._restaurante
+            with r._trava:
+                if not r._registrado or r._alteracoes != visao._alteracoes:
+                    continue
+                c = snapshot.cabecalho(i)
+                if c.qtd_avaliacoes:
+                    armazem = r._armazem_avaliacoes
+                    if armazem is not None and armazem.somente_leitura:
+                        # Solta o mapeamento do arquivo antigo
+                        r._armazem_avaliacoes = None
+                    r._fonte_avaliacoes = c.avaliacoes
+                if len(c.cardapio):
+                    r._fonte_cardapio = c.cardapio
+                r._versao = 0
+                r._contabilizar()
+
+    @classmethod
+    def _capturar(
+        cls, journal: Optional[Journal] = None
+    ) -> Tuple[List[VisaoRestaurante], List[dict], int]:
+        """
+        Retrato consistente do catálogo, tirado sem mutações em curso.
+
+        Returns:
+        - tuple: As visões dos restaurantes, as mutações pendentes que
+          elas já contêm (retiradas da fila) e o tamanho do journal no
+          momento do retrato (0 sem journal).
+        """
+        with cls._trava_captura.exclusiva():
+            visoes = [VisaoRestaurante(r) for r in cls.restaurantes]
+            capturados = cls._tomar_pendentes()
+            posicao = journal.tamanho() if journal is not None else 0
+        return visoes, capturados, posicao
+
+    def to_dict(
+        self,
+        max_avaliacoes: Optional[int] = None,
+        max_cardapio: Optional[int] = None,
+    ) -> dict:
+        """
+        Serializa o restaurante com avaliações e cardápio, no formato
+        gravado em ARQUIVO_DADOS.
+
+        Inputs:
+        - max_avaliacoes (int | None): Limita às N avaliações mais recentes.
+        - max_cardapio (int | None): Limita aos N primeiros itens.
+        """
+        with self._trava:
+            avaliacoes: List[dict] = []
+            if max_avaliacoes != 0:
+                armazem = self._avaliacao
+                inicio = 0
+                if max_avaliacoes is not None:
+                    inicio = max(len(armazem) - max_avaliacoes, 0)
+                avaliacoes = armazem.para_dicts(inicio)
+            itens = self._lista_cardapio
+            if itens is None:
+                # Lido da fonte sem materializar os itens
+                cardapio = self._fonte_cardapio.para_dicts(max_cardapio)
+            else:
+                cardapio = [item.to_dict() for item in itens[:max_cardapio]]
+            return {
+                "nome": self._nome,
+                "categoria": self._categoria,
+                "ativo": self._ativo,
+                "avaliacoes": avaliacoes,
+                "cardapio": cardapio,
+            }
+
+    def _definir_ativo(self, ativo: bool) -> None:
+        """
+        Altera a situação mantendo os índices por situação.
+        """
+        if ativo == self._ativo:
+            return
+        composto = Restaurante._por_categoria_ativo
+        categoria = self._categoria.casefold()
+        with Restaurante._trava_registro:
+            Restaurante._por_ativo.remover(self._ativo, self)
+            composto.remover((categoria, self._ativo), self)
+            self._ativo = ativo
+            Restaurante._por_ativo.adicionar(ativo, self)
+            composto.adicionar((categoria, ativo), self)
+
     def alternar_estado(self) -> str:
         """
         Alterna o estado ativo/inativo e salva os dados.
         """
-        self._ativo = not self._ativo
-        Restaurante.salvar_dados()
+        with Restaurante._mutando(self):
+            ativo = not self._ativo
+            self._definir_ativo(ativo)
+            Restaurante._registrar_mutacao(
+                {"op": "alternar", "nome": self._nome, "ativo": ativo}
+            )
         return (f"O restaurante '{self._nome}' foi "
-                f"{'ativado' if self._ativo else 'inativado'}")
+                f"{'ativado' if ativo else 'inativado'}")
 
     def receber_avaliacao(self, cliente: str, nota: float) -> None:
         """
         Adiciona uma avaliação ou propaga ValueError.
         """
-        avaliacao = Avaliacao(cliente, nota)
-        self._avaliacao.append(avaliacao)
-        Restaurante.salvar_dados()
+        with Restaurante._mutando(self):
+            self._anexar_avaliacao(cliente, nota)
+            self._versao = Restaurante._registrar_mutacao(
+                {
+                    "op": "avaliar",
+                    "nome": self._nome,
+                    "cliente": cliente,
+                    "nota": nota,
+                }
+            )
+
+    def _anexar_avaliacao(self, cliente: str, nota: float) -> None:
+        """
+        Guarda a avaliação e atualiza os agregados em O(1).
+        """
+        armazem = self._avaliacao
+        copiado = armazem.somente_leitura
+        if copiado:
+            armazem = armazem.materializar(Restaurante.ARMAZEM_AVALIACOES)
+            self._armazem_avaliacoes = armazem
+        armazem.anexar(cliente, nota)
+        self._versao = _ALTERADO
+        self._alteracoes += 1
+        if self._fonte_avaliacoes is not None:
+            # A cópia do arquivo passa a ocupar memória: conta tudo de uma
+            # vez; depois, só o acréscimo
+            if copiado:
+                with self._trava:
+                    self._contabilizar()
+            else:
+                self._contabilizar_acrescimo(armazem.bytes_ultima())
+        # A posição no ranking depende da média: sai antes de mudá-la, sem
+        # que outra thread reordene o ranking no meio da troca
+        with Restaurante._trava_registro:
+            if self._qtd_avaliacoes:
+                for chave in self._chaves_ranking():
+                    Restaurante._ranking.remover(chave, self)
+            self._qtd_avaliacoes += 1
+            self._soma_notas += nota
+            if self._nota_min is None or nota < self._nota_min:
+                self._nota_min = nota
+            if self._nota_max is None or nota > self._nota_max:
+                self._nota_max = nota
+            self._histograma[min(max(int(nota), 1), 5) - 1] += 1
+            for chave in self._chaves_ranking():
+                Restaurante._ranking.adicionar(chave, self)
+
+    def _chaves_ranking(self) -> tuple:
+        """
+        Grupos do ranking em que o restaurante aparece.
+        """
+        return (None, self._categoria.casefold())
 
     @property
     def media_avaliacoes(self) -> Union[float, str]:
         """
-        Calcula e retorna a média das avaliações, ou '-' se não houver.
+        Retorna a média das avaliações, ou '-' se não houver, a partir
+        dos agregados mantidos a cada avaliação.
         """
-        if not self._avaliacao:
+        if not self._qtd_avaliacoes:
             return "-"
-        return round(
-            sum(a._nota for a in self._avaliacao) / len(self._avaliacao), 1
-        )
+        return round(self._soma_notas / self._qtd_avaliacoes, 1)
+
+    @property
+    def estatisticas_avaliacoes(self) -> dict:
+        """
+        Quantidade, média, menor e maior nota e histograma das avaliações.
+        """
+        return {
+            "quantidade": self._qtd_avaliacoes,
+            "media": self.media_avaliacoes,
+            "minima": self._nota_min,
+            "maxima": self._nota_max,
+            "histograma": list(self._histograma),
+        }
 
     def adicionar_ao_cardapio(self, item: ItemCardapio) -> None:
         """
@@ -165,8 +1541,359 @@ class Restaurante:
         Inputs:
         - item (ItemCardapio): Instância de Prato, Bebida ou Sobremesa.
         """
-        self._cardapio.append(item)
-        Restaurante.salvar_dados()
+        with Restaurante._mutando(self):
+            self._anexar_item(item)
+            self._versao = Restaurante._registrar_mutacao(
+                {"op": "cardapio", "nome": self._nome, "item": item.to_dict()}
+            )
+
+    def _anexar_item(self, item: ItemCardapio) -> None:
+        """
+        Guarda o item e atualiza o índice por nome e o índice de busca.
+        """
+        itens = self._cardapio
+        itens.append(item)
+        self._itens_por_nome.setdefault(
+            item._nome.lower(), (item, len(itens) - 1)
+        )
+        self._versao = _ALTERADO
+        self._alteracoes += 1
+        with Restaurante._trava_registro:
+            Restaurante._busca_cardapio.adicionar(self, item)
+        if self._fonte_cardapio is not None:
+            self._contabilizar_acrescimo(bytes_itens([item]))
+
+    @property
+    def _avaliacao(self) -> Union[ListaAvaliacoes, AvaliacoesColunares]:
+        """
+        Armazém de avaliações, materializado da fonte se preciso.
+        """
+        armazem = self._armazem_avaliacoes
+        if armazem is None:
+            return self._carregar_avaliacoes()
+        if self._fonte_avaliacoes is not None:
+            Restaurante._materializados.tocar(self)
+        return armazem
+
+    @_avaliacao.setter
+    def _avaliacao(
+        self, armazem: Union[ListaAvaliacoes, AvaliacoesColunares]
+    ) -> None:
+        self._armazem_avaliacoes = armazem
+
+    def _carregar_avaliacoes(self) -> Union[ListaAvaliacoes,
+                                            AvaliacoesColunares]:
+        """
+        Lê as avaliações da fonte e as registra no LRU.
+        """
+        with self._trava:
+            armazem = self._armazem_avaliacoes
+            if armazem is None:
+                armazem = self._fonte_avaliacoes.carregar(
+                    Restaurante.ARMAZEM_AVALIACOES
+                )
+                self._armazem_avaliacoes = armazem
+                self._contabilizar()
+            return armazem
+
+    @property
+    def _cardapio(self) -> List[ItemCardapio]:
+        """
+        Itens do cardápio, materializados da fonte se preciso.
+        """
+        itens = self._lista_cardapio
+        if itens is None:
+            return self._materializar_cardapio()[0]
+        if self._fonte_cardapio is not None:
+            Restaurante._materializados.tocar(self)
+        return itens
+
+    @property
+    def _itens_por_nome(self) -> Dict[str, Tuple[ItemCardapio, int]]:
+        """
+        Índice do cardápio por nome, materializado da fonte se preciso.
+        """
+        indice = self._indice_cardapio
+        if indice is None:
+            return self._materializar_cardapio()[1]
+        if self._fonte_cardapio is not None:
+            Restaurante._materializados.tocar(self)
+        return indice
+
+    def _tamanho_cardapio(self) -> int:
+        """
+        Quantidade de itens do cardápio, sem materializá-lo.
+        """
+        itens = self._lista_cardapio
+        return len(itens if itens is not None else self._fonte_cardapio)
+
+    def _materializar_cardapio(
+        self,
+    ) -> Tuple[List[ItemCardapio], Dict[str, Tuple[ItemCardapio, int]]]:
+        """
+        Constrói os itens do cardápio a partir da fonte, os inclui no
+        índice de busca e os registra no LRU. A lista é publicada depois do
+        índice, para que leitores sem a trava nunca vejam um cardápio
+        incompleto.
+        """
+        with self._trava:
+            itens = self._lista_cardapio
+            if itens is not None:
+                return itens, self._indice_cardapio
+            itens = [
+                _item_de_dict(dados)
+                for dados in self._fonte_cardapio.para_dicts()
+            ]
+            indice: Dict[str, Tuple[ItemCardapio, int]] = {}
+            for posicao, item in enumerate(itens):
+                indice.setdefault(item._nome.lower(), (item, posicao))
+            self._indice_cardapio = indice
+            self._lista_cardapio = itens
+            with Restaurante._trava_registro:
+                # Fora dos pendentes: o restaurante foi removido
+                if self in Restaurante._cardapios_pendentes:
+                    Restaurante._cardapios_pendentes.discard(self)
+                    for item in itens:
+                        Restaurante._busca_cardapio.adicionar(self, item)
+            self._contabilizar()
+            return itens, indice
+
+    def _indexar_cardapio(self) -> None:
+        """
+        Inclui no índice de busca o cardápio ainda não indexado, lendo a
+        fonte sem materializá-lo: os itens lidos não ficam em memória nem
+        entram no LRU.
+        """
+        with self._trava:
+            with Restaurante._trava_registro:
+                if self not in Restaurante._cardapios_pendentes:
+                    return
+            itens = [
+                _item_de_dict(dados)
+                for dados in self._fonte_cardapio.para_dicts()
+            ]
+            with Restaurante._trava_registro:
+                # Fora dos pendentes: o restaurante foi removido
+                if self in Restaurante._cardapios_pendentes:
+                    Restaurante._cardapios_pendentes.discard(self)
+                    for item in itens:
+                        Restaurante._busca_cardapio.adicionar(self, item)
+
+    def _contabilizar(self) -> None:
+        """
+        Atualiza no LRU o que foi materializado das fontes e descarrega os
+        restaurantes menos usados além de ORCAMENTO_MEMORIA. Chamar com a
+        trava do restaurante.
+        """
+        tamanho = 0
+        if self._fonte_avaliacoes is not None:
+            armazem = self._armazem_avaliacoes
+            if armazem is not None:
+                tamanho += armazem.bytes_estimados()
+        if self._fonte_cardapio is not None:
+            itens = self._lista_cardapio
+            if itens is not None:
+                tamanho += bytes_itens(itens)
+        Restaurante._descarregar_excedentes(
+            Restaurante._materializados.registrar(
+                self, tamanho, Restaurante.ORCAMENTO_MEMORIA
+            )
+        )
+
+    def _contabilizar_acrescimo(self, tamanho: int) -> None:
+        """
+        Soma ao LRU o que uma mutação acrescentou ao que foi materializado
+        das fontes (estimativa em O(1), sem recalcular o total) e
+        descarrega os restaurantes menos usados além de ORCAMENTO_MEMORIA.
+        O próprio restaurante só pode ser descarregado depois que a fonte
+        receber a mutação.
+        """
+        with self._trava:
+            Restaurante._descarregar_excedentes(
+                Restaurante._materializados.acrescentar(
+                    self, tamanho, Restaurante.ORCAMENTO_MEMORIA
+                )
+            )
+
+    @staticmethod
+    def _descarregar_excedentes(vitimas: List["Restaurante"]) -> None:
+        cache = Restaurante._materializados
+        for r in vitimas:
+            if r._descarregar():
+                cache.remover(r)
+            else:
+                cache.tocar(r)
+
+    def _descarregar(self) -> bool:
+        """
+        Devolve às fontes as avaliações e o cardápio materializados, para
+        serem relidos no próximo acesso.
+
+        Returns:
+        - bool: False se a trava estiver ocupada (a espera poderia
+          inverter a ordem das travas) ou se houver mudanças que a fonte
+          ainda não tem.
+        """
+        if not self._trava.acquire(blocking=False):
+            return False
+        try:
+            if self._versao > Restaurante._mutacoes_persistidas:
+                return False
+            if self._fonte_avaliacoes is not None:
+                self._armazem_avaliacoes = None
+            # O índice de busca guarda posições, não os itens: continua
+            # válido para o cardápio relido
+            if self._fonte_cardapio is not None:
+                self._lista_cardapio = None
+                self._indice_cardapio = None
+            return True
+        finally:
+            self._trava.release()
+
+    def _buscar_item(
+        self, nome_item: str, ocorrencia: int = 0
+    ) -> Optional[ItemCardapio]:
+        """
+        Retorna o item do cardápio com o nome informado (sem distinção de
+        maiúsculas), ou None (ver _localizar_item()).
+        """
+        achado = self._localizar_item(nome_item, ocorrencia)
+        return achado[0] if achado is not None else None
+
+    def _localizar_item(
+        self, nome_item: str, ocorrencia: int = 0
+    ) -> Optional[Tuple[ItemCardapio, int]]:
+        """
+        Item do cardápio com o nome informado (sem distinção de
+        maiúsculas) e sua posição, ou None. O primeiro com o nome sai em
+        O(1) pelo índice por nome; ``ocorrencia`` > 0 escolhe uma
+        repetição do nome, na ordem do cardápio, percorrendo-o.
+        """
+        if not ocorrencia:
+            return self._itens_por_nome.get(nome_item.lower())
+        chave = nome_item.lower()
+        repeticoes = (
+            (item, posicao)
+            for posicao, item in enumerate(self._cardapio)
+            if item._nome.lower() == chave
+        )
+        return next(itertools.islice(repeticoes, ocorrencia, None), None)
+
+    def aplicar_desconto_item(
+        self, nome_item: str
+    ) -> Optional[ItemCardapio]:
+        """
+        Aplica o desconto do tipo do item e salva os dados.
+
+        Returns:
+        - ItemCardapio | None: O item com desconto, ou None se não existir.
+        """
+        item = self._buscar_item(nome_item)
+        if item is None:
+            return None
+        return self._aplicar_desconto(item)
+
+    def _aplicar_desconto(self, item: ItemCardapio) -> ItemCardapio:
+        """
+        Aplica o desconto a um item do cardápio (o primeiro com o nome) e
+        registra a mutação.
+
+        Returns:
+        - ItemCardapio: O item alterado; se o cardápio foi descarregado
+          desde que ``item`` foi obtido, é o item relido da fonte.
+        """
+        with Restaurante._mutando(self):
+            item, posicao = self._localizar_item(item._nome)
+            self._descontar(item, posicao, 0)
+        return item
+
+    def _descontar(
+        self, item: ItemCardapio, posicao: int, ocorrencia: int
+    ) -> None:
+        """
+        Aplica o desconto a ``item``, na ``posicao`` do cardápio e
+        repetição ``ocorrencia`` do seu nome, e registra a mutação. Chamar
+        dentro de _mutando(self).
+        """
+        item.aplicar_desconto()
+        self._alteracoes += 1
+        with Restaurante._trava_registro:
+            Restaurante._busca_cardapio.atualizar_preco(
+                self, posicao, item._preco
+            )
+        registro = {
+            "op": "desconto",
+            "nome": self._nome,
+            "item": item._nome,
+            "preco": item._preco,
+        }
+        if ocorrencia:
+            registro["ocorrencia"] = ocorrencia
+        self._versao = Restaurante._registrar_mutacao(registro)
+
+    def _descontar_em_lote(
+        self, chaves: Optional[Set[str]], tipo: Optional[str]
+    ) -> int:
+        """
+        Aplica o desconto a todos os itens do cardápio com os nomes
+        (minúsculos) de ``chaves`` e do ``tipo``, inclusive os de nome
+        repetido, em um único percurso.
+
+        Returns:
+        - int: Quantidade de itens com desconto.
+        """
+        with Restaurante._mutando(self):
+            repeticoes: Dict[str, int] = {}
+            alvos = []
+            for posicao, item in enumerate(self._cardapio):
+                chave = item._nome.lower()
+                ocorrencia = repeticoes.get(chave, 0)
+                repeticoes[chave] = ocorrencia + 1
+                if (chaves is None or chave in chaves) and (
+                    tipo is None or type(item).__name__ == tipo
+                ):
+                    alvos.append((item, posicao, ocorrencia))
+            for item, posicao, ocorrencia in alvos:
+                self._descontar(item, posicao, ocorrencia)
+        return len(alvos)
+
+    @classmethod
+    def aplicar_desconto_em_lote(
+        cls,
+        restaurantes: Iterable["Restaurante"],
+        tipo: Optional[str] = None,
+        nomes_itens: Optional[Iterable[str]] = None,
+    ) -> Dict[str, int]:
+        """
+        Aplica o desconto a todos os itens que atendem aos filtros, em uma
+        única transação (um só flush ao final).
+
+        Inputs:
+        - restaurantes (Iterable[Restaurante]): Restaurantes considerados.
+        - tipo (str | None): Restringe ao tipo ("Prato", "Bebida" ou
+          "Sobremesa").
+        - nomes_itens (Iterable[str] | None): Restringe aos itens com
+          esses nomes (sem distinção de maiúsculas).
+
+        Returns:
+        - dict: Quantidade de "itens" com desconto e de "restaurantes"
+          alterados.
+        """
+        chaves = (
+            {n.lower() for n in nomes_itens}
+            if nomes_itens is not None else None
+        )
+        itens = alterados = 0
+        with cls.transacao():
+            for r in restaurantes:
+                try:
+                    descontados = r._descontar_em_lote(chaves, tipo)
+                except RestauranteRemovido:
+                    # Removido por outro processo durante o lote
+                    continue
+                itens += descontados
+                alterados += bool(descontados)
+        return {"itens": itens, "restaurantes": alterados}
 
     @property
     def cardapio(self) -> List[ItemCardapio]:
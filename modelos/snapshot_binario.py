@@ -0,0 +1,413 @@
+# modelos/snapshot_binario.py
+
+import json
+import math
+import mmap
+import struct
+import sys
+from array import array
+from typing import (
+    Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Union,
+)
+
+from modelos.armazem_avaliacoes import novo_armazem
+from modelos.avaliacao import Avaliacao
+from modelos.carga_sob_demanda import CabecalhoRestaurante
+
+# Layout (little-endian):
+#   cabeçalho | blocos de cada restaurante | nomes dos clientes |
+#   tabela de clientes | tabela de restaurantes
+# Cada bloco de restaurante guarda as notas (float64, alinhadas em 8
+# bytes), os ids dos clientes (uint32), nome, categoria, os itens do
+# cardápio (JSON compacto) e a tabela de itens (offset, tamanho).
+MAGICO = b"SABORBIN"
+VERSAO = 2
+CABECALHO = struct.Struct("<8sIIQQQ")
+# A partir da versão 2, o cabeçalho termina com o número do último
+# registro do journal contido no snapshot (ver Restaurante._reaplicar)
+CABECALHO_SEQ = struct.Struct("<Q")
+# nome (offset, tamanho), categoria (offset, tamanho), ativo, quantidade
+# de avaliações, offsets das notas e dos clientes, quantidade de itens,
+# offset da tabela de itens, soma, mínima e máxima das notas (NaN sem
+# avaliações) e histograma
+REGISTRO = struct.Struct("<QIQI?IQQIQddd5I")
+REFERENCIA = struct.Struct("<QI")
+
+_NATIVO_LITTLE = sys.byteorder == "little"
+
+
+class _Escritor:
+    """
+    Grava blocos em sequência, acompanhando a posição no arquivo.
+    """
+
+    def __init__(self, f: BinaryIO):
+        self._f = f
+        self.posicao = 0
+
+    def gravar(self, dados: Union[bytes, bytearray, array]) -> int:
+        """
+        Grava os dados e retorna o offset em que começaram.
+        """
+        inicio = self.posicao
+        self._f.write(dados)
+        self.posicao += len(dados) * getattr(dados, "itemsize", 1)
+        return inicio
+
+    def alinhar(self, tamanho: int = 8) -> None:
+        falta = -self.posicao % tamanho
+        if falta:
+            self.gravar(b"\0" * falta)
+
+
+def _little_endian(valores: array) -> array:
+    if not _NATIVO_LITTLE:
+        valores.byteswap()
+    return valores
+
+
+def escrever_binario(f: BinaryIO, registros: Iterable[dict]) -> None:
+    """
+    Grava os registros (formato de Restaurante.to_dict()) no snapshot
+    binário, um restaurante por vez; só a tabela de registros de tamanho
+    fixo e os nomes dos clientes ficam em memória até o final.
+
+    Inputs:
+    - f (BinaryIO): Arquivo aberto para escrita, com suporte a seek.
+    - registros (Iterable[dict]): Restaurantes a gravar.
+    """
+    escritor = _Escritor(f)
+    escritor.gravar(b"\0" * (CABECALHO.size + CABECALHO_SEQ.size))
+    clientes: Dict[str, int] = {}
+    tabela = bytearray()
+    total = 0
+    seq = 0
+    for registro in registros:
+        seq = max(seq, registro.get("seq", 0))
+        avaliacoes = registro.get("avaliacoes", [])
+        notas = array("d", (a["nota"] for a in avaliacoes))
+        ids = array(
+            "I",
+            (
+                clientes.setdefault(a["cliente"], len(clientes))
+                for a in avaliacoes
+            ),
+        )
+        # Mesma regra de Restaurante._anexar_avaliacao
+        histograma = [0] * 5
+        for nota in notas:
+            histograma[min(max(int(nota), 1), 5) - 1] += 1
+        agregados = (
+            sum(notas),
+            min(notas) if notas else math.nan,
+            max(notas) if notas else math.nan,
+        )
+
+        escritor.alinhar()
+        off_notas = escritor.gravar(_little_endian(notas))
+        off_ids = escritor.gravar(_little_endian(ids))
+        nome = registro["nome"].encode("utf-8")
+        categoria = registro["categoria"].encode("utf-8")
+        off_nome = escritor.gravar(nome)
+        off_categoria = escritor.gravar(categoria)
+        itens = bytearray()
+        for item in registro.get("cardapio", []):
+            dados = json.dumps(
+                item, ensure_ascii=False, separators=(",", ":")
+            ).encode("utf-8")
+            itens += REFERENCIA.pack(escritor.gravar(dados), len(dados))
+        off_itens = escritor.gravar(itens)
+
+        tabela += REGISTRO.pack(
+            off_nome, len(nome),
+            off_categoria, len(categoria),
+            bool(registro.get("ativo", False)),
+            len(notas), off_notas, off_ids,
+            len(itens) // REFERENCIA.size, off_itens,
+            *agregados,
+            *histograma,
+        )
+        total += 1
+
+    referencias = bytearray()
+    for cliente in clientes:
+        dados = cliente.encode("utf-8")
+        referencias += REFERENCIA.pack(escritor.gravar(dados), len(dados))
+    off_clientes = escritor.gravar(referencias)
+    off_tabela = escritor.gravar(tabela)
+
+    f.seek(0)
+    f.write(
+        CABECALHO.pack(
+            MAGICO, VERSAO, total, off_tabela, len(clientes), off_clientes
+        )
+        + CABECALHO_SEQ.pack(seq)
+    )
+    f.seek(0, 2)
+
+
+class SnapshotBinario:
+    """
+    Snapshot binário aberto com mmap (somente leitura). Os registros têm
+    tamanho fixo e são lidos sob demanda; as páginas do arquivo ficam no
+    cache do sistema, compartilhadas entre os processos que o abrem.
+
+    Attributes:
+        seq_journal (int): Último registro do journal contido no snapshot
+            (0 se desconhecido).
+
+    Raises:
+    - ValueError: Se o arquivo estiver vazio, truncado ou em outro formato.
+    """
+
+    def __init__(self, caminho: str):
+        """
+        Mapeia o arquivo e valida o cabeçalho e as tabelas.
+
+        Inputs:
+        - caminho (str): Arquivo do snapshot.
+        """
+        with open(caminho, "rb") as f:
+            try:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"snapshot binário vazio: {caminho}")
+        self._dados = memoryview(self._mm)
+        if len(self._mm) < CABECALHO.size:
+            raise ValueError(f"snapshot binário truncado: {caminho}")
+        (
+            magico, versao, self._total, self._off_tabela,
+            self._total_clientes, self._off_clientes,
+        ) = CABECALHO.unpack_from(self._mm, 0)
+        if magico != MAGICO or versao not in (1, VERSAO):
+            raise ValueError(f"formato de snapshot desconhecido: {caminho}")
+        self.seq_journal = 0
+        if versao >= 2:
+            self._verificar(CABECALHO.size, CABECALHO_SEQ.size)
+            (self.seq_journal,) = CABECALHO_SEQ.unpack_from(
+                self._mm, CABECALHO.size
+            )
+        self._verificar(self._off_tabela, self._total * REGISTRO.size)
+        self._verificar(
+            self._off_clientes, self._total_clientes * REFERENCIA.size
+        )
+
+    def _verificar(self, offset: int, tamanho: int) -> None:
+        if offset + tamanho > len(self._mm):
+            raise ValueError("snapshot binário truncado")
+
+    def __len__(self) -> int:
+        return self._total
+
+    def texto(self, offset: int, tamanho: int) -> str:
+        """
+        Decodifica um texto UTF-8 gravado no snapshot.
+        """
+        return str(self._dados[offset:offset + tamanho], "utf-8")
+
+    def cliente(self, id_cliente: int) -> str:
+        """
+        Nome do cliente pelo id gravado nas avaliações.
+        """
+        return self.texto(
+            *REFERENCIA.unpack_from(
+                self._mm, self._off_clientes + id_cliente * REFERENCIA.size
+            )
+        )
+
+    def coluna(self, offset: int, quantidade: int, tipo: str) -> Any:
+        """
+        Coluna de valores ("d" ou "I") sem cópia, quando possível.
+        """
+        tamanho = quantidade * array(tipo).itemsize
+        self._verificar(offset, tamanho)
+        bloco = self._dados[offset:offset + tamanho]
+        if _NATIVO_LITTLE:
+            return bloco.cast(tipo)
+        valores = array(tipo, bytes(bloco))
+        valores.byteswap()
+        return valores
+
+    def cabecalho(self, i: int) -> CabecalhoRestaurante:
+        """
+        Campos fixos do i-ésimo restaurante, sem ler avaliações ou itens.
+        """
+        (
+            off_nome, tam_nome, off_categoria, tam_categoria, ativo,
+            qtd, off_notas, off_ids, qtd_itens, off_itens,
+            soma, minima, maxima, *histograma,
+        ) = REGISTRO.unpack_from(
+            self._mm, self._off_tabela + i * REGISTRO.size
+        )
+        self._verificar(off_nome, tam_nome)
+        self._verificar(off_categoria, tam_categoria)
+        self._verificar(off_notas, qtd * 8)
+        self._verificar(off_ids, qtd * 4)
+        self._verificar(off_itens, qtd_itens * REFERENCIA.size)
+        return CabecalhoRestaurante(
+            nome=self.texto(off_nome, tam_nome),
+            categoria=self.texto(off_categoria, tam_categoria),
+            ativo=ativo,
+            qtd_avaliacoes=qtd,
+            soma_notas=soma,
+            nota_min=None if math.isnan(minima) else minima,
+            nota_max=None if math.isnan(maxima) else maxima,
+            histograma=histograma,
+            avaliacoes=AvaliacoesMapeadas(self, off_notas, off_ids, qtd),
+            cardapio=CardapioMapeado(self, off_itens, qtd_itens),
+        )
+
+    def cabecalhos(self) -> Iterator[CabecalhoRestaurante]:
+        """
+        Percorre os restaurantes na ordem gravada.
+        """
+        for i in range(self._total):
+            yield self.cabecalho(i)
+
+    def registros(self) -> Iterator[dict]:
+        """
+        Percorre os restaurantes no formato de Restaurante.to_dict() (com
+        ``seq``, como nos snapshots JSON, se houver).
+        """
+        for c in self.cabecalhos():
+            registro = {
+                "nome": c.nome,
+                "categoria": c.categoria,
+                "ativo": c.ativo,
+                "avaliacoes": c.avaliacoes.para_dicts(),
+                "cardapio": c.cardapio.para_dicts(),
+            }
+            if self.seq_journal:
+                registro["seq"] = self.seq_journal
+            yield registro
+
+
+class AvaliacoesMapeadas:
+    """
+    Avaliações de um restaurante lidas diretamente do snapshot binário,
+    com a mesma interface de leitura de ListaAvaliacoes. Não aceita novas
+    avaliações: materializar() copia o conteúdo para um armazém comum.
+    """
+
+    __slots__ = ("_snapshot", "_off_notas", "_off_ids", "_quantidade")
+
+    somente_leitura = True
+
+    def __init__(
+        self,
+        snapshot: SnapshotBinario,
+        off_notas: int,
+        off_ids: int,
+        quantidade: int,
+    ):
+        self._snapshot = snapshot
+        self._off_notas = off_notas
+        self._off_ids = off_ids
+        self._quantidade = quantidade
+
+    def notas(self) -> Any:
+        """
+        Coluna de notas (memoryview sobre o arquivo, sem cópia).
+        """
+        return self._snapshot.coluna(self._off_notas, self._quantidade, "d")
+
+    def _pares(self, inicio: int = 0, fim: Optional[int] = None):
+        clientes = self._snapshot.coluna(self._off_ids, self._quantidade, "I")
+        cliente = self._snapshot.cliente
+        return (
+            (cliente(c), n)
+            for c, n in zip(clientes[inicio:fim], self.notas()[inicio:fim])
+        )
+
+    def para_dicts(
+        self, inicio: int = 0, fim: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Serializa as avaliações das posições ``inicio`` a ``fim``.
+        """
+        return [
+            {"cliente": c, "nota": n} for c, n in self._pares(inicio, fim)
+        ]
+
+    def materializar(self, tipo: str):
+        """
+        Copia as avaliações para um armazém do tipo indicado (ver
+        novo_armazem), que passa a receber as novas avaliações.
+        """
+        armazem = novo_armazem(tipo)
+        for cliente, nota in self._pares():
+            armazem.anexar(cliente, nota)
+        return armazem
+
+    def carregar(self, tipo: str) -> "AvaliacoesMapeadas":
+        """
+        Fonte de avaliações (ver CabecalhoRestaurante): a própria visão,
+        sem cópia.
+        """
+        return self
+
+    def bytes_estimados(self) -> int:
+        """
+        Nada fica na memória do processo: as páginas são do cache do
+        sistema.
+        """
+        return 0
+
+    def __len__(self) -> int:
+        return self._quantidade
+
+    def __iter__(self) -> Iterator[Avaliacao]:
+        for cliente, nota in self._pares():
+            yield Avaliacao(cliente, nota)
+
+    def __getitem__(
+        self, i: Union[int, slice]
+    ) -> Union[Avaliacao, List[Avaliacao]]:
+        if isinstance(i, slice):
+            return list(self)[i]
+        if i < 0:
+            i += self._quantidade
+        if not 0 <= i < self._quantidade:
+            raise IndexError("índice de avaliação fora do intervalo")
+        return next(Avaliacao(c, n) for c, n in self._pares(i, i + 1))
+
+
+class CardapioMapeado:
+    """
+    Itens do cardápio de um restaurante ainda no snapshot binário, como
+    dicts no formato de ItemCardapio.to_dict().
+    """
+
+    __slots__ = ("_snapshot", "_off_tabela", "_quantidade")
+
+    imutavel = True
+
+    def __init__(
+        self, snapshot: SnapshotBinario, off_tabela: int, quantidade: int
+    ):
+        self._snapshot = snapshot
+        self._off_tabela = off_tabela
+        self._quantidade = quantidade
+
+    def para_dicts(self, limite: Optional[int] = None) -> List[dict]:
+        """
+        Decodifica os itens (os ``limite`` primeiros, se informado).
+        """
+        snapshot = self._snapshot
+        quantidade = self._quantidade
+        if limite is not None:
+            quantidade = min(quantidade, limite)
+        return [
+            json.loads(
+                snapshot.texto(
+                    *REFERENCIA.unpack_from(
+                        snapshot._mm,
+                        self._off_tabela + i * REFERENCIA.size,
+                    )
+                )
+            )
+            for i in range(quantidade)
+        ]
+
+    def __len__(self) -> int:
+        return self._quantidade
@@ -1,6 +1,6 @@
 from enum import Enum
 from pydantic import BaseModel, Field, ConfigDict, model_validator
-from typing import Optional, Union, List, Annotated
+from typing import Dict, Optional, Union, List, Annotated
 
 
 class ItemType(str, Enum):
@@ -9,6 +9,16 @@ class ItemType(str, Enum):
     SOBREMESA = "Sobremesa"
 
 
+class CampoDetalhe(str, Enum):
+    AVALIACOES = "avaliacoes"
+    CARDAPIO = "cardapio"
+
+
+class FormatoExportacao(str, Enum):
+    JSON = "json"
+    NDJSON = "ndjson"
+
+
 class CreateRestaurant(BaseModel):
     model_config = ConfigDict(
         validate_by_name=True,
@@ -68,6 +78,53 @@ class MenuItem(BaseModel):
     ]
 
 
+class ImportRestaurant(CreateRestaurant):
+    model_config = ConfigDict(
+        validate_by_name=True,
+        json_schema_extra={
+            "example": {
+                "nome": "Sabor & Cia",
+                "categoria": "Brasileira",
+                "ativo": True,
+                "avaliacoes": [{"cliente": "João", "nota": 4.5}],
+                "cardapio": [
+                    {"type": "Prato", "nome": "Feijoada", "preco": 39.9,
+                     "descricao": "Tradicional"}
+                ],
+            }
+        },
+    )
+
+    ativo: Annotated[
+        bool, Field(False, description="Indica se o restaurante está ativo")
+    ]
+    avaliacoes: Annotated[
+        List[Rating], Field([], description="Avaliações do restaurante")
+    ]
+    cardapio: Annotated[
+        List[MenuItem], Field([], description="Itens do cardápio")
+    ]
+
+
+class ImportLineError(BaseModel):
+    linha: Annotated[int, Field(description="Número da linha (a partir de 1)")]
+    detalhe: Annotated[str, Field(description="Motivo da rejeição")]
+
+
+class ImportResult(BaseModel):
+    criados: Annotated[int, Field(description="Restaurantes cadastrados")]
+    duplicados: Annotated[
+        List[str],
+        Field(description="Nomes ignorados por já existirem"),
+    ]
+    erros: Annotated[
+        List[ImportLineError], Field(description="Linhas inválidas ignoradas")
+    ]
+    segundos: Annotated[
+        float, Field(description="Tempo gasto, incluindo a gravação")
+    ]
+
+
 class RestaurantSummary(BaseModel):
     model_config = ConfigDict(
         validate_by_name=True,
@@ -92,6 +149,12 @@ class RestaurantSummary(BaseModel):
     ]
 
 
+class RestaurantRanking(RestaurantSummary):
+    quantidade_avaliacoes: Annotated[
+        int, Field(description="Quantidade de avaliações recebidas")
+    ]
+
+
 class AvaliacaoSchema(BaseModel):
     model_config = ConfigDict(
         validate_by_name=True,
@@ -182,3 +245,100 @@ class RestaurantDetail(BaseModel):
         List[CardapioItemSchema],
         Field(description="Itens do cardápio do restaurante"),
     ]
+
+
+class BulkDiscount(BaseModel):
+    model_config = ConfigDict(
+        validate_by_name=True,
+        json_schema_extra={
+            "example": {"categoria": "Italiana", "type": "Sobremesa"}
+        },
+    )
+
+    restaurantes: Annotated[
+        Optional[List[str]],
+        Field(None, description="Nomes dos restaurantes (todos se omitido)"),
+    ]
+    categoria: Annotated[
+        Optional[str], Field(None, description="Filtra a categoria")
+    ]
+    ativo: Annotated[
+        Optional[bool], Field(None, description="Filtra a situação")
+    ]
+    type: Annotated[
+        Optional[ItemType], Field(None, description="Tipo dos itens")
+    ]
+    itens: Annotated[
+        Optional[List[str]], Field(None, description="Nomes dos itens")
+    ]
+
+    @model_validator(mode="after")
+    def validar_filtro_de_itens(self):
+        if self.type is None and self.itens is None:
+            raise ValueError("informe 'type' e/ou 'itens'.")
+        return self
+
+
+class BulkDiscountResult(BaseModel):
+    restaurantes_alterados: Annotated[
+        int, Field(description="Restaurantes com ao menos um desconto")
+    ]
+    itens_com_desconto: Annotated[
+        int, Field(description="Itens que receberam desconto")
+    ]
+    nao_encontrados: Annotated[
+        List[str], Field(description="Restaurantes informados inexistentes")
+    ]
+    segundos: Annotated[
+        float, Field(description="Tempo gasto, incluindo a gravação")
+    ]
+
+
+class MenuSearchResult(BaseModel):
+    restaurante: Annotated[str, Field(description="Nome do restaurante")]
+    item: Annotated[
+        CardapioItemSchema, Field(description="Item do cardápio encontrado")
+    ]
+
+
+class EstatisticasNotas(BaseModel):
+    quantidade: Annotated[int, Field(description="Quantidade de avaliações")]
+    media: Annotated[
+        Optional[float], Field(description="Média das notas (null se vazio)")
+    ]
+    mediana: Annotated[Optional[float], Field(description="Mediana")]
+    desvio_padrao: Annotated[
+        Optional[float], Field(description="Desvio padrão populacional")
+    ]
+    percentis: Annotated[
+        Dict[str, Optional[float]],
+        Field(description="Percentis pedidos, por rótulo (ex.: 'p90')"),
+    ]
+    histograma: Annotated[
+        List[int],
+        Field(description="Quantidade de notas nas faixas 1 a 5"),
+    ]
+
+
+class AnaliseRestaurante(EstatisticasNotas):
+    nome: Annotated[str, Field(description="Nome do restaurante")]
+    categoria: Annotated[str, Field(description="Categoria do restaurante")]
+
+
+class AnaliseCategoria(EstatisticasNotas):
+    categoria: Annotated[str, Field(description="Categoria")]
+    restaurantes: Annotated[
+        int, Field(description="Quantidade de restaurantes na categoria")
+    ]
+
+
+class AnaliseAvaliacoesSchema(BaseModel):
+    geral: Annotated[
+        EstatisticasNotas, Field(description="Todas as avaliações")
+    ]
+    categorias: Annotated[
+        List[AnaliseCategoria], Field(description="Por categoria")
+    ]
+    restaurantes: Annotated[
+        List[AnaliseRestaurante], Field(description="Por restaurante")
+    ]
@@ -0,0 +1,255 @@
+# servicos/analise.py
+
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Mesmas faixas do histograma mantido por Restaurante (notas 1 a 5)
+FAIXAS_HISTOGRAMA = 5
+
+
+def _para_lista(valores: np.ndarray) -> List[Optional[float]]:
+    """
+    Converte um array em lista, trocando NaN (grupo sem notas) por None.
+    """
+    return [None if np.isnan(v) else round(v, 2) for v in valores.tolist()]
+
+
+class Agrupamento:
+    """
+    Notas ordenadas por (grupo, nota), prontas para estatísticas
+    vetorizadas por grupo.
+
+    Attributes:
+        notas (np.ndarray): Notas ordenadas dentro de cada grupo.
+        grupos (np.ndarray): Grupo de cada nota, na mesma ordem.
+        quantidades (np.ndarray): Quantidade de notas por grupo.
+        inicios (np.ndarray): Posição da primeira nota de cada grupo.
+    """
+
+    def __init__(self, notas: np.ndarray, grupos: np.ndarray, total: int):
+        """
+        Inicializa uma instância de Agrupamento.
+
+        Inputs:
+        - notas (np.ndarray): Notas, em qualquer ordem.
+        - grupos (np.ndarray): Código do grupo (0..total-1) de cada nota.
+        - total (int): Quantidade de grupos, incluindo os sem notas.
+        """
+        ordem = np.lexsort((notas, grupos))
+        self.notas = notas[ordem]
+        self.grupos = grupos[ordem]
+        self.quantidades = np.bincount(grupos, minlength=total)
+        self.inicios = np.cumsum(self.quantidades) - self.quantidades
+
+    def percentis(self, percentis: Sequence[float]) -> np.ndarray:
+        """
+        Percentis de cada grupo por interpolação linear (o mesmo método
+        padrão de np.percentile), calculados de uma vez para todos os
+        grupos.
+
+        Returns:
+        - np.ndarray: Matriz (grupos x percentis); NaN em grupos vazios.
+        """
+        fracoes = np.asarray(percentis, dtype=np.float64) / 100
+        n = self.quantidades[:, None]
+        posicao = fracoes[None, :] * np.maximum(n - 1, 0)
+        abaixo = np.floor(posicao).astype(np.int64)
+        acima = np.ceil(posicao).astype(np.int64)
+        if not len(self.notas):
+            return np.full(posicao.shape, np.nan)
+        base = self.inicios[:, None]
+        # Grupos vazios apontam para a posição 0 e são mascarados depois
+        limite = len(self.notas) - 1
+        baixo = self.notas[np.minimum(base + abaixo, limite)]
+        alto = self.notas[np.minimum(base + acima, limite)]
+        resultado = baixo + (alto - baixo) * (posicao - abaixo)
+        resultado[self.quantidades == 0] = np.nan
+        return resultado
+
+    def estatisticas(self, percentis: Sequence[float]) -> Dict[str, Any]:
+        """
+        Média, mediana, desvio padrão (populacional), percentis e
+        histograma de cada grupo.
+
+        Returns:
+        - dict: Arrays indexados pelo código do grupo.
+        """
+        total = len(self.quantidades)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            medias = (
+                np.bincount(self.grupos, weights=self.notas, minlength=total)
+                / self.quantidades
+            )
+            desvios = self.notas - medias[self.grupos]
+            variancias = (
+                np.bincount(self.grupos, weights=desvios**2, minlength=total)
+                / self.quantidades
+            )
+        faixas = np.clip(np.floor(self.notas), 1, FAIXAS_HISTOGRAMA) - 1
+        histogramas = np.bincount(
+            self.grupos * FAIXAS_HISTOGRAMA + faixas.astype(np.int64),
+            minlength=total * FAIXAS_HISTOGRAMA,
+        ).reshape(total, FAIXAS_HISTOGRAMA)
+        calculados = self.percentis([50, *percentis])
+        return {
+            "quantidade": self.quantidades,
+            "media": medias,
+            "mediana": calculados[:, 0],
+            "desvio_padrao": np.sqrt(variancias),
+            "percentis": calculados[:, 1:],
+            "histograma": histogramas,
+        }
+
+
+class ColunasAvaliacoes:
+    """
+    Todas as notas do catálogo em um único array, agrupadas por
+    restaurante, por categoria e no total.
+
+    Attributes:
+        nomes (List[str]): Nome de cada restaurante (código do grupo).
+        categorias (List[str]): Categorias em ordem alfabética, sem
+            distinção de maiúsculas (como nos índices de Restaurante),
+            na grafia do primeiro restaurante de cada uma.
+        categoria_de (List[int]): Código da categoria de cada restaurante.
+        grafias (List[str]): Categoria de cada restaurante, como cadastrada.
+    """
+
+    def __init__(self, restaurantes: Sequence[Any]):
+        """
+        Copia as notas dos restaurantes para arrays NumPy.
+
+        Inputs:
+        - restaurantes (Sequence[Restaurante]): Restaurantes analisados.
+        """
+        self.nomes = [r._nome for r in restaurantes]
+        self.grafias = [r._categoria for r in restaurantes]
+        primeiras: Dict[str, str] = {}
+        for categoria in self.grafias:
+            primeiras.setdefault(categoria.casefold(), categoria)
+        chaves = sorted(primeiras)
+        self.categorias = [primeiras[c] for c in chaves]
+        codigos = {c: i for i, c in enumerate(chaves)}
+        self.categoria_de = [
+            codigos[r._categoria.casefold()] for r in restaurantes
+        ]
+
+        # np.array copia o buffer do armazém colunar sem percorrê-lo
+        partes = [
+            np.array(r._avaliacao.notas(), dtype=np.float64)
+            for r in restaurantes
+        ]
+        quantidades = np.array([len(p) for p in partes], dtype=np.int64)
+        notas = np.concatenate(partes) if partes else np.empty(0)
+        por_restaurante = np.repeat(np.arange(len(partes)), quantidades)
+        por_categoria = np.asarray(self.categoria_de, dtype=np.int64)[
+            por_restaurante
+        ]
+
+        self.restaurantes = Agrupamento(notas, por_restaurante, len(partes))
+        self.por_categoria = Agrupamento(
+            notas, por_categoria, len(self.categorias)
+        )
+        self.geral = Agrupamento(
+            notas, np.zeros(len(notas), dtype=np.int64), 1
+        )
+
+
+class AnaliseAvaliacoes:
+    """
+    Estatísticas das notas de todos os restaurantes. Os arrays são
+    montados uma vez por geração do estado e reaproveitados até a
+    próxima mutação.
+    """
+
+    def __init__(
+        self,
+        geracao: Callable[[], int],
+        restaurantes: Callable[[], Sequence[Any]],
+    ):
+        """
+        Inicializa uma instância de AnaliseAvaliacoes.
+
+        Inputs:
+        - geracao (Callable[[], int]): Retorna a geração atual do estado.
+        - restaurantes (Callable): Retorna os restaurantes cadastrados.
+        """
+        self._geracao = geracao
+        self._restaurantes = restaurantes
+        self._trava = threading.Lock()
+        self._cache: Optional[Tuple[int, ColunasAvaliacoes]] = None
+
+    def colunas(self) -> ColunasAvaliacoes:
+        """
+        Arrays da geração atual, reconstruídos apenas se ela mudou.
+        """
+        with self._trava:
+            geracao = self._geracao()
+            if self._cache is None or self._cache[0] != geracao:
+                self._cache = (
+                    geracao,
+                    ColunasAvaliacoes(list(self._restaurantes())),
+                )
+            return self._cache[1]
+
+    def relatorio(self, percentis: Sequence[float]) -> Dict[str, Any]:
+        """
+        Estatísticas por restaurante, por categoria e gerais.
+
+        Inputs:
+        - percentis (Sequence[float]): Percentis desejados (0 a 100).
+        """
+        colunas = self.colunas()
+        rotulos = [f"p{p:g}" for p in percentis]
+
+        def linhas(agrupamento: Agrupamento) -> List[Dict[str, Any]]:
+            est = agrupamento.estatisticas(percentis)
+            medias = _para_lista(est["media"])
+            medianas = _para_lista(est["mediana"])
+            desvios = _para_lista(est["desvio_padrao"])
+            calculados = [_para_lista(linha) for linha in est["percentis"]]
+            return [
+                {
+                    "quantidade": quantidade,
+                    "media": medias[i],
+                    "mediana": medianas[i],
+                    "desvio_padrao": desvios[i],
+                    "percentis": dict(zip(rotulos, calculados[i])),
+                    "histograma": histograma,
+                }
+                for i, (quantidade, histograma) in enumerate(
+                    zip(
+                        est["quantidade"].tolist(),
+                        est["histograma"].tolist(),
+                    )
+                )
+            ]
+
+        contagem = np.bincount(
+            colunas.categoria_de, minlength=len(colunas.categorias)
+        ).tolist()
+        return {
+            "geral": linhas(colunas.geral)[0],
+            "categorias": [
+                {"categoria": categoria, "restaurantes": n, **estatisticas}
+                for categoria, n, estatisticas in zip(
+                    colunas.categorias,
+                    contagem,
+                    linhas(colunas.por_categoria),
+                )
+            ],
+            "restaurantes": [
+                {
+                    "nome": nome,
+                    "categoria": categoria,
+                    **estatisticas,
+                }
+                for nome, categoria, estatisticas in zip(
+                    colunas.nomes,
+                    colunas.grafias,
+                    linhas(colunas.restaurantes),
+                )
+            ],
+        }
@@ -0,0 +1,75 @@
+# servicos/cache_respostas.py
+
+import hashlib
+import uuid
+from collections import OrderedDict
+from typing import Callable, Hashable, Tuple
+
+
+class CacheRespostas:
+    """
+    Cache de respostas JSON já serializadas, válido enquanto a geração do
+    estado não mudar.
+
+    Attributes:
+        limite (int): Quantidade máxima de respostas guardadas (LRU).
+    """
+
+    def __init__(self, geracao: Callable[[], int], limite: int = 64):
+        """
+        Inicializa uma instância de CacheRespostas.
+
+        Inputs:
+        - geracao (Callable[[], int]): Retorna a geração atual do estado.
+        - limite (int): Quantidade máxima de respostas guardadas.
+        """
+        self._geracao = geracao
+        self.limite = limite
+        self._entradas: "OrderedDict[Hashable, Tuple[int, bytes]]" = (
+            OrderedDict()
+        )
+        # Distingue gerações de processos diferentes (ex.: após reinício)
+        self._instancia = uuid.uuid4().hex[:12]
+
+    def etag(self, chave: Hashable) -> str:
+        """
+        ETag da resposta identificada por ``chave`` na geração atual.
+        """
+        return self._etag(chave, self._geracao())
+
+    def _etag(self, chave: Hashable, geracao: int) -> str:
+        # O resumo da chave distingue rotas e parâmetros diferentes na
+        # mesma geração; repr() é estável entre processos, ao contrário
+        # de hash() para textos
+        resumo = hashlib.blake2b(
+            repr(chave).encode("utf-8"), digest_size=8
+        ).hexdigest()
+        return f'"{self._instancia}-{geracao}-{resumo}"'
+
+    def obter(
+        self, chave: Hashable, construir: Callable[[], bytes]
+    ) -> Tuple[bytes, str]:
+        """
+        Retorna o corpo em cache para a chave, construindo-o apenas se a
+        geração mudou desde a última construção.
+
+        Returns:
+        - Tuple[bytes, str]: Corpo serializado e seu ETag.
+        """
+        geracao = self._geracao()
+        entrada = self._entradas.get(chave)
+        if entrada is None or entrada[0] != geracao:
+            # A geração é lida antes de construir: se o estado mudar no
+            # meio, a entrada fica desatualizada e é refeita na próxima.
+            entrada = (geracao, construir())
+            self._entradas[chave] = entrada
+            while len(self._entradas) > self.limite:
+                self._entradas.popitem(last=False)
+        self._entradas.move_to_end(chave)
+        return entrada[1], self._etag(chave, entrada[0])
+
+    def limpar(self) -> None:
+        """
+        Descarta todas as respostas guardadas.
+        """
+        self._entradas.clear()
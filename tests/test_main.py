@@ -1,10 +1,28 @@
 # tests/test_main.py
 
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
 import pytest
 from fastapi.testclient import TestClient
 
-from main import app
-from modelos.restaurante import Restaurante
+from ferramentas.migrar_para_sqlite import migrar
+from main import analise_avaliacoes, app
+from modelos.avaliacao import Avaliacao
+from modelos.concorrencia import VisaoRestaurante
+from modelos.cardapio.prato import Prato
+from modelos.cardapio.sobremesa import Sobremesa
+from modelos import persistencia
+from modelos.carga_sob_demanda import bytes_itens
+from modelos.journal import Journal, LeitorJournal
+from modelos.persistencia import caminho_anterior
+from modelos.restaurante import Restaurante, RestauranteRemovido
 
 # Cria o cliente de testes
 client = TestClient(app)
@@ -12,15 +30,16 @@ client = TestClient(app)
 
 @pytest.fixture(autouse=True)
 def clear_state(monkeypatch, tmp_path):
-    # Limpa memória de restaurantes
-    Restaurante.restaurantes.clear()
+    # Limpa memória de restaurantes (lista e índice por nome)
+    Restaurante.limpar_registro()
     # Prepara um JSON vazio num diretório temporário
     data_dir = tmp_path / "tmp"
     data_dir.mkdir()
     file = data_dir / "restaurantes.json"
     file.write_text("[]")
-    # Faz o cwd apontar para tmp_path para ARQUIVO_DADOS
+    # Faz o cwd apontar para tmp_path e ARQUIVO_DADOS para o JSON temporário
     monkeypatch.chdir(str(tmp_path))
+    monkeypatch.setattr(Restaurante, "ARQUIVO_DADOS", str(file))
     yield
 
 
@@ -319,3 +338,1575 @@ def test_aplica_desconto_em_item_inexistente():
     assert resp.json() == {
         "detail": "Item 'Inexistente' não encontrado em 'Praça'."
     }
+
+
+def test_busca_por_nome_ignora_maiusculas():
+    client.post("/restaurants", json={"nome": "Cantina", "categoria": "It"})
+
+    resp = client.post(
+        "/restaurants", json={"nome": "CANTINA", "categoria": "It"}
+    )
+    assert resp.status_code == 400
+
+    resp = client.patch("/restaurants/cAnTiNa/toggle")
+    assert resp.status_code == 200
+    assert Restaurante.buscar_por_nome("cantina").ativo is True
+
+
+def test_remover_restaurante_atualiza_indice():
+    client.post("/restaurants", json={"nome": "Efêmero", "categoria": "X"})
+
+    removido = Restaurante.remover("EFÊMERO")
+    assert removido is not None
+    assert Restaurante.buscar_por_nome("Efêmero") is None
+    assert Restaurante.restaurantes == []
+    assert Restaurante.remover("Efêmero") is None
+
+    # O nome fica livre para um novo cadastro
+    resp = client.post(
+        "/restaurants", json={"nome": "Efêmero", "categoria": "X"}
+    )
+    assert resp.status_code == 201
+
+
+def test_modo_journal_anexa_mutacoes_e_reaplica_na_carga(monkeypatch):
+    monkeypatch.setattr(Restaurante, "MODO_PERSISTENCIA", "journal")
+    client.post("/restaurants", json={"nome": "Diário", "categoria": "C"})
+    client.patch("/restaurants/Diário/toggle")
+    client.post(
+        "/restaurants/Diário/rating", json={"cliente": "Jo", "nota": 4}
+    )
+    client.post(
+        "/restaurants/Diário/menu",
+        json={"type": "Bebida", "nome": "Café", "preco": 10.0, "tamanho": 50},
+    )
+    client.patch("/restaurants/Diário/menu/Café/discount")
+
+    # O snapshot não foi regravado; as mutações estão no journal
+    with open(Restaurante.ARQUIVO_DADOS, encoding="utf-8") as f:
+        assert f.read() == "[]"
+    journal = Restaurante._journal()
+    ops = [registro["op"] for registro in journal.registros()]
+    assert ops == ["criar", "alternar", "avaliar", "cardapio", "desconto"]
+
+    Restaurante.carregar_dados()
+    r = Restaurante.buscar_por_nome("diário")
+    assert r.ativo is True
+    assert r.media_avaliacoes == 4
+    assert r.cardapio[0].to_dict()["preco"] == 9.2
+
+
+def test_modo_journal_compacta_em_snapshot(monkeypatch):
+    monkeypatch.setattr(Restaurante, "MODO_PERSISTENCIA", "journal")
+    monkeypatch.setattr(Restaurante, "LIMITE_JOURNAL", 1)
+    client.post("/restaurants", json={"nome": "Compacto", "categoria": "C"})
+    Restaurante._compactacao.join(timeout=5)
+
+    assert Restaurante._journal().tamanho() == 0
+    with open(Restaurante.ARQUIVO_DADOS, encoding="utf-8") as f:
+        assert json.load(f)[0]["nome"] == "Compacto"
+
+
+@pytest.mark.parametrize(
+    "modo, arquivo",
+    [
+        ("journal", "restaurantes.json"),
+        ("journal", "dados.bin"),
+        ("multiprocesso", "restaurantes.ndjson"),
+    ],
+)
+def test_compactacao_interrompida_nao_duplica_registros(
+    monkeypatch, tmp_path, modo, arquivo
+):
+    monkeypatch.setattr(Restaurante, "MODO_PERSISTENCIA", modo)
+    monkeypatch.setattr(Restaurante, "ARQUIVO_DADOS", str(tmp_path / arquivo))
+    Restaurante.carregar_dados()
+    r = Restaurante.cadastrar("Repetido", "C")
+    r.receber_avaliacao("Ana", 5)
+
+    # Queda depois da troca do snapshot, antes de o journal ser descartado
+    def queda(*args):
+        raise OSError("queda simulada")
+
+    with monkeypatch.context() as m:
+        m.setattr(Journal, "descartar_ate", queda)
+        m.setattr(Journal, "limpar", queda)
+        with pytest.raises(OSError):
+            Restaurante.salvar_dados()
+    assert Restaurante._journal().tamanho() > 0
+
+    Restaurante.carregar_dados()
+    assert len(Restaurante.restaurantes) == 1
+    assert Restaurante.buscar_por_nome("Repetido")._qtd_avaliacoes == 1
+
+    # Os registros seguintes continuam sendo reaplicados
+    Restaurante.buscar_por_nome("Repetido").receber_avaliacao("Bia", 3)
+    Restaurante.carregar_dados()
+    assert Restaurante.buscar_por_nome("Repetido")._qtd_avaliacoes == 2
+
+
+def test_journal_ignora_ultima_linha_incompleta(tmp_path):
+    journal = Journal(str(tmp_path / "j.jsonl"))
+    journal.anexar({"op": "criar", "nome": "A", "categoria": "B"})
+    with open(journal.caminho, "a", encoding="utf-8") as f:
+        f.write('{"op": "avaliar", "nom')
+
+    assert list(journal.registros()) == [
+        {"op": "criar", "nome": "A", "categoria": "B"}
+    ]
+
+
+def test_journal_descarta_gravacao_interrompida_e_isola_linha_ilegivel(
+    tmp_path,
+):
+    journal = Journal(str(tmp_path / "j.jsonl"))
+    leitor = LeitorJournal(journal.caminho)
+    journal.anexar({"op": "criar", "nome": "A", "categoria": "B"})
+    with open(journal.caminho, "ab") as f:
+        f.write(b"{ilegivel}\n")
+        f.write(b'{"op": "avaliar", "nom')
+    journal.anexar({"op": "alternar", "nome": "A"})
+
+    esperado = [
+        {"op": "criar", "nome": "A", "categoria": "B"},
+        {"op": "alternar", "nome": "A"},
+    ]
+    assert list(journal.registros()) == esperado
+    assert list(leitor.ler()) == esperado
+    assert leitor.posicao == journal.tamanho()
+    with open(journal.caminho + ".corrompido", "rb") as f:
+        assert f.read() == b"{ilegivel}\n" * 2
+    leitor.fechar()
+
+
+def test_cada_requisicao_de_escrita_faz_um_unico_flush():
+    antes = Restaurante.contador_flushes
+    client.post("/restaurants", json={"nome": "Flush", "categoria": "C"})
+    client.patch("/restaurants/Flush/toggle")
+    client.post("/restaurants/Flush/rating", json={"cliente": "A", "nota": 3})
+    client.post(
+        "/restaurants/Flush/menu",
+        json={"type": "Prato", "nome": "Arroz", "preco": 8.0},
+    )
+    client.patch("/restaurants/Flush/menu/Arroz/discount")
+    assert Restaurante.contador_flushes - antes == 5
+
+    # Leituras e requisições que falham não gravam nada
+    client.get("/restaurants")
+    client.patch("/restaurants/Flush/menu/Inexistente/discount")
+    client.patch("/restaurants/Inexistente/toggle")
+    assert Restaurante.contador_flushes - antes == 5
+
+
+def test_transacao_agrupa_mutacoes_em_um_flush():
+    r = Restaurante.cadastrar("Lote", "C")
+    antes = Restaurante.contador_flushes
+    with Restaurante.transacao():
+        for nota in (1, 2, 3):
+            r.receber_avaliacao("Cliente", nota)
+        with Restaurante.transacao():
+            r.alternar_estado()
+        assert Restaurante.contador_flushes == antes
+
+    assert Restaurante.contador_flushes == antes + 1
+    with open(Restaurante.ARQUIVO_DADOS, encoding="utf-8") as f:
+        assert len(json.load(f)[0]["avaliacoes"]) == 3
+    assert Restaurante.persistir() is False
+
+
+def test_agendador_coalesce_gravacoes_e_drena_ao_parar():
+    Restaurante.cadastrar("Rajada", "C")
+    antes = Restaurante.contador_flushes
+    Restaurante.iniciar_agendador(60_000)
+    try:
+        # O primeiro pedido grava logo; os seguintes aguardam o intervalo
+        client.post(
+            "/restaurants/Rajada/rating", json={"cliente": "A", "nota": 1}
+        )
+        for _ in range(100):
+            if Restaurante.contador_flushes > antes:
+                break
+            time.sleep(0.01)
+        for nota in (2, 3, 4):
+            client.post(
+                "/restaurants/Rajada/rating",
+                json={"cliente": "A", "nota": nota},
+            )
+        assert Restaurante.contador_flushes == antes + 1
+    finally:
+        Restaurante.parar_agendador()
+
+    # O flush final grava as três avaliações de uma só vez
+    assert Restaurante.contador_flushes == antes + 2
+    with open(Restaurante.ARQUIVO_DADOS, encoding="utf-8") as f:
+        assert len(json.load(f)[0]["avaliacoes"]) == 4
+
+
+def test_lifespan_inicia_e_drena_agendador(monkeypatch):
+    monkeypatch.setattr(Restaurante, "INTERVALO_FLUSH_MS", 60_000)
+    salvar_dados = Restaurante.salvar_dados.__func__
+    gravacoes = []
+
+    def contar(cls):
+        gravacoes.append(threading.current_thread().name)
+        salvar_dados(cls)
+
+    monkeypatch.setattr(Restaurante, "salvar_dados", classmethod(contar))
+    with TestClient(app) as c:
+        assert Restaurante._agendador is not None
+        c.post("/restaurants", json={"nome": "Vida", "categoria": "C"})
+        for _ in range(100):
+            if gravacoes:
+                break
+            time.sleep(0.01)
+        # Fica pendente até o flush final (intervalo de 60s)
+        c.post("/restaurants", json={"nome": "Fim", "categoria": "C"})
+    assert Restaurante._agendador is None
+    with open(Restaurante.ARQUIVO_DADOS, encoding="utf-8") as f:
+        assert [r["nome"] for r in json.load(f)] == ["Vida", "Fim"]
+    # Um único snapshot no encerramento, gravado fora do event loop
+    assert len(gravacoes) == 2
+    assert gravacoes[1].startswith("persistencia")
+
+
+def test_salvar_dados_preserva_geracao_anterior():
+    Restaurante.cadastrar("Primeiro", "C")
+    Restaurante.cadastrar("Segundo", "C")
+
+    anterior = caminho_anterior(Restaurante.ARQUIVO_DADOS)
+    with open(anterior, encoding="utf-8") as f:
+        assert [r["nome"] for r in json.load(f)] == ["Primeiro"]
+    # Nenhum arquivo temporário fica para trás
+    diretorio = os.path.dirname(Restaurante.ARQUIVO_DADOS)
+    assert not [n for n in os.listdir(diretorio) if n.endswith(".tmp")]
+
+
+def test_falha_na_gravacao_mantem_arquivo_intacto(monkeypatch):
+    Restaurante.cadastrar("Intacto", "C")
+
+    def falha(*args, **kwargs):
+        raise OSError("disco cheio")
+
+    with monkeypatch.context() as m:
+        m.setattr(VisaoRestaurante, "to_dict", falha)
+        with pytest.raises(OSError):
+            Restaurante.cadastrar("Perdido", "C")
+
+    with open(Restaurante.ARQUIVO_DADOS, encoding="utf-8") as f:
+        assert [r["nome"] for r in json.load(f)] == ["Intacto"]
+
+
+def test_carga_recupera_geracao_anterior_se_arquivo_corrompido():
+    Restaurante.cadastrar("Salvo", "C")
+    Restaurante.cadastrar("Recente", "C")
+    with open(Restaurante.ARQUIVO_DADOS, "w", encoding="utf-8") as f:
+        f.write('[{"nome": "Recen')
+
+    Restaurante.carregar_dados()
+
+    assert [r._nome for r in Restaurante.restaurantes] == ["Salvo"]
+    assert os.path.exists(Restaurante.ARQUIVO_DADOS + ".corrompido")
+
+
+def test_agregados_de_avaliacoes_sao_incrementais():
+    r = Restaurante(
+        "Agregado",
+        "C",
+        avaliacoes=[Avaliacao("A", 4.5), Avaliacao("B", 2)],
+    )
+    for nota in (5, 1, 3.9):
+        r.receber_avaliacao("C", nota)
+
+    assert r.media_avaliacoes == round((4.5 + 2 + 5 + 1 + 3.9) / 5, 1)
+    assert r.estatisticas_avaliacoes == {
+        "quantidade": 5,
+        "media": 3.3,
+        "minima": 1,
+        "maxima": 5,
+        "histograma": [1, 1, 1, 1, 1],
+    }
+
+    # A média não depende mais de percorrer a lista de avaliações
+    r._avaliacao = []
+    assert r.media_avaliacoes == 3.3
+
+
+def test_agregados_sao_reconstruidos_na_carga():
+    r = Restaurante.cadastrar("Carga", "C")
+    r.receber_avaliacao("A", 2)
+    r.receber_avaliacao("B", 5)
+
+    Restaurante.carregar_dados()
+
+    stats = Restaurante.buscar_por_nome("Carga").estatisticas_avaliacoes
+    assert stats["quantidade"] == 2
+    assert stats["media"] == 3.5
+    assert stats["histograma"] == [0, 1, 0, 0, 1]
+
+
+def test_listagem_em_cache_ate_a_proxima_mutacao(monkeypatch):
+    client.post("/restaurants", json={"nome": "Cache", "categoria": "C"})
+    chamadas = []
+    to_dict = Restaurante.to_dict
+
+    def contar(self, *args, **kwargs):
+        chamadas.append(self._nome)
+        return to_dict(self, *args, **kwargs)
+
+    monkeypatch.setattr(Restaurante, "to_dict", contar)
+
+    primeira = client.get("/restaurants")
+    segunda = client.get("/restaurants")
+    assert primeira.content == segunda.content
+    assert primeira.headers["etag"] == segunda.headers["etag"]
+    assert chamadas == ["Cache"]
+
+    client.post("/restaurants/Cache/rating", json={"cliente": "A", "nota": 4})
+    chamadas.clear()
+    terceira = client.get("/restaurants")
+    assert terceira.headers["etag"] != primeira.headers["etag"]
+    assert terceira.json()[0]["avaliacoes"] == [{"cliente": "A", "nota": 4}]
+    assert chamadas == ["Cache"]
+
+
+def test_listagens_respondem_304_com_if_none_match():
+    client.post("/restaurants", json={"nome": "Etag", "categoria": "C"})
+    for rota in ("/restaurants", "/restaurants/summary"):
+        resp = client.get(rota)
+        etag = resp.headers["etag"]
+
+        resp = client.get(rota, headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.content == b""
+
+        client.patch("/restaurants/Etag/toggle")
+        resp = client.get(rota, headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.json()[0]["nome"] == "Etag"
+
+
+def test_etag_difere_entre_rotas_e_consultas():
+    client.post("/restaurants", json={"nome": "Etag", "categoria": "C"})
+    resumo = client.get("/restaurants/summary")
+    etag = resumo.headers["etag"]
+    assert client.get("/restaurants").headers["etag"] != etag
+
+    # O ETag de uma listagem não vale para outra na mesma geração
+    for rota in ("/restaurants", "/restaurants/summary?categoria=C"):
+        resp = client.get(rota, headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+    resp = client.get("/restaurants/summary", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+
+
+def _cadastra_catalogo():
+    for i, (categoria, ativo) in enumerate(
+        [("Pizza", True), ("Sushi", False), ("pizza", False),
+         ("Pizza", True), ("Sushi", True), ("Pizza", True)]
+    ):
+        r = Restaurante.cadastrar(f"R{i}", categoria)
+        if ativo:
+            r.alternar_estado()
+        r.receber_avaliacao("A", 1)
+        r.receber_avaliacao("B", 5)
+        r.adicionar_ao_cardapio(Prato("P", 10.0, "d"))
+
+
+def test_paginacao_por_cursor_na_listagem():
+    _cadastra_catalogo()
+
+    nomes, after = [], None
+    while True:
+        params = {"limit": 4}
+        if after:
+            params["after"] = after
+        resp = client.get("/restaurants", params=params)
+        assert resp.status_code == 200
+        nomes.append([r["nome"] for r in resp.json()])
+        after = resp.headers.get("x-next-cursor")
+        if after is None:
+            break
+    assert nomes == [["R0", "R1", "R2", "R3"], ["R4", "R5"]]
+
+    resp = client.get("/restaurants", params={"after": "Inexistente"})
+    assert resp.status_code == 400
+
+
+def test_cursor_sobrevive_a_remocao_e_nomes_com_escape():
+    for nome in ("A/B & C", "Ação%20", "Último"):
+        Restaurante.cadastrar(nome, "C")
+
+    resp = client.get("/restaurants", params={"limit": 1})
+    cursor = resp.headers["x-next-cursor"]
+    resp = client.get("/restaurants", params={"limit": 1, "after": cursor})
+    assert [r["nome"] for r in resp.json()] == ["Ação%20"]
+
+    # O restaurante do cursor pode sair do catálogo entre as páginas
+    cursor = resp.headers["x-next-cursor"]
+    Restaurante.remover("Ação%20")
+    resp = client.get("/restaurants", params={"after": cursor})
+    assert resp.status_code == 200
+    assert [r["nome"] for r in resp.json()] == ["Último"]
+
+
+def test_filtros_da_listagem_usam_indices():
+    _cadastra_catalogo()
+
+    resp = client.get(
+        "/restaurants", params={"categoria": "PIZZA", "ativo": True}
+    )
+    assert [r["nome"] for r in resp.json()] == ["R0", "R3", "R5"]
+
+    filtros = {"categoria": "pizza", "ativo": True, "limit": 1}
+    resp = client.get("/restaurants", params=filtros)
+    assert [r["nome"] for r in resp.json()] == ["R0"]
+    resp = client.get(
+        "/restaurants",
+        params={**filtros, "after": resp.headers["x-next-cursor"]},
+    )
+    assert [r["nome"] for r in resp.json()] == ["R3"]
+    assert "x-next-cursor" in resp.headers
+
+    # O índice por situação acompanha as alternâncias e remoções
+    Restaurante.buscar_por_nome("R3").alternar_estado()
+    Restaurante.remover("R0")
+    resp = client.get("/restaurants", params={"ativo": True})
+    assert [r["nome"] for r in resp.json()] == ["R4", "R5"]
+
+
+def test_listagem_com_campos_esparsos():
+    _cadastra_catalogo()
+
+    resp = client.get(
+        "/restaurants",
+        params={"limit": 1, "exclude": ["cardapio"], "max_avaliacoes": 1},
+    )
+    detalhe = resp.json()[0]
+    assert "cardapio" not in detalhe
+    assert detalhe["avaliacoes"] == [{"cliente": "B", "nota": 5}]
+
+    resp = client.get(
+        "/restaurants",
+        params={"limit": 1, "exclude": ["avaliacoes", "cardapio"]},
+    )
+    assert resp.json() == [
+        {"nome": "R0", "categoria": "Pizza", "ativo": True}
+    ]
+
+
+def test_exportacao_em_streaming_json_e_ndjson():
+    resp = client.get("/restaurants/export")
+    assert resp.status_code == 200
+    assert resp.json() == []
+
+    _cadastra_catalogo()
+    esperado = [r.to_dict() for r in Restaurante.restaurantes]
+
+    resp = client.get("/restaurants/export")
+    assert resp.headers["content-type"].startswith("application/json")
+    assert resp.json() == esperado
+
+    resp = client.get("/restaurants/export", params={"formato": "ndjson"})
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    linhas = resp.text.splitlines()
+    assert [json.loads(linha) for linha in linhas] == esperado
+
+
+def test_iterar_percorre_em_lotes_tolerando_remocoes():
+    _cadastra_catalogo()
+    vistos = []
+    for r in Restaurante.iterar(lote=2):
+        vistos.append(r._nome)
+        if r._nome == "R1":
+            Restaurante.remover("R2")
+    assert vistos == ["R0", "R1", "R3", "R4", "R5"]
+
+
+def test_remocao_passa_o_nome_ao_homonimo_carregado(monkeypatch, tmp_path):
+    arquivo = tmp_path / "dados.json"
+    monkeypatch.setattr(Restaurante, "ARQUIVO_DADOS", str(arquivo))
+    registros = [
+        {"nome": nome, "categoria": categoria, "ativo": False,
+         "avaliacoes": [], "cardapio": []}
+        for nome, categoria in [
+            ("Dup", "A"), ("Outro", "B"), ("DUP", "C"), ("dup", "D")
+        ]
+    ]
+    arquivo.write_text(json.dumps(registros), encoding="utf-8")
+    Restaurante.carregar_dados()
+
+    categorias = []
+    while Restaurante.buscar_por_nome("dup") is not None:
+        categorias.append(Restaurante.buscar_por_nome("dup")._categoria)
+        Restaurante._desregistrar("Dup")
+    assert categorias == ["A", "C", "D"]
+    assert not Restaurante._homonimos
+    assert [r._nome for r in Restaurante.restaurantes] == ["Outro"]
+
+
+@pytest.mark.parametrize("extensao", [".json", ".ndjson"])
+def test_carga_incremental_do_snapshot(monkeypatch, tmp_path, extensao):
+    monkeypatch.setattr(persistencia, "TAMANHO_BLOCO", 16)
+    monkeypatch.setattr(
+        Restaurante, "ARQUIVO_DADOS", str(tmp_path / f"dados{extensao}")
+    )
+    _cadastra_catalogo()
+    esperado = [r.to_dict() for r in Restaurante.restaurantes]
+
+    with open(Restaurante.ARQUIVO_DADOS, encoding="utf-8") as f:
+        conteudo = f.read()
+    if extensao == ".json":
+        assert conteudo == json.dumps(esperado, ensure_ascii=False, indent=4)
+    else:
+        assert len(conteudo.splitlines()) == len(esperado)
+
+    carga = Restaurante.carregar_dados()
+    assert [r.to_dict() for r in Restaurante.restaurantes] == esperado
+    assert carga["restaurantes"] == 6
+    assert carga["avaliacoes"] == 12
+    assert carga["itens_cardapio"] == 6
+    assert carga["segundos"] >= 0
+
+
+def test_snapshot_binario_mapeado_e_materializado_sob_demanda(
+    monkeypatch, tmp_path
+):
+    monkeypatch.setattr(
+        Restaurante, "ARQUIVO_DADOS", str(tmp_path / "dados.bin")
+    )
+    _cadastra_catalogo()
+    Restaurante.cadastrar("Vazio", "Pizza")
+    esperado = [r.to_dict() for r in Restaurante.restaurantes]
+    ranking = [r._nome for r in Restaurante.melhores("Pizza", 3)]
+    with open(Restaurante.ARQUIVO_DADOS, "rb") as f:
+        assert f.read(8) == b"SABORBIN"
+
+    carga = Restaurante.carregar_dados()
+    assert (carga["restaurantes"], carga["avaliacoes"]) == (7, 12)
+    assert carga["itens_cardapio"] == 6
+    r0 = Restaurante.buscar_por_nome("R0")
+    # Avaliações lidas do arquivo, cardápio ainda não construído
+    assert r0._avaliacao.somente_leitura
+    assert r0._lista_cardapio is None
+    assert len(Restaurante._cardapios_pendentes) == 6
+    assert [r.to_dict() for r in Restaurante.restaurantes] == esperado
+    assert r0._lista_cardapio is None
+    assert list(np.asarray(r0._avaliacao.notas())) == [1.0, 5.0]
+    assert [r._nome for r in Restaurante.melhores("Pizza", 3)] == ranking
+
+    # A busca materializa os cardápios pendentes
+    resp = client.get("/menu/search", params={"q": "p"})
+    assert len(resp.json()) == 6
+    assert not Restaurante._cardapios_pendentes
+    assert r0._lista_cardapio is not None
+
+    # Uma nova avaliação copia o armazém antes de alterá-lo
+    client.post("/restaurants/R0/rating", json={"cliente": "C", "nota": 3})
+    assert not r0._avaliacao.somente_leitura
+    assert r0.media_avaliacoes == 3.0
+    client.patch("/restaurants/R1/menu/P/discount")
+    Restaurante.remover("R2")
+    esperado = [r.to_dict() for r in Restaurante.restaurantes]
+
+    Restaurante.carregar_dados()
+    assert [r.to_dict() for r in Restaurante.restaurantes] == esperado
+    assert Restaurante.buscar_itens("p", max_preco=9.5)[0][0]._nome == "R1"
+
+
+def test_snapshot_binario_corrompido_usa_geracao_anterior(
+    monkeypatch, tmp_path
+):
+    monkeypatch.setattr(
+        Restaurante, "ARQUIVO_DADOS", str(tmp_path / "dados.bin")
+    )
+    Restaurante.cadastrar("Salvo", "C")
+    Restaurante.cadastrar("Recente", "C")
+    with open(Restaurante.ARQUIVO_DADOS, "r+b") as f:
+        f.truncate(40)
+
+    Restaurante.carregar_dados()
+
+    assert [r._nome for r in Restaurante.restaurantes] == ["Salvo"]
+    assert os.path.exists(Restaurante.ARQUIVO_DADOS + ".corrompido")
+
+
+def test_lifespan_informa_estatisticas_da_carga(capsys):
+    Restaurante.cadastrar("Log", "C").receber_avaliacao("A", 3)
+    with TestClient(app):
+        pass
+    saida = capsys.readouterr().out
+    assert "[Carga] 1 restaurantes, 1 avaliações e 0 itens" in saida
+
+
+def test_armazem_colunar_preserva_json_e_agregados(monkeypatch):
+    def cria():
+        r = Restaurante.cadastrar("Colunar", "C")
+        for cliente, nota in [("Ana", 4.5), ("Bia", 2.0), ("Ana", 5.0)]:
+            r.receber_avaliacao(cliente, nota)
+        return r
+
+    lista = cria()
+    esperado = lista.to_dict(), lista.estatisticas_avaliacoes
+    Restaurante.limpar_registro()
+
+    monkeypatch.setattr(Restaurante, "ARMAZEM_AVALIACOES", "colunar")
+    colunar = cria()
+    assert type(colunar._avaliacao).__name__ == "AvaliacoesColunares"
+    assert (colunar.to_dict(), colunar.estatisticas_avaliacoes) == esperado
+    assert colunar.to_dict(max_avaliacoes=1)["avaliacoes"] == [
+        {"cliente": "Ana", "nota": 5.0}
+    ]
+
+    # Ida e volta pelo arquivo e pela API
+    Restaurante.carregar_dados()
+    recarregado = Restaurante.buscar_por_nome("Colunar")
+    assert type(recarregado._avaliacao).__name__ == "AvaliacoesColunares"
+    assert recarregado.to_dict() == esperado[0]
+    resp = client.get("/restaurants")
+    assert resp.json()[0]["avaliacoes"] == esperado[0]["avaliacoes"]
+
+
+@pytest.mark.parametrize("armazem", ["lista", "colunar"])
+def test_analise_de_avaliacoes_vetorizada(monkeypatch, armazem):
+    monkeypatch.setattr(Restaurante, "ARMAZEM_AVALIACOES", armazem)
+    notas = {
+        "A": ("Pizza", [5, 4.5, 1, 3.2]),
+        "B": ("Sushi", [2, 2.5]),
+        "C": ("pizza", [4]),
+        "D": ("SUSHI", []),
+    }
+    for nome, (categoria, lista) in notas.items():
+        r = Restaurante.cadastrar(nome, categoria)
+        for nota in lista:
+            r.receber_avaliacao("X", nota)
+
+    resp = client.get(
+        "/analytics/ratings", params=[("percentis", 10), ("percentis", 90)]
+    )
+    assert resp.status_code == 200
+    dados = resp.json()
+
+    def confere(obtido, valores):
+        assert obtido["quantidade"] == len(valores)
+        if not valores:
+            assert obtido["media"] is None and obtido["mediana"] is None
+            assert obtido["percentis"] == {"p10": None, "p90": None}
+            assert obtido["histograma"] == [0] * 5
+            return
+        v = np.array(valores, dtype=float)
+        assert obtido["media"] == round(v.mean(), 2)
+        assert obtido["mediana"] == round(float(np.median(v)), 2)
+        assert obtido["desvio_padrao"] == round(v.std(), 2)
+        assert obtido["percentis"] == {
+            "p10": round(float(np.percentile(v, 10)), 2),
+            "p90": round(float(np.percentile(v, 90)), 2),
+        }
+        assert obtido["histograma"] == np.bincount(
+            np.clip(np.floor(v), 1, 5).astype(int) - 1, minlength=5
+        ).tolist()
+
+    for linha in dados["restaurantes"]:
+        categoria, valores = notas[linha["nome"]]
+        assert linha["categoria"] == categoria
+        confere(linha, valores)
+    # Categorias agrupadas sem distinção de maiúsculas, como nos filtros
+    assert [c["categoria"] for c in dados["categorias"]] == ["Pizza", "Sushi"]
+    assert [c["restaurantes"] for c in dados["categorias"]] == [2, 2]
+    confere(dados["categorias"][0], [5, 4.5, 1, 3.2, 4])
+    confere(dados["categorias"][1], [2, 2.5])
+    confere(dados["geral"], [5, 4.5, 1, 3.2, 2, 2.5, 4])
+
+    resp = client.get("/analytics/ratings", params={"percentis": 101})
+    assert resp.status_code == 400
+
+
+def test_analise_reaproveita_arrays_ate_a_proxima_mutacao():
+    r = Restaurante.cadastrar("A", "C")
+    r.receber_avaliacao("X", 3)
+    colunas = analise_avaliacoes.colunas()
+    assert analise_avaliacoes.colunas() is colunas
+
+    r.receber_avaliacao("Y", 5)
+    novas = analise_avaliacoes.colunas()
+    assert novas is not colunas
+    assert novas.restaurantes.notas.tolist() == [3.0, 5.0]
+    resp = client.get("/analytics/ratings")
+    assert resp.json()["geral"]["media"] == 4.0
+
+
+def test_ranking_por_media_mantido_a_cada_avaliacao():
+    notas = {
+        "A": ("Pizza", [5, 4]),
+        "B": ("pizza", [5]),
+        "C": ("Sushi", [3, 3, 3]),
+        "D": ("Pizza", [2, 5, 5]),
+        "E": ("Pizza", []),
+    }
+    for nome, (categoria, lista) in notas.items():
+        r = Restaurante.cadastrar(nome, categoria)
+        for nota in lista:
+            r.receber_avaliacao("X", nota)
+
+    assert [r._nome for r in Restaurante.melhores()] == [
+        "B", "A", "D", "C"
+    ]
+    assert [r._nome for r in Restaurante.melhores("PIZZA", k=2)] == [
+        "B", "A"
+    ]
+
+    # Uma nova avaliação reposiciona o restaurante
+    for _ in range(5):
+        Restaurante.buscar_por_nome("C").receber_avaliacao("Y", 5)
+    assert [r._nome for r in Restaurante.melhores()] == [
+        "B", "A", "C", "D"
+    ]
+    Restaurante.buscar_por_nome("A").receber_avaliacao("Y", 5)
+    resp = client.get(
+        "/restaurants/top", params={"categoria": "pizza", "min_reviews": 2}
+    )
+    assert resp.status_code == 200
+    assert resp.json() == [
+        {
+            "nome": "A",
+            "categoria": "Pizza",
+            "ativo": False,
+            "media_avaliacoes": 4.7,
+            "quantidade_avaliacoes": 3,
+        },
+        {
+            "nome": "D",
+            "categoria": "Pizza",
+            "ativo": False,
+            "media_avaliacoes": 4.0,
+            "quantidade_avaliacoes": 3,
+        },
+    ]
+
+    # Remoção e recarga mantêm o ranking coerente
+    Restaurante.remover("B")
+    assert [r._nome for r in Restaurante.melhores()] == ["A", "C", "D"]
+    Restaurante.carregar_dados()
+    assert [r._nome for r in Restaurante.melhores()] == ["A", "C", "D"]
+    assert client.get("/restaurants/top", params={"k": 0}).status_code == 422
+
+
+def test_resumo_filtrado_pelos_indices_compostos():
+    _cadastra_catalogo()
+
+    resp = client.get(
+        "/restaurants/summary", params={"categoria": "pizza", "ativo": True}
+    )
+    assert resp.status_code == 200
+    assert [r["nome"] for r in resp.json()] == ["R0", "R3", "R5"]
+    assert Restaurante._por_categoria_ativo.grupo(("sushi", False)) == [
+        Restaurante.buscar_por_nome("R1")
+    ]
+
+    # Alternância, remoção e recarga mantêm o índice composto
+    Restaurante.buscar_por_nome("R1").alternar_estado()
+    Restaurante.remover("R4")
+    for _ in range(2):
+        resp = client.get(
+            "/restaurants/summary",
+            params={"categoria": "Sushi", "ativo": True},
+        )
+        assert [r["nome"] for r in resp.json()] == ["R1"]
+        Restaurante.carregar_dados()
+    resp = client.get("/restaurants/summary", params={"ativo": False})
+    assert [r["nome"] for r in resp.json()] == ["R2"]
+    assert len(client.get("/restaurants/summary").json()) == 5
+
+
+def test_busca_no_cardapio_ignora_acentos_e_usa_prefixos():
+    itens = {
+        "Padaria": [
+            {"type": "Prato", "nome": "Pão de Queijo", "preco": 8.0,
+             "descricao": "Porção com dez unidades"},
+            {"type": "Bebida", "nome": "Café Gelado", "preco": 12.0,
+             "tamanho": 300},
+        ],
+        "Cantina": [
+            {"type": "Prato", "nome": "Feijoada", "preco": 45.0,
+             "descricao": "Acompanha pão e farofa"},
+            {"type": "Sobremesa", "nome": "Pavê", "preco": 20.0,
+             "descricao": "Pavê de café", "tipo": "Doce",
+             "tamanho": 150},
+        ],
+    }
+    for nome, lista in itens.items():
+        client.post("/restaurants", json={"nome": nome, "categoria": "C"})
+        for item in lista:
+            resp = client.post(f"/restaurants/{nome}/menu", json=item)
+            assert resp.status_code == 201
+
+    def busca(**params):
+        resp = client.get("/menu/search", params=params)
+        assert resp.status_code == 200
+        return [(r["restaurante"], r["item"]["nome"]) for r in resp.json()]
+
+    assert busca(q="PAO") == [
+        ("Padaria", "Pão de Queijo"), ("Cantina", "Feijoada")
+    ]
+    assert busca(q="caf") == [
+        ("Padaria", "Café Gelado"), ("Cantina", "Pavê")
+    ]
+    assert busca(q="cafe gel") == [("Padaria", "Café Gelado")]
+    assert busca(q="pa", type="Sobremesa") == [("Cantina", "Pavê")]
+    assert busca(q="xyz") == []
+
+    resp = client.get("/menu/search", params={"q": "feijoada"})
+    assert resp.json()[0]["item"]["__type__"] == "Prato"
+
+    # Desconto atualiza o preço usado no filtro
+    assert busca(q="pave", max_preco=17.0) == []
+    client.patch("/restaurants/Cantina/menu/Pavê/discount")
+    assert busca(q="pave", max_preco=17.0) == [("Cantina", "Pavê")]
+
+    # Remoção e recarga mantêm o índice coerente
+    Restaurante.carregar_dados()
+    assert busca(q="pave", max_preco=17.0) == [("Cantina", "Pavê")]
+    Restaurante.remover("Padaria")
+    assert busca(q="pao") == [("Cantina", "Feijoada")]
+    assert "queijo" not in Restaurante._busca_cardapio._vocabulario
+
+
+def test_indice_do_cardapio_e_cache_do_to_dict(monkeypatch):
+    monkeypatch.setattr(Restaurante, "MODO_PERSISTENCIA", "journal")
+    r = Restaurante.cadastrar("Rede", "C")
+    for i in range(300):
+        r.adicionar_ao_cardapio(Prato(f"Prato {i}", 10.0, "d"))
+    r.adicionar_ao_cardapio(Prato("prato 7", 99.0, "homônimo"))
+
+    item = r._buscar_item("PRATO 7")
+    assert item is r._cardapio[7]
+    assert r._localizar_item("prato 7", 1) == (r._cardapio[300], 300)
+    assert r._buscar_item("Inexistente") is None
+
+    class SemPercurso(list):
+        def __iter__(self):
+            raise AssertionError("cardápio percorrido")
+
+    # O dict é reaproveitado até o desconto mudar o preço; o desconto
+    # acha a posição do item pelo índice, sem percorrer o cardápio
+    serializado = item.to_dict()
+    assert item.to_dict() is serializado
+    r._lista_cardapio = SemPercurso(r._lista_cardapio)
+    r.aplicar_desconto_item("prato 7")
+    assert serializado["preco"] == 10.0
+    assert item.to_dict() is not serializado
+    assert item.to_dict()["preco"] == 9.5
+    assert r._cardapio[8].to_dict() is r._cardapio[8].to_dict()
+
+    # A reaplicação do journal também invalida o cache
+    Restaurante.carregar_dados()
+    recarregado = Restaurante.buscar_por_nome("Rede")
+    assert recarregado._buscar_item("prato 7").to_dict()["preco"] == 9.5
+    resp = client.get("/restaurants/Rede/menu")
+    assert resp.json()[7] == {
+        "__type__": "Prato", "nome": "Prato 7", "preco": 9.5,
+        "descricao": "d",
+    }
+
+
+def test_desconto_em_lote_com_um_unico_flush():
+    _cadastra_catalogo()
+    for r in Restaurante.restaurantes:
+        r.adicionar_ao_cardapio(
+            Sobremesa("Pudim", 20.0, "d", "Doce", "Médio")
+        )
+    antes = Restaurante.contador_flushes
+
+    resp = client.patch(
+        "/menu/discount", json={"categoria": "pizza", "type": "Sobremesa"}
+    )
+    assert resp.status_code == 200
+    corpo = resp.json()
+    assert corpo["restaurantes_alterados"] == 4
+    assert corpo["itens_com_desconto"] == 4
+    assert corpo["nao_encontrados"] == []
+    assert corpo["segundos"] >= 0
+    assert Restaurante.contador_flushes - antes == 1
+    precos = {
+        r._nome: r._buscar_item("pudim")._preco
+        for r in Restaurante.restaurantes
+    }
+    assert precos == {
+        "R0": 17.0, "R1": 20.0, "R2": 17.0,
+        "R3": 17.0, "R4": 20.0, "R5": 17.0,
+    }
+
+    # Lista de restaurantes e de itens, com nomes repetidos e inexistentes
+    resp = client.patch(
+        "/menu/discount",
+        json={"restaurantes": ["R1", "r1", "Nenhum", "R0"],
+              "itens": ["p", "PUDIM"], "ativo": False},
+    )
+    corpo = resp.json()
+    assert (corpo["restaurantes_alterados"], corpo["itens_com_desconto"]) == (
+        1, 2
+    )
+    assert corpo["nao_encontrados"] == ["Nenhum"]
+    assert Restaurante.buscar_por_nome("R1")._buscar_item("P")._preco == 9.5
+
+    Restaurante.carregar_dados()
+    assert Restaurante.buscar_por_nome("R1")._buscar_item("pudim")._preco == (
+        17.0
+    )
+
+    resp = client.patch("/menu/discount", json={"categoria": "Pizza"})
+    assert resp.status_code == 422
+
+
+@pytest.mark.parametrize("modo", ["journal", "sqlite"])
+def test_desconto_em_lote_alcanca_itens_de_nome_repetido(monkeypatch, modo):
+    monkeypatch.setattr(Restaurante, "MODO_PERSISTENCIA", modo)
+    Restaurante.carregar_dados()
+    r = Restaurante.cadastrar("Repetidos", "C")
+    for item in (
+        {"type": "Prato", "nome": "Combo", "preco": 10.0},
+        {"type": "Bebida", "nome": "Combo", "preco": 10.0},
+        {"type": "Bebida", "nome": "combo", "preco": 20.0},
+    ):
+        client.post("/restaurants/Repetidos/menu", json=item)
+
+    resp = client.patch(
+        "/menu/discount", json={"type": "Bebida", "itens": ["COMBO"]}
+    )
+    assert resp.json()["itens_com_desconto"] == 2
+
+    esperado = [10.0, 9.2, 18.4]
+    assert [i._preco for i in r._cardapio] == esperado
+    # A carga reaplica cada desconto ao mesmo item, não ao primeiro
+    Restaurante.carregar_dados()
+    r = Restaurante.buscar_por_nome("Repetidos")
+    assert [i._preco for i in r._cardapio] == esperado
+
+
+def test_importacao_em_lote_ndjson_com_um_unico_flush():
+    Restaurante.cadastrar("Existente", "C")
+    linhas = [
+        {"nome": "Novo", "categoria": "Pizza", "ativo": True,
+         "avaliacoes": [{"cliente": "A", "nota": 4}],
+         "cardapio": [{"type": "Prato", "nome": "Margherita",
+                       "preco": 40.0, "descricao": "Clássica"}]},
+        {"nome": "EXISTENTE", "categoria": "X"},
+        {"nome": "novo", "categoria": "Y"},
+        {"nome": "Ruim", "categoria": "Z",
+         "avaliacoes": [{"cliente": "A", "nota": 9}]},
+        {"nome": "Simples", "categoria": "Sushi"},
+    ]
+    corpo = "\n".join(json.dumps(linha) for linha in linhas)
+    corpo += "\n\n{quebrado\n"
+    antes = Restaurante.contador_flushes
+
+    def partes():
+        # Corta as linhas no meio para exercitar a leitura em streaming
+        dados = corpo.encode()
+        for i in range(0, len(dados), 7):
+            yield dados[i:i + 7]
+
+    resp = client.post(
+        "/restaurants/import",
+        content=partes(),
+        headers={"content-type": "application/x-ndjson"},
+    )
+    assert resp.status_code == 200
+    resultado = resp.json()
+    assert resultado["criados"] == 2
+    assert resultado["duplicados"] == ["EXISTENTE", "novo"]
+    assert [e["linha"] for e in resultado["erros"]] == [4, 7]
+    assert "nota deve ser" in resultado["erros"][0]["detalhe"]
+    assert Restaurante.contador_flushes - antes == 1
+
+    Restaurante.carregar_dados()
+    novo = Restaurante.buscar_por_nome("Novo")
+    assert novo.ativo and novo.media_avaliacoes == 4
+    assert novo._buscar_item("margherita")._preco == 40.0
+    assert [r._nome for r in Restaurante.restaurantes] == [
+        "Existente", "Novo", "Simples"
+    ]
+
+
+@pytest.mark.parametrize("tamanho_bloco", [7, 4096])
+def test_importacao_ndjson_rejeita_linha_longa(monkeypatch, tamanho_bloco):
+    monkeypatch.setattr("main.LIMITE_LINHA_NDJSON", 64)
+    curta = json.dumps({"nome": "Curta", "categoria": "C"})
+    longa = json.dumps({"nome": "L" * 100, "categoria": "C"})
+
+    def partes(corpo):
+        dados = corpo.encode()
+        for i in range(0, len(dados), tamanho_bloco):
+            yield dados[i:i + tamanho_bloco]
+
+    # Sem quebra de linha no fim e com linhas completas dentro de um bloco
+    for corpo in (f"{curta}\n{longa}", f"{longa}\n{curta}\n"):
+        resp = client.post(
+            "/restaurants/import",
+            content=partes(corpo),
+            headers={"content-type": "application/x-ndjson"},
+        )
+        assert resp.status_code == 413
+
+    # As linhas anteriores à longa já foram importadas
+    assert Restaurante.buscar_por_nome("Curta") is not None
+    resp = client.post(
+        "/restaurants/import",
+        content=partes(f"{curta}\n\n{curta}"),
+        headers={"content-type": "application/x-ndjson"},
+    )
+    assert resp.json()["duplicados"] == ["Curta", "Curta"]
+
+
+def test_modo_sqlite_grava_cada_mutacao_como_linha(monkeypatch):
+    monkeypatch.setattr(Restaurante, "MODO_PERSISTENCIA", "sqlite")
+    banco = os.path.splitext(Restaurante.ARQUIVO_DADOS)[0] + ".db"
+    os.remove(Restaurante.ARQUIVO_DADOS)
+
+    client.post("/restaurants", json={"nome": "Bar", "categoria": "C"})
+    client.post("/restaurants", json={"nome": "Sai", "categoria": "C"})
+    client.patch("/restaurants/Bar/toggle")
+    client.post(
+        "/restaurants/Bar/menu",
+        json={"type": "Sobremesa", "nome": "Pudim", "preco": 20.0,
+              "descricao": "d", "tipo": "Doce", "tamanho": 150},
+    )
+    client.patch("/restaurants/bar/menu/pudim/discount")
+    Restaurante.remover("Sai")
+
+    leitor = sqlite3.connect(banco)
+    assert leitor.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    client.post("/restaurants/Bar/rating", json={"cliente": "A", "nota": 4})
+    assert leitor.execute(
+        "SELECT cliente, nota FROM avaliacoes"
+    ).fetchall() == [("A", 4.0)]
+    assert leitor.execute(
+        "SELECT nome, ativo FROM restaurantes"
+    ).fetchall() == [("Bar", 1)]
+    assert leitor.execute(
+        "SELECT tipo, preco, extras FROM itens_cardapio"
+    ).fetchall() == [
+        ("Sobremesa", 17.0,
+         '{"descricao": "d", "tipo": "Doce", "tamanho": 150}'),
+    ]
+    leitor.close()
+    # Nenhuma regravação do arquivo JSON
+    assert not os.path.exists(Restaurante.ARQUIVO_DADOS)
+
+    esperado = [r.to_dict() for r in Restaurante.restaurantes]
+    carga = Restaurante.carregar_dados()
+    assert carga["restaurantes"] == 1
+    assert [r.to_dict() for r in Restaurante.restaurantes] == esperado
+
+    # salvar_dados substitui o conteúdo do banco pelo estado em memória
+    Restaurante.restaurantes[0]._anexar_avaliacao("B", 2.0)
+    Restaurante.salvar_dados()
+    Restaurante.carregar_dados()
+    assert Restaurante.restaurantes[0]._qtd_avaliacoes == 2
+
+
+def test_carga_sob_demanda_do_banco_com_orcamento_de_memoria(monkeypatch):
+    monkeypatch.setattr(Restaurante, "MODO_PERSISTENCIA", "sqlite")
+    monkeypatch.setattr(Restaurante, "CARGA_SOB_DEMANDA", True)
+    os.remove(Restaurante.ARQUIVO_DADOS)
+    _cadastra_catalogo()
+    esperado = [r.to_dict() for r in Restaurante.restaurantes]
+    resumo = client.get("/restaurants/summary").json()
+
+    carga = Restaurante.carregar_dados()
+    assert (carga["restaurantes"], carga["avaliacoes"]) == (6, 12)
+    assert carga["itens_cardapio"] == 6
+    # Resumo e estatísticas saem dos agregados calculados pelo banco
+    assert client.get("/restaurants/summary").json() == resumo
+    r0 = Restaurante.buscar_por_nome("R0")
+    assert r0.estatisticas_avaliacoes["histograma"] == [1, 0, 0, 0, 1]
+    assert all(
+        r._armazem_avaliacoes is None and r._lista_cardapio is None
+        for r in Restaurante.restaurantes
+    )
+
+    # Orçamento para um restaurante materializado de cada vez
+    r0.to_dict()
+    um = Restaurante._materializados.total
+    monkeypatch.setattr(Restaurante, "ORCAMENTO_MEMORIA", um + um // 2)
+    assert [r.to_dict() for r in Restaurante.restaurantes] == esperado
+    assert len(Restaurante._materializados) == 1
+    assert r0._armazem_avaliacoes is None
+
+    # Uma mutação ainda não gravada no banco mantém o restaurante
+    with Restaurante.transacao():
+        r0.receber_avaliacao("C", 3)
+        for r in Restaurante.restaurantes:
+            r.to_dict()
+        assert r0._armazem_avaliacoes is not None
+    for r in Restaurante.restaurantes:
+        r.to_dict()
+    assert r0._armazem_avaliacoes is None
+    assert r0.to_dict()["avaliacoes"][-1] == {"cliente": "C", "nota": 3.0}
+
+    # O cardápio descarregado é relido do banco com o desconto
+    client.patch("/restaurants/R1/menu/P/discount")
+    for r in Restaurante.restaurantes:
+        r.to_dict()
+    r1 = Restaurante.buscar_por_nome("R1")
+    assert r1._lista_cardapio is None
+    assert client.get("/restaurants/R1/menu").json()[0]["preco"] == 9.5
+    assert [
+        (r._nome, item._preco)
+        for r, item in Restaurante.buscar_itens("p", max_preco=9.5)
+    ] == [("R1", 9.5)]
+
+
+def test_lru_contabiliza_o_que_cresce_apos_materializar(monkeypatch):
+    monkeypatch.setattr(Restaurante, "MODO_PERSISTENCIA", "sqlite")
+    monkeypatch.setattr(Restaurante, "CARGA_SOB_DEMANDA", True)
+    os.remove(Restaurante.ARQUIVO_DADOS)
+    _cadastra_catalogo()
+    Restaurante.carregar_dados()
+    monkeypatch.setattr(Restaurante, "ORCAMENTO_MEMORIA", 50_000)
+    r0 = Restaurante.buscar_por_nome("R0")
+    r0.to_dict()
+
+    def estimado():
+        return r0._avaliacao.bytes_estimados() + bytes_itens(r0._cardapio)
+
+    # O acréscimo entra na conta, sem recalcular tudo a cada mutação
+    with Restaurante.transacao():
+        for i in range(2000):
+            r0.receber_avaliacao(f"C{i}", 4)
+    total = Restaurante._materializados.total
+    assert total > Restaurante.ORCAMENTO_MEMORIA
+    assert abs(total - estimado()) <= estimado() // 10
+    with Restaurante.transacao():
+        for i in range(300):
+            r0.adicionar_ao_cardapio(Prato(f"Novo {i}", 10.0, "d" * 100))
+    assert Restaurante._materializados.total - total > 300 * 100
+    assert abs(Restaurante._materializados.total - estimado()) <= (
+        estimado() // 10
+    )
+
+    # Já gravado no banco, sai na próxima materialização
+    Restaurante.buscar_por_nome("R1").to_dict()
+    assert r0._armazem_avaliacoes is None and r0._lista_cardapio is None
+    assert Restaurante._materializados.total <= 50_000
+    assert r0._qtd_avaliacoes == len(r0._avaliacao) == 2002
+    assert len(r0._cardapio) == 301
+
+
+def test_lru_nao_descarrega_mudancas_ausentes_da_fonte(monkeypatch, tmp_path):
+    monkeypatch.setattr(Restaurante, "MODO_PERSISTENCIA", "journal")
+    monkeypatch.setattr(
+        Restaurante, "ARQUIVO_DADOS", str(tmp_path / "dados.bin")
+    )
+    _cadastra_catalogo()
+    Restaurante.salvar_dados()
+    Restaurante.carregar_dados()
+    monkeypatch.setattr(Restaurante, "ORCAMENTO_MEMORIA", 0)
+
+    resp = client.post(
+        "/restaurants/R0/menu",
+        json={"type": "Prato", "nome": "Q", "preco": 5.0, "descricao": "d"},
+    )
+    assert resp.status_code == 201
+    for r in Restaurante.restaurantes:
+        assert r._cardapio
+    r0 = Restaurante.buscar_por_nome("R0")
+    assert [item._nome for item in r0._lista_cardapio] == ["P", "Q"]
+    # Só o último materializado e o alterado continuam em memória
+    assert [
+        r._nome for r in Restaurante.restaurantes
+        if r._lista_cardapio is not None
+    ] == ["R0", "R5"]
+    assert len(Restaurante.buscar_itens("p")) == 6
+    assert [r._nome for r, _ in Restaurante.buscar_itens("q")] == ["R0"]
+
+    # Com a mudança gravada no snapshot, o alterado volta a ser
+    # descartável e é relido do arquivo novo
+    Restaurante.salvar_dados()
+    assert r0._lista_cardapio is None
+    assert [item._nome for item in r0._cardapio] == ["P", "Q"]
+    assert [r._nome for r, _ in Restaurante.buscar_itens("q")] == ["R0"]
+
+
+def test_busca_nao_rele_cardapios_descarregados(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        Restaurante, "ARQUIVO_DADOS", str(tmp_path / "dados.bin")
+    )
+    _cadastra_catalogo()
+    Restaurante.carregar_dados()
+    monkeypatch.setattr(Restaurante, "ORCAMENTO_MEMORIA", 0)
+    fonte = type(Restaurante.buscar_por_nome("R0")._fonte_cardapio)
+    leituras = []
+    para_dicts = fonte.para_dicts
+
+    def contar(self, limite=None):
+        leituras.append(self)
+        return para_dicts(self, limite)
+
+    monkeypatch.setattr(fonte, "para_dicts", contar)
+
+    # A primeira busca indexa os cardápios sem materializá-los
+    assert Restaurante.buscar_itens("xyz") == []
+    assert len(leituras) == 6
+    assert all(r._lista_cardapio is None for r in Restaurante.restaurantes)
+
+    # Depois, só os cardápios com resultados são lidos
+    leituras.clear()
+    encontrados = Restaurante.buscar_itens("p", limite=2)
+    assert [r._nome for r, _ in encontrados] == ["R0", "R1"]
+    assert len(leituras) == 2
+    leituras.clear()
+    assert Restaurante.buscar_itens("xyz") == []
+    assert leituras == []
+
+
+def test_migracao_do_json_para_sqlite(monkeypatch, tmp_path):
+    monkeypatch.setattr(Restaurante, "MODO_PERSISTENCIA", "journal")
+    _cadastra_catalogo()
+    Restaurante.buscar_por_nome("R2").aplicar_desconto_item("P")
+    esperado = [r.to_dict() for r in Restaurante.restaurantes]
+    origem = Restaurante.ARQUIVO_DADOS
+
+    destino = str(tmp_path / "migrado.db")
+    resultado = migrar(origem, destino)
+    assert resultado["restaurantes"] == 6
+    assert resultado["destino"] == destino
+    assert Restaurante.ARQUIVO_DADOS == origem
+    assert Restaurante.MODO_PERSISTENCIA == "journal"
+
+    monkeypatch.setattr(Restaurante, "MODO_PERSISTENCIA", "sqlite")
+    monkeypatch.setattr(
+        Restaurante, "ARQUIVO_DADOS", str(tmp_path / "migrado.json")
+    )
+    Restaurante.carregar_dados()
+    assert [r.to_dict() for r in Restaurante.restaurantes] == esperado
+
+
+def _em_paralelo(*alvos):
+    """
+    Executa cada função em uma thread e retorna as exceções levantadas.
+    """
+    erros = []
+
+    def executar(alvo):
+        try:
+            alvo()
+        except Exception as e:
+            erros.append(e)
+
+    threads = [threading.Thread(target=executar, args=(a,)) for a in alvos]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return erros
+
+
+def test_mutacoes_concorrentes_com_snapshots(monkeypatch):
+    monkeypatch.setattr(Restaurante, "MODO_PERSISTENCIA", "journal")
+    monkeypatch.setattr(Restaurante, "LIMITE_JOURNAL", 2000)
+    nomes = [f"Conc {i}" for i in range(4)]
+    for nome in nomes:
+        Restaurante.cadastrar(nome, "C")
+
+    def avaliador(nome):
+        def avaliar():
+            r = Restaurante.buscar_por_nome(nome)
+            for i in range(50):
+                r.receber_avaliacao(f"cli {i}", i % 5 + 1)
+                if i % 10 == 0:
+                    r.alternar_estado()
+        return avaliar
+
+    def salvar():
+        for _ in range(5):
+            Restaurante.salvar_dados()
+
+    erros = _em_paralelo(*(avaliador(n) for n in nomes), salvar)
+    if Restaurante._compactacao is not None:
+        Restaurante._compactacao.join()
+
+    assert erros == []
+    assert all(
+        Restaurante.buscar_por_nome(n)._qtd_avaliacoes == 50 for n in nomes
+    )
+    assert len(Restaurante.melhores(k=10)) == 4
+    esperado = [r.to_dict() for r in Restaurante.restaurantes]
+    Restaurante.carregar_dados()
+    assert [r.to_dict() for r in Restaurante.restaurantes] == esperado
+
+
+def test_gravacao_lenta_do_snapshot_nao_bloqueia_mutacoes(monkeypatch):
+    monkeypatch.setattr(Restaurante, "MODO_PERSISTENCIA", "journal")
+    r = Restaurante.cadastrar("Lento", "C")
+    r.receber_avaliacao("Ana", 4)
+    gravando = threading.Event()
+    liberar = threading.Event()
+    original = persistencia.escrever_snapshot
+
+    def escrever_devagar(f, registros, caminho):
+        gravando.set()
+        assert liberar.wait(5)
+        original(f, registros, caminho)
+
+    monkeypatch.setattr(
+        "modelos.restaurante.escrever_snapshot", escrever_devagar
+    )
+    salvamento = threading.Thread(target=Restaurante.salvar_dados)
+    salvamento.start()
+    assert gravando.wait(5)
+
+    # Com o snapshot ainda sendo gravado, as mutações seguem normalmente
+    inicio = time.perf_counter()
+    r.receber_avaliacao("Bia", 2)
+    Restaurante.cadastrar("Durante", "C")
+    assert time.perf_counter() - inicio < 1
+    liberar.set()
+    salvamento.join()
+
+    # O snapshot tem o retrato; as mutações posteriores ficam no journal
+    with open(Restaurante.ARQUIVO_DADOS, encoding="utf-8") as f:
+        gravado = json.load(f)
+    assert [a["cliente"] for a in gravado[0]["avaliacoes"]] == ["Ana"]
+    assert [x["op"] for x in Restaurante._journal().registros()] == [
+        "avaliar", "criar"
+    ]
+    Restaurante.carregar_dados()
+    assert Restaurante.buscar_por_nome("Lento")._qtd_avaliacoes == 2
+    assert Restaurante.buscar_por_nome("Durante") is not None
+
+
+def test_gravacao_grande_nao_bloqueia_leituras(monkeypatch):
+    Restaurante.cadastrar("Assíncrono", "C")
+    gravando = threading.Event()
+    liberar = threading.Event()
+    original = persistencia.escrever_snapshot
+    respostas = {}
+
+    def escrever_retida(f, registros, caminho):
+        # A gravação só termina depois que a leitura foi respondida; se o
+        # event loop estivesse bloqueado, a espera expiraria
+        gravando.set()
+        respostas["liberada"] = liberar.wait(10)
+        original(f, registros, caminho)
+
+    with TestClient(app) as cliente_app, monkeypatch.context() as m:
+        m.setattr("modelos.restaurante.escrever_snapshot", escrever_retida)
+
+        def avaliar():
+            respostas["avaliacao"] = cliente_app.post(
+                "/restaurants/Assíncrono/rating",
+                json={"cliente": "Ana", "nota": 5},
+            )
+
+        escrita = threading.Thread(target=avaliar)
+        escrita.start()
+        assert gravando.wait(10)
+        # O snapshot é gravado no executor; o event loop segue respondendo
+        resposta = cliente_app.get("/restaurants/Assíncrono/menu")
+        liberar.set()
+        escrita.join()
+
+    assert resposta.status_code == 200
+    assert respostas["liberada"] is True
+    assert respostas["avaliacao"].status_code == 200
+    with open(Restaurante.ARQUIVO_DADOS, encoding="utf-8") as f:
+        assert json.load(f)[0]["avaliacoes"] == [
+            {"cliente": "Ana", "nota": 5}
+        ]
+
+
+RAIZ_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _worker(codigo, *argumentos, **ambiente):
+    """
+    Inicia um processo que carrega os dados no modo multiprocesso e
+    executa ``codigo`` (com Restaurante já importado).
+    """
+    env = {
+        **os.environ,
+        "PYTHONPATH": RAIZ_PROJETO,
+        "MODO_PERSISTENCIA": "multiprocesso",
+        "ARQUIVO_DADOS": Restaurante.ARQUIVO_DADOS,
+        **ambiente,
+    }
+    script = (
+        "import sys\n"
+        "from modelos.restaurante import Restaurante\n"
+        "Restaurante.carregar_dados()\n" + codigo
+    )
+    return subprocess.Popen(
+        [sys.executable, "-c", script, *argumentos], env=env
+    )
+
+
+def test_multiprocesso_nao_perde_gravacoes(monkeypatch):
+    monkeypatch.setattr(Restaurante, "MODO_PERSISTENCIA", "multiprocesso")
+    Restaurante.carregar_dados()
+    Restaurante.cadastrar("Compartilhado", "C")
+
+    codigo = (
+        "eu = sys.argv[1]\n"
+        "Restaurante.cadastrar('Worker ' + eu, 'C')\n"
+        "for i in range(40):\n"
+        "    Restaurante.sincronizar()\n"
+        "    r = Restaurante.buscar_por_nome('Compartilhado')\n"
+        "    r.receber_avaliacao(eu + '-' + str(i), 5)\n"
+        "if Restaurante._compactacao is not None:\n"
+        "    Restaurante._compactacao.join()\n"
+    )
+    processos = [_worker(codigo, eu, LIMITE_JOURNAL="1500") for eu in "abc"]
+    assert [p.wait(60) for p in processos] == [0, 0, 0]
+
+    # Houve compactações concorrentes e nenhuma avaliação se perdeu
+    assert Restaurante._journal().compactacoes() > 0
+    Restaurante.sincronizar()
+    compartilhado = Restaurante.buscar_por_nome("Compartilhado")
+    assert compartilhado._qtd_avaliacoes == 120
+    assert sorted(r._nome for r in Restaurante.restaurantes) == [
+        "Compartilhado", "Worker a", "Worker b", "Worker c"
+    ]
+    Restaurante.carregar_dados()
+    assert Restaurante.buscar_por_nome("Compartilhado")._qtd_avaliacoes == 120
+
+
+def test_multiprocesso_mutacoes_partem_do_estado_do_journal(monkeypatch):
+    monkeypatch.setattr(Restaurante, "MODO_PERSISTENCIA", "multiprocesso")
+    Restaurante.carregar_dados()
+    r = Restaurante.cadastrar("Disputado", "C")
+    r.adicionar_ao_cardapio(Prato("P", 100.0, "d"))
+    assert Restaurante.sincronizar() is False
+
+    # Outro processo altera o mesmo restaurante e cadastra um nome depois
+    # da última sincronização deste
+    codigo = (
+        "r = Restaurante.buscar_por_nome('Disputado')\n"
+        "r.aplicar_desconto_item('P')\n"
+        "r.alternar_estado()\n"
+        "Restaurante.cadastrar('Novo', 'Italiana')\n"
+    )
+    assert _worker(codigo).wait(60) == 0
+
+    # Sem sincronizar antes: cada mutação parte do estado do journal
+    assert r.aplicar_desconto_item("P")._preco == 90.25
+    assert r.alternar_estado() == "O restaurante 'Disputado' foi inativado"
+    with pytest.raises(ValueError):
+        Restaurante.cadastrar("novo", "Japonesa")
+    assert Restaurante.buscar_por_nome("Novo")._categoria == "Italiana"
+
+    # Dois processos ao mesmo tempo: nenhuma mutação se perde e só um
+    # cadastro do mesmo nome vale
+    codigo = (
+        "r = Restaurante.buscar_por_nome('Disputado')\n"
+        "for _ in range(10):\n"
+        "    r.aplicar_desconto_item('P')\n"
+        "    r.alternar_estado()\n"
+        "try:\n"
+        "    Restaurante.cadastrar('Unico', sys.argv[1])\n"
+        "except ValueError:\n"
+        "    pass\n"
+    )
+    processos = [_worker(codigo, eu) for eu in "ab"]
+    assert [p.wait(60) for p in processos] == [0, 0]
+    assert Restaurante.sincronizar() is True
+
+    preco = 90.25
+    for _ in range(20):
+        preco = round(preco - preco * 0.05, 2)
+
+    def estado():
+        disputado = Restaurante.buscar_por_nome("Disputado")
+        return (
+            disputado._buscar_item("P")._preco,
+            disputado._ativo,
+            [
+                (x._nome, x._categoria) for x in Restaurante.restaurantes
+                if x._nome in ("Novo", "Unico")
+            ],
+        )
+
+    atual = estado()
+    assert atual[:2] == (preco, False)
+    assert atual[2][0] == ("Novo", "Italiana")
+    assert [nome for nome, _ in atual[2]] == ["Novo", "Unico"]
+    Restaurante.carregar_dados()
+    assert estado() == atual
+
+    # Removido por outro processo: a mutação não é aplicada
+    novo = Restaurante.buscar_por_nome("Novo")
+    assert _worker("Restaurante.remover('Novo')\n").wait(60) == 0
+    with pytest.raises(RestauranteRemovido):
+        novo.alternar_estado()
+    assert Restaurante.buscar_por_nome("Novo") is None
+
+
+def test_multiprocesso_sincroniza_de_forma_incremental(monkeypatch):
+    monkeypatch.setattr(Restaurante, "MODO_PERSISTENCIA", "multiprocesso")
+    Restaurante.carregar_dados()
+    r = Restaurante.cadastrar("Local", "C")
+    geracao = Restaurante.geracao
+    assert Restaurante.sincronizar() is False
+
+    # Outro processo avalia, compacta o journal em um snapshot e avalia de
+    # novo, já na nova geração do journal
+    codigo = (
+        "r = Restaurante.buscar_por_nome('Local')\n"
+        "r.receber_avaliacao('Ana', 4)\n"
+        "r.receber_avaliacao('Bia', 2)\n"
+        "Restaurante.salvar_dados()\n"
+        "r.receber_avaliacao('Caio', 3)\n"
+    )
+    assert _worker(codigo).wait(60) == 0
+
+    assert Restaurante.sincronizar() is True
+    # Mesmo objeto: o final da geração antiga foi lido pelo arquivo aberto
+    assert Restaurante.buscar_por_nome("Local") is r
+    assert [a._cliente for a in r._avaliacao] == ["Ana", "Bia", "Caio"]
+    assert Restaurante.geracao > geracao
+    assert Restaurante.sincronizar() is False
+
+    r.receber_avaliacao("Davi", 5)
+    Restaurante.carregar_dados()
+    assert Restaurante.buscar_por_nome("Local")._qtd_avaliacoes == 4
+
+
+def test_multiprocesso_grava_snapshot_sem_deter_a_trava(monkeypatch):
+    import fcntl
+
+    monkeypatch.setattr(Restaurante, "MODO_PERSISTENCIA", "multiprocesso")
+    Restaurante.carregar_dados()
+    r = Restaurante.cadastrar("Compactado", "C")
+    r.receber_avaliacao("Ana", 5)
+    journal = Restaurante._journal()
+    original = persistencia.escrever_snapshot
+    livre = []
+
+    def escrever_com_concorrencia(f, registros, caminho):
+        # Outra abertura do .lock conflita com a do salvamento, se detida
+        with open(journal.caminho + ".lock") as trava:
+            try:
+                fcntl.flock(trava, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                fcntl.flock(trava, fcntl.LOCK_UN)
+                livre.append(True)
+            except BlockingIOError:
+                livre.append(False)
+        # Gravações feitas durante o dump ficam no journal
+        r.receber_avaliacao("Bia", 4)
+        Restaurante.cadastrar("Durante", "C")
+        original(f, registros, caminho)
+
+    with monkeypatch.context() as m:
+        m.setattr(
+            "modelos.restaurante.escrever_snapshot", escrever_com_concorrencia
+        )
+        Restaurante.salvar_dados()
+
+    assert livre == [True]
+    assert journal.compactacoes() == 1
+    assert [x["op"] for x in journal.registros()] == ["avaliar", "criar"]
+    assert Restaurante.sincronizar() is False
+    assert r._qtd_avaliacoes == 2
+
+    Restaurante.carregar_dados()
+    assert Restaurante.buscar_por_nome("Compactado")._qtd_avaliacoes == 2
+    assert Restaurante.buscar_por_nome("Durante") is not None